@@ -0,0 +1,151 @@
+"""
+Aggregates Module - Materialized per-circuit, per-driver, per-team and per-season rollups
+"""
+import json
+import os
+
+import pandas as pd
+
+from app.data_cache import DEFAULT_CACHE_DIR
+
+# Default location of the aggregate tables, overridable via environment
+DEFAULT_AGGREGATE_DIR = os.environ.get("F1QP_AGGREGATE_DIR", os.path.join(DEFAULT_CACHE_DIR, "aggregates"))
+
+# Rollup name -> grouping column
+AGGREGATE_LEVELS = {
+    'circuit': 'Circuit',
+    'driver': 'Driver',
+    'team': 'Team',
+    'season': 'Year'
+}
+
+QUANTILES = {0.1: 'p10', 0.5: 'p50', 0.9: 'p90'}
+
+SESSION_KEYS = ['Year', 'Round']
+
+
+def summarize_groups(data, key, value='Q3_sec'):
+    """Count, mean, spread and percentiles of value per group"""
+    grouped = data.groupby(key, observed=True)[value]
+    table = grouped.agg(['count', 'mean', 'std', 'min', 'max'])
+    quantiles = grouped.quantile(list(QUANTILES)).unstack().rename(columns=QUANTILES)
+    table = table.join(quantiles)
+
+    # Drivers carry the team they most recently drove for
+    if key == 'Driver' and 'Team' in data:
+        table['Team'] = data.groupby(key, observed=True)['Team'].last()
+
+    table = table.reset_index()
+
+    # Categorical labels from the compact layout are stored as plain strings
+    for column in (key, 'Team'):
+        if column in table and isinstance(table[column].dtype, pd.CategoricalDtype):
+            table[column] = table[column].astype(object)
+    return table
+
+
+def _sessions(data):
+    """Content digest of every (Year, Round) session in data"""
+    if not set(SESSION_KEYS).issubset(data.columns):
+        return None
+    keys = data[SESSION_KEYS].astype(int)
+    # Sums of row hashes change when a session gains, loses or changes rows
+    digests = pd.util.hash_pandas_object(data, index=False).groupby(
+        [keys['Year'].to_numpy(), keys['Round'].to_numpy()]
+    ).sum()
+    return {(int(year), int(round_number)): f"{int(digest):016x}" for (year, round_number), digest in digests.items()}
+
+
+class HistoricalAggregates:
+    """Small rollup tables over the cleaned history.
+
+    Built once from the full history, then updated by recomputing only the
+    groups touched by newly ingested sessions. sessions maps each (Year,
+    Round) to a digest of its rows, so a session that was refetched with
+    different rows (e.g. a partial session completed later) is recognised.
+    """
+
+    def __init__(self, tables, sessions=None):
+        self.tables = tables
+        self.sessions = sessions
+
+    @classmethod
+    def build(cls, data):
+        """Compute every rollup from the cleaned history"""
+        tables = {
+            level: summarize_groups(data, key)
+            for level, key in AGGREGATE_LEVELS.items()
+            if key in data
+        }
+        return cls(tables, _sessions(data))
+
+    def update(self, data):
+        """Return aggregates for data, recomputing only groups with new sessions"""
+        sessions = _sessions(data)
+        if not self.sessions or sessions is None or not set(self.sessions).issubset(sessions):
+            return self.build(data)
+
+        # Groups a changed session used to contribute to are unknown, so rebuild
+        if any(self.sessions[key] != sessions[key] for key in self.sessions):
+            return self.build(data)
+
+        new_sessions = [key for key in sessions if key not in self.sessions]
+        if not new_sessions:
+            return self
+
+        added = pd.MultiIndex.from_tuples(new_sessions, names=SESSION_KEYS)
+        new_rows = data[pd.MultiIndex.from_frame(data[SESSION_KEYS].astype(int)).isin(added)]
+
+        tables = {}
+        for level, key in AGGREGATE_LEVELS.items():
+            if level not in self.tables:
+                continue
+            touched = new_rows[key].dropna().unique()
+            refreshed = summarize_groups(data[data[key].isin(touched)], key)
+            unchanged = self.tables[level][~self.tables[level][key].isin(touched)]
+            tables[level] = pd.concat([unchanged, refreshed], ignore_index=True)
+
+        return HistoricalAggregates(tables, sessions)
+
+    @property
+    def summary(self):
+        """Distinct circuits, drivers and teams in the history"""
+        return {
+            level: len(self.tables[level])
+            for level in ('circuit', 'driver', 'team')
+            if level in self.tables
+        }
+
+    def table(self, level, min_count=0):
+        """Rollup for one level, optionally limited to groups with min_count Q3 times"""
+        table = self.tables[level]
+        if min_count:
+            table = table[table['count'] >= min_count]
+        return table
+
+    def save(self, aggregate_dir=DEFAULT_AGGREGATE_DIR):
+        """Persist the rollups as Parquet with a JSON sidecar"""
+        os.makedirs(aggregate_dir, exist_ok=True)
+        for level, table in self.tables.items():
+            table.to_parquet(os.path.join(aggregate_dir, f"{level}.parquet"), index=False)
+        with open(os.path.join(aggregate_dir, "aggregates.json"), "w") as f:
+            sessions = None if self.sessions is None else [[*key, digest] for key, digest in self.sessions.items()]
+            json.dump({'levels': list(self.tables), 'sessions': sessions}, f)
+
+    @classmethod
+    def load(cls, aggregate_dir=DEFAULT_AGGREGATE_DIR):
+        """Load persisted rollups, or None if none were saved"""
+        meta_path = os.path.join(aggregate_dir, "aggregates.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        tables = {
+            level: pd.read_parquet(os.path.join(aggregate_dir, f"{level}.parquet"))
+            for level in meta['levels']
+        }
+        sessions = meta['sessions']
+        if sessions is not None:
+            # Rollups saved before sessions carried digests are rebuilt on the next update
+            sessions = {(entry[0], entry[1]): entry[2] if len(entry) > 2 else None for entry in sessions}
+        return cls(tables, sessions)
@@ -0,0 +1,338 @@
+"""
+API Module - JSON endpoints for the Next.js frontend
+
+Usage: python -m app.api [--host 127.0.0.1] [--port 8000]
+
+Endpoints (payloads follow lib/types.ts):
+    GET /api/predictions?circuit=Japan&mlModel=linear&mlWeight=0.7&weather=dry  -> PredictionData[]
+    GET /api/historical                                                         -> HistoricalData
+    GET /api/model-performance?mlModel=linear                                   -> ModelPerformanceData
+    GET /api/health
+    GET /metrics                                                                -> Prometheus text
+
+Responses are cached in-process per (endpoint, parameters, data version) and
+carry a strong ETag, so repeat requests from any client are answered from
+memory and revalidations with If-None-Match get an empty 304. The data version
+follows the on-disk session cache, so sessions ingested by other processes
+are picked up without restarting the server.
+"""
+import argparse
+import hashlib
+import json
+import os
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from app import instrumentation, shared_pipeline
+from app.constants import CIRCUITS, ML_MODEL_MAP, WEATHER_CONDITIONS
+from app.lru_cache import LRUCache
+
+# Maximum number of encoded responses kept in memory
+API_CACHE_SIZE = int(os.environ.get("F1QP_API_CACHE_SIZE", "256"))
+
+# Value of Access-Control-Allow-Origin for browser clients
+CORS_ORIGIN = os.environ.get("F1QP_API_CORS_ORIGIN", "*")
+
+# Actual vs predicted rows returned by /api/model-performance by default
+DEFAULT_PERFORMANCE_ROWS = 100
+
+MODEL_TYPES = list(ML_MODEL_MAP.values())
+
+_responses = LRUCache(max_entries=API_CACHE_SIZE)
+
+
+class ApiError(Exception):
+    """Request error reported to the client as a JSON body"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def format_lap_time(seconds):
+    """Format seconds as m:ss.sss, matching lib/mock-data.ts"""
+    minutes = int(seconds // 60)
+    return f"{minutes}:{seconds - minutes * 60:06.3f}"
+
+
+def prediction_payload(predictions):
+    """PredictionData[] for a HybridPredictor result, with interval half-widths if present"""
+    predictions = predictions.sort_values('Predicted_Q3').reset_index(drop=True)
+    times = predictions['Predicted_Q3'].astype(float)
+    gaps = times - times.iloc[0]
+    payload = [
+        {
+            'position': position,
+            'driver': str(driver),
+            'team': str(team),
+            'time': format_lap_time(time),
+            'gap': "POLE" if position == 1 else f"+{gap:.3f}s",
+            'rawTime': round(time, 3)
+        }
+        for position, driver, team, time, gap in zip(
+            range(1, len(predictions) + 1), predictions['Driver'], predictions['Team'], times, gaps
+        )
+    ]
+    if 'Uncertainty' in predictions:
+        for row, uncertainty in zip(payload, predictions['Uncertainty'].astype(float)):
+            row['uncertainty'] = round(uncertainty, 3)
+    return payload
+
+
+def historical_payload(aggregates):
+    """HistoricalData for the stored rollups"""
+    def rows(level, columns):
+        table = aggregates.table(level).sort_values('mean')
+        return [
+            {**{name: str(row[column]) for name, column in columns.items()}, 'averageTime': round(float(row['mean']), 3)}
+            for _, row in table.iterrows()
+        ]
+
+    summary = aggregates.summary
+    sessions = len(aggregates.sessions) if aggregates.sessions is not None else summary.get('circuit', 0)
+    return {
+        'summary': {
+            'sessions': sessions,
+            'drivers': summary.get('driver', 0),
+            'teams': summary.get('team', 0)
+        },
+        'circuitData': rows('circuit', {'name': 'Circuit'}),
+        'driverData': rows('driver', {'name': 'Driver', 'team': 'Team'}),
+        'teamData': rows('team', {'name': 'Team'})
+    }
+
+
+def model_performance_payload(metrics, cv_metrics, metadata, actual, predicted, limit=DEFAULT_PERFORMANCE_ROWS):
+    """ModelPerformanceData for held-out predictions"""
+    sample = pd.DataFrame({
+        'driver': metadata['Driver'].astype(str).values,
+        'circuit': metadata['Circuit'].astype(str).values,
+        'actual': pd.Series(actual).astype(float).round(3).values,
+        'predicted': pd.Series(predicted).astype(float).round(3).values
+    }).head(limit)
+    return {
+        'metrics': {name: float(metrics[name]) for name in ('mae', 'rmse', 'r2')},
+        'cv': {name: float(cv_metrics[name]) for name in ('mae_mean', 'mae_std', 'r2_mean', 'r2_std')},
+        'predictions': sample.to_dict(orient='records')
+    }
+
+
+def _param(query, name, default=None):
+    values = query.get(name)
+    return values[-1] if values else default
+
+
+def _choice(query, name, choices, default):
+    value = _param(query, name, default)
+    if value not in choices:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be one of: {', '.join(choices)}")
+    return value
+
+
+def _weight(query):
+    value = _param(query, 'mlWeight', '0.7')
+    try:
+        weight = float(value)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "mlWeight must be a number") from None
+    if not 0.0 <= weight <= 1.0:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "mlWeight must be between 0 and 1")
+    return round(weight, 1)
+
+
+def _training_features():
+    X, y, metadata = shared_pipeline.training_features()
+    if X is None:
+        raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE, "No historical data available")
+    return X, y, metadata
+
+
+def predictions_endpoint(query):
+    """Predicted qualifying order for one circuit and set of controls"""
+    circuit = _choice(query, 'circuit', CIRCUITS, 'Japan')
+    model_type = _choice(query, 'mlModel', MODEL_TYPES, 'linear')
+    weather = _choice(query, 'weather', WEATHER_CONDITIONS, 'dry')
+    ml_weight = _weight(query)
+    key = (circuit, model_type, weather, ml_weight)
+
+    def compute():
+        predictions = shared_pipeline.precomputed_predictions(model_type, circuit, weather, ml_weight)
+        if predictions is None:
+            from src.predictors import HybridPredictor
+            from app.batch_predictions import predict_scenario
+
+            X, y, _ = _training_features()
+            predictor = HybridPredictor(ml_model=shared_pipeline.trained_model(model_type, X, y))
+            predictions = predict_scenario(predictor, circuit, weather, ml_weight)
+        if predictions is None or predictions.empty:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"No predictions available for {circuit}")
+        return prediction_payload(shared_pipeline.with_intervals(predictions, model_type, ml_weight))
+
+    return key, compute
+
+
+def historical_endpoint(query):
+    """Rollups of the cleaned qualifying history"""
+    def compute():
+        aggregates = shared_pipeline.historical_aggregates()
+        if aggregates is None:
+            raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE, "No historical data available")
+        return historical_payload(aggregates)
+
+    return (), compute
+
+
+def model_performance_endpoint(query):
+    """Held-out metrics, cross-validation and sample predictions for one model type"""
+    model_type = _choice(query, 'mlModel', MODEL_TYPES, 'linear')
+    try:
+        limit = int(_param(query, 'limit', DEFAULT_PERFORMANCE_ROWS))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "limit must be an integer") from None
+
+    def compute():
+        from sklearn.model_selection import train_test_split
+
+        X, y, metadata = _training_features()
+        X_train, X_test, y_train, y_test, _, meta_test = train_test_split(
+            X, y, metadata, test_size=0.2, random_state=42
+        )
+        model = shared_pipeline.evaluation_model(model_type, X_train, y_train)
+        predictor = shared_pipeline.evaluation_predictor(model_type, X_train, y_train) or model
+        with instrumentation.stage('predict', model_type=model_type, rows=len(X_test)):
+            predicted = predictor.predict(X_test)
+        return model_performance_payload(
+            model.evaluate(X_test, y_test), model.cross_validate(X, y),
+            meta_test, y_test, predicted, limit
+        )
+
+    return (model_type, limit), compute
+
+
+ENDPOINTS = {
+    '/api/predictions': predictions_endpoint,
+    '/api/historical': historical_endpoint,
+    '/api/model-performance': model_performance_endpoint
+}
+
+
+def cached_response(path, query):
+    """Return (body bytes, ETag) for an endpoint, computing it once per data version.
+
+    Sessions ingested by another process (the app's Refresh Data, the CLI)
+    change the session cache on disk; the history is then reloaded, so the
+    data version, the cache key and the ETag change with it.
+    """
+    shared_pipeline.reload_if_changed()
+    params, compute = ENDPOINTS[path](query)
+    key = (path, params, shared_pipeline.data_version())
+
+    def encode():
+        body = json.dumps(compute(), separators=(',', ':')).encode()
+        return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    return _responses.get_or_compute(key, encode)
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or etag in tags or f"W/{etag}" in tags
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """Serve the JSON endpoints with conditional-GET support"""
+
+    server_version = "F1QualiPredictorAPI/1.0"
+    verbose = False
+
+    def _send(self, status, body=b"", content_type="application/json", etag=None):
+        self.send_response(status)
+        self.send_header("Access-Control-Allow-Origin", CORS_ORIGIN)
+        self.send_header("Access-Control-Expose-Headers", "ETag")
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD" and status != HTTPStatus.NOT_MODIFIED:
+            self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({'error': message}).encode())
+
+    def do_OPTIONS(self):
+        self.send_response(HTTPStatus.NO_CONTENT)
+        self.send_header("Access-Control-Allow-Origin", CORS_ORIGIN)
+        self.send_header("Access-Control-Allow-Methods", "GET, HEAD, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "If-None-Match")
+        self.send_header("Access-Control-Max-Age", "86400")
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path.rstrip('/') or '/'
+
+        if path == '/api/health':
+            self._send(HTTPStatus.OK, b'{"status":"ok"}')
+            return
+        if path == '/metrics':
+            self._send(HTTPStatus.OK, instrumentation.prometheus_text().encode(), "text/plain; version=0.0.4")
+            return
+        if path not in ENDPOINTS:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown endpoint {path}")
+            return
+
+        try:
+            body, etag = cached_response(path, parse_qs(url.query))
+        except ApiError as e:
+            self._send_error(e.status, e.message)
+            return
+        except Exception as e:
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}")
+            return
+
+        if _etag_matches(self.headers.get("If-None-Match"), etag):
+            self._send(HTTPStatus.NOT_MODIFIED, etag=etag)
+        else:
+            self._send(HTTPStatus.OK, body, etag=etag)
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=8000, verbose=False):
+    """Create the threaded API server without starting it"""
+    handler = type("Handler", (ApiHandler,), {'verbose': verbose})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve F1 qualifying predictions as JSON")
+    parser.add_argument("--host", default=os.environ.get("F1QP_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("F1QP_API_PORT", "8000")))
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.verbose)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
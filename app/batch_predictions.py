@@ -0,0 +1,88 @@
+"""
+Batch Predictions Module - Predict many (circuit, weather, ml_weight) scenarios in one call
+"""
+import inspect
+import itertools
+
+import pandas as pd
+
+from app import instrumentation
+from app.constants import CIRCUITS, WEATHER_CONDITIONS
+
+SCENARIO_COLUMNS = ['Circuit', 'Weather', 'ML_Weight']
+
+
+def scenario_grid(circuits=None, weathers=None, ml_weights=(None,)):
+    """Cartesian product of circuits, weather conditions and ML weights"""
+    circuits = CIRCUITS if circuits is None else circuits
+    weathers = WEATHER_CONDITIONS if weathers is None else weathers
+    return pd.DataFrame(
+        list(itertools.product(circuits, weathers, ml_weights)),
+        columns=SCENARIO_COLUMNS
+    )
+
+
+def _to_scenario_frame(scenarios):
+    if isinstance(scenarios, pd.DataFrame):
+        frame = scenarios.copy()
+        if 'ML_Weight' not in frame:
+            frame['ML_Weight'] = None
+        return frame[SCENARIO_COLUMNS]
+
+    rows = []
+    for scenario in scenarios:
+        scenario = tuple(scenario)
+        if len(scenario) == 2:
+            scenario = scenario + (None,)
+        rows.append(scenario)
+    return pd.DataFrame(rows, columns=SCENARIO_COLUMNS)
+
+
+def accepts_ml_weight(predictor):
+    """Check whether predict_future_race takes an ml_weight argument"""
+    try:
+        return 'ml_weight' in inspect.signature(predictor.predict_future_race).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def predict_scenario(predictor, circuit, weather, ml_weight=None):
+    """Run HybridPredictor.predict_future_race for one scenario"""
+    with instrumentation.stage('predict', circuit=circuit, weather=weather):
+        if ml_weight is not None and accepts_ml_weight(predictor):
+            return predictor.predict_future_race(circuit, weather=weather, ml_weight=ml_weight)
+        return predictor.predict_future_race(circuit, weather=weather)
+
+
+def predict_future_races(predictor, scenarios):
+    """Predict every scenario and return one long-format DataFrame.
+
+    scenarios is a DataFrame with Circuit/Weather/ML_Weight columns or an
+    iterable of (circuit, weather[, ml_weight]) tuples. Duplicate scenarios
+    are predicted once, and when the predictor does not take an ml_weight,
+    all weights of a (circuit, weather) pair share a single prediction.
+    """
+    frame = _to_scenario_frame(scenarios)
+    if frame.empty:
+        return pd.DataFrame()
+
+    weighted = accepts_ml_weight(predictor)
+    results = {}
+    frames = []
+    for circuit, weather, ml_weight in frame.drop_duplicates().itertuples(index=False):
+        ml_weight = None if pd.isnull(ml_weight) else float(ml_weight)
+        key = (circuit, weather, ml_weight if weighted else None)
+        if key not in results:
+            results[key] = predict_scenario(predictor, circuit, weather, ml_weight)
+
+        predictions = results[key]
+        if predictions is None or predictions.empty:
+            continue
+        frames.append(predictions.assign(Circuit=circuit, Weather=weather, ML_Weight=ml_weight))
+
+    if not frames:
+        return pd.DataFrame()
+
+    combined = pd.concat(frames, ignore_index=True)
+    leading = SCENARIO_COLUMNS + [c for c in combined.columns if c not in SCENARIO_COLUMNS]
+    return combined[leading]
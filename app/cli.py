@@ -0,0 +1,130 @@
+"""
+CLI Module - Headless fetch -> train -> predict runner
+
+Usage: python -m app.cli --circuits Japan Monaco --models linear rf --output predictions.csv
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src.predictors import HybridPredictor
+from app.batch_predictions import predict_future_races, scenario_grid
+from app.constants import CIRCUITS, ML_MODEL_MAP, WEATHER_CONDITIONS
+from app.data_cache import DEFAULT_CACHE_DIR, CachedDataFetcher
+from app.model_registry import default_registry
+from app.staged_processor import MemoizedDataProcessor
+
+OUTPUT_FORMATS = ('csv', 'parquet', 'json')
+
+
+def load_history(cache_dir=DEFAULT_CACHE_DIR, offline=False, incremental=True, verbose=False):
+    """Fetch the qualifying history, or None if nothing could be fetched"""
+    fetcher = CachedDataFetcher(cache_dir=cache_dir, offline=offline)
+    if incremental:
+        return fetcher.fetch_incremental(verbose=verbose)
+    return fetcher.fetch_recent_seasons(verbose=verbose)
+
+
+def load_training_features(cache_dir=DEFAULT_CACHE_DIR, offline=False, incremental=True, verbose=False):
+    """Fetch the history and return (X, y, metadata), or None if nothing could be fetched"""
+    historical_data = load_history(cache_dir, offline, incremental, verbose)
+    if historical_data is None:
+        return None
+    return MemoizedDataProcessor().run(historical_data)
+
+
+def predict_for_model(model_type, X, y, scenarios):
+    """Train, update or load one model type and predict every scenario with it"""
+    registry = default_registry()
+    model = registry.get_or_update(model_type, X, y)
+    if registry.last_report is not None:
+        print(registry.last_report.summary())
+    predictor = HybridPredictor(ml_model=model)
+    predictions = predict_future_races(predictor, scenarios)
+    predictions.insert(0, 'Model', model_type)
+    return predictions
+
+
+def run_pipeline(circuits, model_types, weathers, ml_weights=(None,), workers=1,
+                 cache_dir=DEFAULT_CACHE_DIR, offline=False, verbose=False):
+    """Run the full pipeline and return one DataFrame of predictions"""
+    features = load_training_features(cache_dir=cache_dir, offline=offline, verbose=verbose)
+    if features is None:
+        return None
+    X, y, _ = features
+
+    scenarios = scenario_grid(circuits, weathers, ml_weights)
+    if workers <= 1 or len(model_types) == 1:
+        frames = [predict_for_model(model_type, X, y, scenarios) for model_type in model_types]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(model_types))) as executor:
+            futures = [
+                executor.submit(predict_for_model, model_type, X, y, scenarios)
+                for model_type in model_types
+            ]
+            frames = [future.result() for future in futures]
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_predictions(predictions, output, output_format=None):
+    """Write predictions as CSV, Parquet or JSON, inferring the format from the extension"""
+    if output_format is None:
+        output_format = os.path.splitext(output)[1].lstrip('.').lower() or 'csv'
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if output_format == 'csv':
+        predictions.to_csv(output, index=False)
+    elif output_format == 'parquet':
+        predictions.to_parquet(output, index=False)
+    else:
+        predictions.to_json(output, orient='records', indent=2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run F1 qualifying predictions without the Streamlit UI")
+    parser.add_argument("--circuits", nargs="+", default=CIRCUITS, choices=CIRCUITS, metavar="CIRCUIT",
+                        help="Circuits to predict (default: all)")
+    parser.add_argument("--models", nargs="+", default=["linear"], choices=sorted(ML_MODEL_MAP.values()),
+                        help="ML model types to run (default: linear)")
+    parser.add_argument("--weather", nargs="+", default=["dry"], choices=WEATHER_CONDITIONS,
+                        help="Weather conditions (default: dry)")
+    parser.add_argument("--ml-weights", nargs="+", type=float, default=[None],
+                        help="ML weights to predict with, if the predictor supports them")
+    parser.add_argument("--output", "-o", default="predictions.csv",
+                        help="Output file; format inferred from the extension (csv, parquet, json)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="Override the output format")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes used to train and predict model types in parallel")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Session cache directory")
+    parser.add_argument("--offline", action="store_true", help="Only use the local session cache")
+    parser.add_argument("--verbose", "-v", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    predictions = run_pipeline(
+        args.circuits, args.models, args.weather, args.ml_weights,
+        workers=args.workers, cache_dir=args.cache_dir, offline=args.offline, verbose=args.verbose
+    )
+    if predictions is None or predictions.empty:
+        print("Failed to fetch historical data.", file=sys.stderr)
+        return 1
+
+    write_predictions(predictions, args.output, args.format)
+    print(f"Wrote {len(predictions)} predictions to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
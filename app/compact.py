@@ -0,0 +1,54 @@
+"""
+Compact Module - Memory-efficient canonical representation of qualifying frames
+"""
+import numpy as np
+import pandas as pd
+
+# Identifier columns stored as dictionary-encoded categoricals
+CATEGORICAL_COLUMNS = ['Driver', 'Team', 'Circuit']
+
+# Integer columns and their narrowest safe dtype
+INTEGER_COLUMNS = {'Year': 'int16', 'Round': 'int8'}
+
+TIME_COLUMNS = ['Q1', 'Q2', 'Q3']
+
+
+def compact_frame(frame):
+    """Return frame in the canonical compact layout.
+
+    Identifiers become categoricals, seconds and other float columns become
+    float32, session keys use narrow integers, and timedelta columns are
+    dropped once an equivalent <name>_sec column exists. Columns are converted
+    in place on a shallow copy, so unchanged columns are not duplicated.
+    """
+    compact = frame.copy(deep=False)
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in compact and not isinstance(compact[column].dtype, pd.CategoricalDtype):
+            compact[column] = compact[column].astype('category')
+
+    for column, dtype in INTEGER_COLUMNS.items():
+        if column in compact and compact[column].notnull().all():
+            compact[column] = compact[column].astype(dtype)
+
+    redundant = [
+        column for column in TIME_COLUMNS
+        if column in compact and f"{column}_sec" in compact
+        and pd.api.types.is_timedelta64_dtype(compact[column])
+    ]
+    compact = compact.drop(columns=redundant)
+
+    for column in compact.columns:
+        if compact[column].dtype == np.float64:
+            compact[column] = compact[column].astype(np.float32)
+
+    return compact
+
+
+def bytes_per_session(frame):
+    """Deep memory footprint of frame divided by its number of qualifying sessions"""
+    if {'Year', 'Round'}.issubset(frame.columns):
+        sessions = len(frame[['Year', 'Round']].drop_duplicates())
+    else:
+        sessions = frame['Circuit'].nunique()
+    return frame.memory_usage(deep=True).sum() / max(sessions, 1)
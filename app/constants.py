@@ -0,0 +1,45 @@
+"""
+Constants Module - Circuits and model options shared by the UI and batch tools
+"""
+
+CIRCUITS = [
+    "Bahrain", "Saudi Arabia", "Australia", "Japan", "China",
+    "Miami", "Emilia Romagna", "Monaco", "Canada", "Spain",
+    "Austria", "Great Britain", "Hungary", "Belgium", "Netherlands",
+    "Italy", "Azerbaijan", "Singapore", "United States", "Mexico",
+    "Brazil", "Las Vegas", "Qatar", "Abu Dhabi"
+]
+
+# FastF1 event names whose circuit label is not the name without "Grand Prix"
+EVENT_CIRCUITS = {
+    "Saudi Arabian Grand Prix": "Saudi Arabia",
+    "Australian Grand Prix": "Australia",
+    "Japanese Grand Prix": "Japan",
+    "Chinese Grand Prix": "China",
+    "Canadian Grand Prix": "Canada",
+    "Spanish Grand Prix": "Spain",
+    "Austrian Grand Prix": "Austria",
+    "British Grand Prix": "Great Britain",
+    "Hungarian Grand Prix": "Hungary",
+    "Belgian Grand Prix": "Belgium",
+    "Dutch Grand Prix": "Netherlands",
+    "Italian Grand Prix": "Italy",
+    "Mexico City Grand Prix": "Mexico",
+    "Mexican Grand Prix": "Mexico",
+    "São Paulo Grand Prix": "Brazil",
+    "Brazilian Grand Prix": "Brazil",
+    "French Grand Prix": "France"
+}
+
+WEATHER_CONDITIONS = ["dry", "damp", "wet"]
+
+# ML weight slider values in the sidebar
+ML_WEIGHTS = [round(i / 10, 1) for i in range(11)]
+
+# Map ML algorithm labels to QualifyingModel model types
+ML_MODEL_MAP = {
+    "Linear Regression": "linear",
+    "Ridge Regression": "ridge",
+    "Random Forest": "rf",
+    "Gradient Boosting": "gbm"
+}
@@ -0,0 +1,480 @@
+"""
+Data Cache Module - Persistent on-disk cache for qualifying sessions
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from app.constants import EVENT_CIRCUITS
+from app.file_lock import file_lock
+
+# Default location of the session cache, overridable via environment
+DEFAULT_CACHE_DIR = os.environ.get("F1QP_CACHE_DIR", os.path.join("cache", "qualifying"))
+
+# Columns of the frame returned by fetch_recent_seasons
+SESSION_COLUMNS = ['Year', 'Round', 'Circuit', 'Driver', 'Team', 'Position', 'Q1', 'Q2', 'Q3']
+
+# Number of seasons treated as "recent" when none are given
+DEFAULT_SEASON_COUNT = 3
+
+# Concurrent session downloads, overridable via environment
+DEFAULT_FETCH_WORKERS = int(os.environ.get("F1QP_FETCH_WORKERS", "4"))
+
+# Layout version of cached sessions; caches of another version are refetched.
+# Version 2 labels circuits by event instead of by country.
+SESSION_SCHEMA = 2
+
+
+def default_seasons():
+    """Return the most recent seasons, including the current one"""
+    current_year = datetime.now(timezone.utc).year
+    return list(range(current_year - DEFAULT_SEASON_COUNT, current_year + 1))
+
+
+def circuit_name(event_name):
+    """Circuit label of a FastF1 event, as used by the sidebar (e.g. "Miami", "Great Britain")"""
+    event_name = str(event_name)
+    if event_name in EVENT_CIRCUITS:
+        return EVENT_CIRCUITS[event_name]
+    return event_name[:-len(" Grand Prix")] if event_name.endswith(" Grand Prix") else event_name
+
+
+def load_event_schedule(year):
+    """Return the qualifying sessions of a season as a list of dicts"""
+    import fastf1
+
+    schedule = fastf1.get_event_schedule(year, include_testing=False)
+    events = []
+    for _, event in schedule.iterrows():
+        quali_date = None
+        for i in range(1, 6):
+            if event.get(f'Session{i}') == 'Qualifying':
+                quali_date = event.get(f'Session{i}DateUtc')
+                break
+        if quali_date is None or pd.isnull(quali_date):
+            quali_date = event['EventDate']
+
+        quali_date = pd.Timestamp(quali_date)
+        if quali_date.tzinfo is not None:
+            quali_date = quali_date.tz_convert('UTC').tz_localize(None)
+
+        events.append({
+            'year': int(year),
+            'round': int(event['RoundNumber']),
+            'circuit': circuit_name(event['EventName']),
+            'date': quali_date
+        })
+    return events
+
+
+def load_qualifying_session(year, round_number, session='Q'):
+    """Load a single qualifying session from FastF1"""
+    import fastf1
+
+    event_session = fastf1.get_session(year, round_number, session)
+    event_session.load(laps=False, telemetry=False, weather=False, messages=False)
+    results = event_session.results
+
+    return pd.DataFrame({
+        'Year': int(year),
+        'Round': int(round_number),
+        'Circuit': circuit_name(event_session.event['EventName']),
+        'Driver': results['FullName'].values,
+        'Team': results['TeamName'].values,
+        'Position': results['Position'].values,
+        'Q1': results['Q1'].values,
+        'Q2': results['Q2'].values,
+        'Q3': results['Q3'].values
+    })
+
+
+def is_session_complete(frame):
+    """Check whether a fetched session has a usable set of results"""
+    return frame is not None and len(frame) >= 10 and frame['Q3'].notnull().any()
+
+
+class SessionCache:
+    """Columnar cache storing one Parquet file per (year, round, session)"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        self.manifest = self._read_manifest()
+        self._lock = threading.Lock()
+        self._version = (None, None)
+
+    @staticmethod
+    def key(year, round_number, session='Q'):
+        """Build the manifest key for a session"""
+        return f"{int(year)}-{int(round_number):02d}-{session}"
+
+    def path(self, year, round_number, session='Q'):
+        """Return the Parquet path for a session"""
+        return os.path.join(self.cache_dir, str(int(year)), f"{int(round_number):02d}_{session}.parquet")
+
+    def _read_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        return {'sessions': {}}
+
+    def _write_manifest(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _update_manifest(self, change):
+        """Apply change to the latest manifest on disk and write it back.
+
+        Other processes (CLI workers, the job pool) update the same manifest,
+        so it is re-read and rewritten under a cross-process file lock.
+        """
+        with self._lock, file_lock(self.manifest_path):
+            self.manifest = self._read_manifest()
+            change(self.manifest)
+            self._write_manifest()
+
+    def version(self):
+        """Version of the cached sessions as stored on disk, or None for an empty cache.
+
+        It changes whenever any process stores or drops a session, so every
+        process reading the same cache directory agrees on it. The manifest is
+        only re-read when its modification time changed.
+        """
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if self._version[0] != stamp:
+            sessions = sorted(
+                (key, entry.get('fetched_at'), entry.get('rows'))
+                for key, entry in self._read_manifest()['sessions'].items()
+                if entry.get('schema', 1) == SESSION_SCHEMA
+            )
+            digest = hashlib.sha256(json.dumps(sessions).encode()).hexdigest()[:32] if sessions else None
+            self._version = (stamp, digest)
+        return self._version[1]
+
+    def entry(self, year, round_number, session='Q'):
+        """Return the manifest entry for a session, if cached"""
+        return self.manifest['sessions'].get(self.key(year, round_number, session))
+
+    def is_valid(self, year, round_number, session='Q'):
+        """A cached session is valid once it was stored with complete results"""
+        entry = self.entry(year, round_number, session)
+        return (
+            entry is not None
+            and entry.get('complete', False)
+            and entry.get('schema', 1) == SESSION_SCHEMA
+            and os.path.exists(self.path(year, round_number, session))
+        )
+
+    def read(self, year, round_number, session='Q'):
+        """Read a cached session, or None if it is not cached"""
+        path = self.path(year, round_number, session)
+        if not os.path.exists(path):
+            return None
+        return pd.read_parquet(path)
+
+    def write(self, year, round_number, frame, session='Q'):
+        """Store a session and record it in the manifest"""
+        path = self.path(year, round_number, session)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+        entry = {
+            'year': int(year),
+            'round': int(round_number),
+            'session': session,
+            'rows': int(len(frame)),
+            'complete': bool(is_session_complete(frame)),
+            'schema': SESSION_SCHEMA,
+            'fetched_at': datetime.now(timezone.utc).isoformat()
+        }
+        key = self.key(year, round_number, session)
+        self._update_manifest(lambda manifest: manifest['sessions'].update({key: entry}))
+
+    def invalidate(self, year, round_number, session='Q'):
+        """Drop a session from the cache so it is fetched again"""
+        def change(manifest):
+            manifest['sessions'].pop(self.key(year, round_number, session), None)
+            path = self.path(year, round_number, session)
+            if os.path.exists(path):
+                os.remove(path)
+
+        self._update_manifest(change)
+
+    @property
+    def history_path(self):
+        """Path of the merged historical dataset"""
+        return os.path.join(self.cache_dir, "history.parquet")
+
+    @property
+    def high_water_mark(self):
+        """Last ingested (year, round), or None before the first ingestion"""
+        mark = self.manifest.get('high_water_mark')
+        if not mark or self.manifest.get('history_schema', 1) != SESSION_SCHEMA:
+            return None
+        return (mark['year'], mark['round'])
+
+    def read_history(self):
+        """Read the merged historical dataset, or None if it was never stored in this layout"""
+        if not os.path.exists(self.history_path) or self.manifest.get('history_schema', 1) != SESSION_SCHEMA:
+            return None
+        return pd.read_parquet(self.history_path)
+
+    def write_history(self, frame, high_water_mark):
+        """Store the merged historical dataset and advance the high-water mark"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.history_path + ".tmp"
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.history_path)
+
+        def change(manifest):
+            if high_water_mark is not None:
+                manifest['high_water_mark'] = {
+                    'year': int(high_water_mark[0]),
+                    'round': int(high_water_mark[1])
+                }
+            elif manifest.get('history_schema', 1) != SESSION_SCHEMA:
+                # A mark left by an older layout does not describe this history
+                manifest.pop('high_water_mark', None)
+            manifest['history_schema'] = SESSION_SCHEMA
+
+        self._update_manifest(change)
+
+    def cached_sessions(self, seasons=None, session='Q'):
+        """Return (year, round) pairs available in the cache"""
+        pairs = []
+        with self._lock:
+            entries = list(self.manifest['sessions'].values())
+        for entry in entries:
+            if entry['session'] != session or entry.get('schema', 1) != SESSION_SCHEMA:
+                continue
+            if seasons is not None and entry['year'] not in seasons:
+                continue
+            pairs.append((entry['year'], entry['round']))
+        return sorted(pairs)
+
+
+class FetchReport:
+    """Outcome of a multi-session fetch"""
+
+    def __init__(self):
+        self.cached = []
+        self.fetched = []
+        self.failed = {}
+
+    @property
+    def ok(self):
+        """True when no session failed"""
+        return not self.failed
+
+    def summary(self):
+        """One-line description of the fetch"""
+        text = f"{len(self.cached)} cached, {len(self.fetched)} fetched, {len(self.failed)} failed"
+        if self.failed:
+            failed = ", ".join(f"{year} R{round_number}" for year, round_number in sorted(self.failed))
+            text += f" ({failed})"
+        return text
+
+
+class CachedDataFetcher:
+    """Drop-in replacement for DataFetcher backed by a SessionCache.
+
+    Sessions that are not cached are downloaded by a bounded thread pool,
+    with per-session retries and exponential backoff. Failures are recorded
+    in last_report instead of discarding the whole history. loader and
+    schedule_loader can be replaced by local stand-ins for the FastF1 backend.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, seasons=None, offline=None,
+                 loader=load_qualifying_session, schedule_loader=load_event_schedule,
+                 max_workers=DEFAULT_FETCH_WORKERS, retries=3, backoff=1.0):
+        self.cache = SessionCache(cache_dir)
+        self.seasons = list(seasons) if seasons is not None else default_seasons()
+        if offline is None:
+            offline = os.environ.get("F1QP_OFFLINE", "0") == "1"
+        self.offline = offline
+        self.loader = loader
+        self.schedule_loader = schedule_loader
+        self.max_workers = max(1, max_workers)
+        self.retries = retries
+        self.backoff = backoff
+        self.last_report = FetchReport()
+
+    def _held_sessions(self, seasons=None, verbose=False):
+        """Return (year, round) pairs of qualifying sessions that already took place"""
+        now = pd.Timestamp.now(tz='UTC').tz_localize(None)
+        held = []
+        for year in (self.seasons if seasons is None else seasons):
+            try:
+                schedule = self.schedule_loader(year)
+            except Exception as e:
+                if verbose:
+                    print(f"Could not load {year} schedule: {e}")
+                held.extend(self.cache.cached_sessions(seasons=[year]))
+                continue
+            held.extend((event['year'], event['round']) for event in schedule if event['date'] < now)
+        return sorted(set(held))
+
+    def _load_with_retry(self, year, round_number):
+        """Call the loader, retrying with exponential backoff"""
+        for attempt in range(self.retries + 1):
+            try:
+                return self.loader(year, round_number)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt))
+
+    def fetch_session(self, year, round_number, verbose=False, report=None):
+        """Return one session, from the cache when valid, otherwise from FastF1"""
+        report = report if report is not None else FetchReport()
+        if self.cache.is_valid(year, round_number) or self.offline:
+            report.cached.append((year, round_number))
+            return self.cache.read(year, round_number)
+
+        try:
+            frame = self._load_with_retry(year, round_number)
+        except Exception as e:
+            report.failed[(year, round_number)] = str(e)
+            if verbose:
+                print(f"Failed to fetch {year} round {round_number}: {e}")
+            # Fall back to a stale copy if one exists
+            return self.cache.read(year, round_number)
+
+        if frame is None or frame.empty:
+            report.failed[(year, round_number)] = "no results"
+            return None
+
+        self.cache.write(year, round_number, frame)
+        report.fetched.append((year, round_number))
+        if verbose:
+            print(f"Fetched {year} round {round_number} ({len(frame)} drivers)")
+        return frame
+
+    def fetch_sessions(self, sessions, verbose=False, progress=None):
+        """Fetch several sessions concurrently and return {(year, round): frame}.
+
+        progress, if given, is called with a 'session' event as each session
+        completes, in completion order.
+        """
+        report = FetchReport()
+        sessions = sorted(sessions)
+        frames = {}
+
+        def completed(pair, frame):
+            frames[pair] = frame
+            if progress is not None:
+                if pair in report.failed:
+                    status = 'failed'
+                elif pair in report.fetched:
+                    status = 'fetched'
+                else:
+                    status = 'cached'
+                progress({'event': 'session', 'completed': len(frames), 'total': len(sessions),
+                          'year': pair[0], 'round': pair[1], 'status': status})
+
+        if self.max_workers == 1 or len(sessions) <= 1:
+            for year, round_number in sessions:
+                completed((year, round_number), self.fetch_session(year, round_number, verbose, report))
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(self.fetch_session, year, round_number, verbose, report): (year, round_number)
+                    for year, round_number in sessions
+                }
+                for future in as_completed(futures):
+                    completed(futures[future], future.result())
+
+        self.last_report = report
+        if verbose and not report.ok:
+            print(f"Fetch finished with failures: {report.summary()}")
+
+        return {
+            pair: frames[pair] for pair in sessions
+            if frames[pair] is not None and not frames[pair].empty
+        }
+
+    def fetch_recent_seasons(self, verbose=True, progress=None):
+        """Fetch qualifying data for recent seasons, refetching only new or changed sessions"""
+        if self.offline:
+            sessions = self.cache.cached_sessions(seasons=self.seasons)
+        else:
+            sessions = self._held_sessions(verbose=verbose)
+
+        frames = self.fetch_sessions(sessions, verbose=verbose, progress=progress)
+        if not frames:
+            return None
+
+        return pd.concat(frames.values(), ignore_index=True)
+
+    def _last_complete(self, sessions):
+        """Return the end of the leading run of complete sessions.
+
+        Stopping at the first failed or partial session means it is picked up
+        again by the next incremental fetch.
+        """
+        last = None
+        for year, round_number in sorted(sessions):
+            if not self.cache.is_valid(year, round_number):
+                break
+            last = (year, round_number)
+        return last
+
+    def fetch_incremental(self, verbose=True, progress=None):
+        """Fetch only sessions newer than the high-water mark and merge them into the stored history"""
+        history = self.cache.read_history()
+        mark = self.cache.high_water_mark
+
+        if self.offline:
+            return history if history is not None else self.fetch_recent_seasons(verbose=verbose, progress=progress)
+
+        if history is None or mark is None:
+            sessions = self._held_sessions(verbose=verbose)
+            frames = self.fetch_sessions(sessions, verbose=verbose, progress=progress)
+            if not frames:
+                return None
+            history = pd.concat(frames.values(), ignore_index=True)
+            # Failed sessions are never cached, so the mark is taken over the schedule and stops before them
+            self.cache.write_history(history, self._last_complete(sessions))
+            return history
+
+        # Only seasons at or after the high-water mark can contain new sessions
+        seasons = [year for year in self.seasons if year >= mark[0]]
+        new_sessions = [
+            (year, round_number) for year, round_number in self._held_sessions(seasons, verbose=verbose)
+            if (year, round_number) > mark
+        ]
+        if not new_sessions:
+            if verbose:
+                print("Historical data is up to date")
+            return history
+
+        frames = self.fetch_sessions(new_sessions, verbose=verbose, progress=progress)
+        if not frames:
+            return history
+
+        # Replace any earlier partial copy of the refetched sessions
+        fetched = list(frames)
+        refetched = pd.MultiIndex.from_tuples(fetched)
+        stale = pd.MultiIndex.from_frame(history[['Year', 'Round']]).isin(refetched)
+        merged = pd.concat([history[~stale]] + list(frames.values()), ignore_index=True)
+
+        self.cache.write_history(merged, self._last_complete(new_sessions))
+
+        if verbose:
+            print(f"Ingested {len(fetched)} new qualifying sessions")
+        return merged
@@ -0,0 +1,135 @@
+"""
+Feature Store Module - Memory-mapped feature matrices with a sidecar schema
+"""
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from app.data_cache import DEFAULT_CACHE_DIR
+from app.model_registry import dataset_fingerprint
+
+# Default location of persisted feature matrices, overridable via environment
+DEFAULT_FEATURE_DIR = os.environ.get("F1QP_FEATURE_DIR", os.path.join(DEFAULT_CACHE_DIR, "features"))
+
+# Number of feature matrices kept on disk; older fingerprints are deleted after a save
+FEATURE_STORE_SIZE = int(os.environ.get("F1QP_FEATURE_STORE_SIZE", "4"))
+
+
+def _ensure_dir(path):
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def prune_features(feature_dir=DEFAULT_FEATURE_DIR, keep=FEATURE_STORE_SIZE, current=None):
+    """Delete all but the keep most recently saved feature matrices.
+
+    current, the matrix just saved or reused, is always kept and counts
+    towards keep.
+
+    Processes that still have a deleted matrix open keep reading it until
+    they close it; the files are removed once the last mapping goes away.
+    """
+    if not os.path.isdir(feature_dir):
+        return
+    stored = []
+    for entry in os.scandir(feature_dir):
+        if entry.name.startswith(".") or not entry.is_dir():
+            continue
+        try:
+            os.stat(os.path.join(entry.path, "schema.json"))
+            stored.append((entry.stat().st_mtime, entry.path))
+        except FileNotFoundError:
+            continue  # incomplete, or pruned by another process
+    stored.sort(reverse=True)
+    kept = 0 if current is None else 1
+    for _, path in stored:
+        if current is not None and os.path.basename(path) == os.path.basename(current):
+            continue
+        if kept < keep:
+            kept += 1
+        else:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def save_features(X, y, metadata=None, feature_dir=DEFAULT_FEATURE_DIR, keep=FEATURE_STORE_SIZE):
+    """Persist (X, y, metadata) as .npy arrays plus a JSON schema.
+
+    Matrices are written once per dataset fingerprint; an existing copy is
+    reused. After a save only the keep most recently used matrices are kept.
+    Returns the directory holding the arrays.
+    """
+    fingerprint = dataset_fingerprint(X, y)
+    path = os.path.join(feature_dir, fingerprint[:32])
+    if os.path.exists(os.path.join(path, "schema.json")):
+        try:
+            # Mark as recently used so pruning keeps it
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass  # pruned by another process in the meantime
+
+    tmp_path = tempfile.mkdtemp(prefix=".features-", dir=_ensure_dir(feature_dir))
+    dtype = np.result_type(*X.dtypes.values) if len(X.columns) else np.float64
+
+    matrix = np.lib.format.open_memmap(
+        os.path.join(tmp_path, "X.npy"), mode="w+", dtype=dtype, shape=X.shape
+    )
+    matrix[:] = X.to_numpy(dtype=dtype)
+    matrix.flush()
+    del matrix
+
+    np.save(os.path.join(tmp_path, "y.npy"), np.asarray(y))
+    np.save(os.path.join(tmp_path, "index.npy"), np.asarray(X.index))
+    if metadata is not None:
+        metadata.reset_index(drop=True).to_parquet(os.path.join(tmp_path, "metadata.parquet"), index=False)
+
+    schema = {
+        'fingerprint': fingerprint,
+        'columns': [str(c) for c in X.columns],
+        'dtype': np.dtype(dtype).str,
+        'column_dtypes': [np.dtype(t).str for t in X.dtypes],
+        'shape': list(X.shape),
+        'target': str(getattr(y, 'name', None) or 'y'),
+        'metadata': metadata is not None
+    }
+    with open(os.path.join(tmp_path, "schema.json"), "w") as f:
+        json.dump(schema, f, indent=2)
+
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # Another process stored the same features first
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    prune_features(feature_dir, keep, current=path)
+    return path
+
+
+def load_features(path, mmap_mode="r"):
+    """Open persisted features; X and y are views on memory-mapped files.
+
+    Columns stored in a wider dtype than they were saved with are cast back,
+    so X hashes the same as the frame that was saved; only those columns are
+    copied into memory.
+    """
+    with open(os.path.join(path, "schema.json")) as f:
+        schema = json.load(f)
+
+    matrix = np.load(os.path.join(path, "X.npy"), mmap_mode=mmap_mode)
+    index = pd.Index(np.load(os.path.join(path, "index.npy"), allow_pickle=True))
+    X = pd.DataFrame(matrix, columns=schema['columns'], index=index, copy=False)
+    column_dtypes = dict(zip(schema['columns'], schema.get('column_dtypes', [])))
+    narrowed = {c: t for c, t in column_dtypes.items() if np.dtype(t) != matrix.dtype}
+    if narrowed:
+        X = X.astype(narrowed)
+    y = pd.Series(np.load(os.path.join(path, "y.npy"), mmap_mode=mmap_mode), index=index,
+                  name=schema['target'], copy=False)
+
+    metadata = None
+    if schema['metadata']:
+        metadata = pd.read_parquet(os.path.join(path, "metadata.parquet"))
+        metadata.index = index
+    return X, y, metadata
@@ -0,0 +1,42 @@
+"""
+Figure Cache Module - Reuse rendered figures and HTML across Streamlit reruns
+"""
+import os
+
+from app.lru_cache import LRUCache
+from app.staged_processor import frame_fingerprint
+
+# Maximum number of rendered views kept in memory
+FIGURE_CACHE_SIZE = int(os.environ.get("F1QP_FIGURE_CACHE_SIZE", "64"))
+
+_figures = LRUCache(max_entries=FIGURE_CACHE_SIZE)
+
+
+def figure_cache():
+    """Return the process-wide figure cache"""
+    return _figures
+
+
+def view_key(kind, predictions, circuit):
+    """Cache key of a view of a predictions frame"""
+    return (kind, circuit, frame_fingerprint(predictions))
+
+
+def cached_figure(kind, predictions, circuit, build):
+    """Return a Plotly figure as a dict, building it only for unseen predictions.
+
+    The dict is passed straight to st.plotly_chart, so a cache hit costs no
+    figure reconstruction. It is shared across reruns and must not be mutated.
+    """
+    return _figures.get_or_compute(
+        view_key(kind, predictions, circuit),
+        lambda: build(predictions, circuit).to_dict()
+    )
+
+
+def cached_html(kind, predictions, circuit, build):
+    """Return an HTML snippet, building it only for unseen predictions"""
+    return _figures.get_or_compute(
+        view_key(kind, predictions, circuit),
+        lambda: build(predictions, circuit)
+    )
@@ -0,0 +1,46 @@
+"""
+File Lock Module - Cross-process locks around read-modify-write of shared JSON files
+
+The session manifest and the model registry index are updated by the
+Streamlit server, the CLI worker processes and the job pool at the same
+time. Holding file_lock(path) while re-reading, changing and rewriting the
+file keeps concurrent updates from overwriting each other.
+"""
+import contextlib
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+# Process-local locks per path, which also serialize threads where fcntl is unavailable
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(path):
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on path (via path + '.lock') for the duration of the block.
+
+    The lock is not reentrant; do not nest file_lock calls for the same path.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with _thread_lock(path):
+        with open(path + ".lock", "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
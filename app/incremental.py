@@ -0,0 +1,172 @@
+"""
+Incremental Training Module - Warm-start rf/gbm ensembles on newly ingested sessions
+"""
+import copy
+
+import numpy as np
+
+# Model types whose ensembles can grow with warm_start
+WARM_START_MODEL_TYPES = ('rf', 'gbm')
+
+# Estimators added per update, as a fraction of the ensemble size at the last rebuild
+DEFAULT_GROWTH = 0.1
+
+# Total growth since the last rebuild after which a full rebuild is required
+DEFAULT_MAX_GROWTH = 1.0
+
+# Relative increase of the error on new rows over the baseline that counts as drift
+DEFAULT_DRIFT_TOLERANCE = 0.5
+
+# Weight of the newest batch in the moving-average baseline error
+BASELINE_SMOOTHING = 0.3
+
+# Number of already-seen rows fitted together with the new rows
+DEFAULT_HISTORY_WINDOW = 1000
+
+# Progress events emitted while an ensemble is built
+DEFAULT_PROGRESS_STEPS = 10
+
+
+class RetrainReport:
+    """Outcome of an incremental training step"""
+
+    def __init__(self, model_type, new_rows):
+        self.model_type = model_type
+        self.new_rows = new_rows
+        self.mode = 'unchanged'
+        self.added_estimators = 0
+        self.total_estimators = None
+        self.mae_before = None
+        self.mae_after = None
+        self.baseline_mae = None
+        self.needs_rebuild = False
+        self.reason = None
+
+    def summary(self):
+        """One-line description of the update"""
+        text = f"{self.model_type}: {self.mode}, {self.new_rows} new rows"
+        if self.added_estimators:
+            text += f", +{self.added_estimators} estimators ({self.total_estimators} total)"
+        if self.mae_before is not None:
+            text += f", MAE on new rows {self.mae_before:.3f}"
+        if self.mae_after is not None:
+            text += f" -> {self.mae_after:.3f}"
+        if self.needs_rebuild:
+            text += f"; full rebuild needed ({self.reason})"
+        return text
+
+
+def final_estimator(model):
+    """The sklearn estimator of a QualifyingModel, unwrapping a Pipeline"""
+    estimator = model.model
+    return estimator.steps[-1][1] if hasattr(estimator, 'steps') else estimator
+
+
+def _transform(model, X):
+    estimator = model.model
+    if hasattr(estimator, 'steps') and len(estimator.steps) > 1:
+        # Keep fitted preprocessing (e.g. a scaler) fixed so old trees stay valid
+        return estimator[:-1].transform(X)
+    return X
+
+
+def supports_warm_start(model):
+    """Whether model's estimator can grow its ensemble in place"""
+    return hasattr(final_estimator(model), 'warm_start') and hasattr(final_estimator(model), 'n_estimators')
+
+
+def train_with_progress(model, X, y, progress=None, steps=DEFAULT_PROGRESS_STEPS):
+    """Train model, reporting 'estimators' events while an ensemble grows.
+
+    rf/gbm ensembles are built in steps with warm_start, which yields the
+    same trees as a single fit with the same random_state. Other models, or
+    calls without a progress callback, train in one call, as do models whose
+    train() replaces the estimator instead of refitting it.
+    """
+    if progress is None or not supports_warm_start(model):
+        model.train(X, y)
+        return model
+
+    estimator = final_estimator(model)
+    total = estimator.n_estimators
+    sizes = sorted({max(1, round(total * step / steps)) for step in range(1, steps + 1)})
+    model_type = getattr(model, 'model_type', type(estimator).__name__)
+    try:
+        for size in sizes:
+            estimator.set_params(warm_start=size > sizes[0], n_estimators=size)
+            model.train(X, y)
+            if final_estimator(model) is not estimator:
+                # train() built a new estimator, so the steps would not accumulate
+                break
+            progress({'event': 'estimators', 'completed': size, 'total': total, 'model_type': model_type})
+        else:
+            return model
+    finally:
+        estimator.set_params(warm_start=False, n_estimators=total)
+
+    # The new estimator may have been cloned from the shrunk one; train the full ensemble once
+    final_estimator(model).set_params(warm_start=False, n_estimators=total)
+    model.train(X, y)
+    progress({'event': 'estimators', 'completed': total, 'total': total, 'model_type': model_type})
+    return model
+
+
+def warm_start_update(model, X, y, n_new, base_estimators=None, baseline_mae=None,
+                      growth=DEFAULT_GROWTH, max_growth=DEFAULT_MAX_GROWTH,
+                      drift_tolerance=DEFAULT_DRIFT_TOLERANCE, history_window=DEFAULT_HISTORY_WINDOW):
+    """Grow a trained rf/gbm model with the last n_new rows of (X, y).
+
+    New estimators are fitted on the new rows plus the history_window rows
+    before them, so the cost of an update does not grow with the history.
+    The model passed in is left untouched; returns (updated model, report).
+    Instead of updating, the report flags a full rebuild when the error on
+    the new rows drifted beyond drift_tolerance of baseline_mae (a moving
+    average of earlier out-of-sample batch errors), or when the ensemble
+    would grow by more than max_growth since base_estimators.
+    """
+    from sklearn.metrics import mean_absolute_error
+
+    model_type = getattr(model, 'model_type', type(final_estimator(model)).__name__)
+    report = RetrainReport(model_type, n_new)
+    if n_new <= 0:
+        return model, report
+
+    y = np.asarray(y)
+    X_new, y_new = X.iloc[-n_new:], y[-n_new:]
+    report.mae_before = float(mean_absolute_error(y_new, model.predict(X_new)))
+    report.baseline_mae = baseline_mae if baseline_mae is not None else report.mae_before
+
+    if not supports_warm_start(model):
+        report.needs_rebuild = True
+        report.reason = "model does not support warm start"
+        return model, report
+
+    if report.mae_before > report.baseline_mae * (1 + drift_tolerance):
+        report.needs_rebuild = True
+        report.reason = f"error on new rows drifted {report.mae_before / report.baseline_mae - 1:.0%} above baseline"
+        return model, report
+
+    current = final_estimator(model).n_estimators
+    base_estimators = base_estimators or current
+    added = max(1, int(round(base_estimators * growth)))
+    if current + added > base_estimators * (1 + max_growth):
+        report.needs_rebuild = True
+        report.reason = f"ensemble would grow from {base_estimators} to {current + added} estimators"
+        return model, report
+
+    updated = copy.deepcopy(model)
+    estimator = final_estimator(updated)
+    window = slice(max(len(X) - n_new - history_window, 0), len(X))
+    estimator.set_params(warm_start=True, n_estimators=current + added)
+    try:
+        estimator.fit(_transform(updated, X.iloc[window]), y[window])
+    finally:
+        estimator.set_params(warm_start=False)
+
+    report.mode = 'warm_start'
+    report.added_estimators = added
+    report.total_estimators = current + added
+    report.mae_after = float(mean_absolute_error(y_new, updated.predict(X_new)))
+    # A single weekend is noisy, so drift is judged against a moving average
+    report.baseline_mae = (1 - BASELINE_SMOOTHING) * report.baseline_mae + BASELINE_SMOOTHING * report.mae_before
+    return updated, report
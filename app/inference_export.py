@@ -0,0 +1,193 @@
+"""
+Inference Export Module - Serve trained models with NumPy alone
+
+export_model turns a trained QualifyingModel (or a bare scikit-learn
+estimator) into a dict of plain NumPy arrays: coefficients for linear and
+ridge models, flattened node arrays for random forests and gradient boosting.
+NumpyPredictor evaluates such an artifact without importing scikit-learn.
+"""
+import numpy as np
+
+# Marks a leaf in the flattened child arrays, as in sklearn.tree._tree.TREE_LEAF
+LEAF = -1
+
+ARTIFACT_VERSION = 1
+
+
+def _steps(model):
+    estimator = getattr(model, 'model', model)
+    if hasattr(estimator, 'steps'):
+        return [step for _, step in estimator.steps if step is not None and step != 'passthrough']
+    return [estimator]
+
+
+def _export_scaler(scaler):
+    name = type(scaler).__name__
+    if name != 'StandardScaler':
+        raise ValueError(f"Cannot export preprocessing step {name}")
+    n_features = scaler.n_features_in_
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+    return np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64)
+
+
+def _flatten_trees(trees):
+    """Concatenate fitted sklearn trees into one set of node arrays"""
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        tree = tree.tree_
+        roots.append(offset)
+        feature.append(tree.feature)
+        threshold.append(tree.threshold)
+        # Child indices become global; leaves keep LEAF
+        left.append(np.where(tree.children_left == LEAF, LEAF, tree.children_left + offset))
+        right.append(np.where(tree.children_right == LEAF, LEAF, tree.children_right + offset))
+        value.append(tree.value[:, 0, 0])
+        offset += tree.node_count
+
+    return {
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'value': np.concatenate(value).astype(np.float64),
+        'roots': np.asarray(roots, dtype=np.int32)
+    }
+
+
+def _export_estimator(estimator):
+    name = type(estimator).__name__
+
+    if hasattr(estimator, 'coef_') and hasattr(estimator, 'intercept_'):
+        return {
+            'kind': 'linear',
+            'coef': np.asarray(estimator.coef_, dtype=np.float64).ravel(),
+            'intercept': np.float64(np.ravel(estimator.intercept_)[0])
+        }
+
+    if name in ('RandomForestRegressor', 'ExtraTreesRegressor'):
+        return {'kind': 'forest', **_flatten_trees(estimator.estimators_)}
+
+    if name == 'GradientBoostingRegressor':
+        init = estimator.init_
+        if isinstance(init, str) and init == 'zero':
+            baseline = 0.0
+        elif hasattr(init, 'constant_'):
+            baseline = float(np.ravel(init.constant_)[0])
+        else:
+            raise ValueError(f"Cannot export init estimator {type(init).__name__}")
+        return {
+            'kind': 'boosting',
+            'baseline': np.float64(baseline),
+            'learning_rate': np.float64(estimator.learning_rate),
+            **_flatten_trees(estimator.estimators_[:, 0])
+        }
+
+    raise ValueError(f"Cannot export estimator {name}")
+
+
+def export_model(model):
+    """Export a trained QualifyingModel or scikit-learn regressor to NumPy arrays.
+
+    A Pipeline may contain StandardScaler steps followed by the regressor;
+    the scaler is exported as mean/scale arrays applied before prediction.
+    """
+    steps = _steps(model)
+    *preprocessing, estimator = steps
+
+    artifact = {'version': np.int32(ARTIFACT_VERSION)}
+    if preprocessing:
+        if len(preprocessing) > 1:
+            raise ValueError("Only a single StandardScaler step can be exported")
+        artifact['scaler_mean'], artifact['scaler_scale'] = _export_scaler(preprocessing[0])
+
+    artifact.update(_export_estimator(estimator))
+
+    feature_names = getattr(getattr(model, 'model', model), 'feature_names_in_', None)
+    if feature_names is not None:
+        artifact['feature_names'] = np.asarray([str(name) for name in feature_names])
+    return artifact
+
+
+def save_artifact(artifact, path):
+    """Write an artifact as an uncompressed .npz (no pickled objects)"""
+    with open(path, "wb") as f:
+        np.savez(f, **artifact)
+    return path
+
+
+def load_artifact(path):
+    """Read an artifact written by save_artifact"""
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+
+class NumpyPredictor:
+    """Vectorized predictor for artifacts produced by export_model"""
+
+    def __init__(self, artifact):
+        self.artifact = artifact
+        self.kind = str(artifact['kind'])
+        self.feature_names = (
+            [str(name) for name in artifact['feature_names']] if 'feature_names' in artifact else None
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Predictor for an artifact file"""
+        return cls(load_artifact(path))
+
+    def _matrix(self, X):
+        if self.feature_names is not None and hasattr(X, 'columns'):
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=np.float64)
+        if 'scaler_mean' in self.artifact:
+            X = (X - self.artifact['scaler_mean']) / self.artifact['scaler_scale']
+        return X
+
+    def _leaf_values(self, X):
+        """Value of the leaf each sample reaches in each tree, shape (samples, trees)"""
+        a = self.artifact
+        n_samples, n_features = X.shape
+        n_trees = len(a['roots'])
+        # sklearn compares float32 features against the stored thresholds
+        X = X.astype(np.float32).astype(np.float64).ravel()
+
+        # One entry per (sample, tree); only pairs still at an internal node advance
+        nodes = np.tile(a['roots'], n_samples)
+        offsets = np.repeat(np.arange(n_samples) * n_features, n_trees)
+        active = np.flatnonzero(a['left'][nodes] != LEAF)
+        while active.size:
+            current = nodes[active]
+            goes_left = X[offsets[active] + a['feature'][current]] <= a['threshold'][current]
+            current = np.where(goes_left, a['left'][current], a['right'][current])
+            nodes[active] = current
+            active = active[a['left'][current] != LEAF]
+        return a['value'][nodes].reshape(n_samples, n_trees)
+
+    def predict(self, X):
+        """Predict Q3 times for a feature matrix"""
+        X = self._matrix(X)
+        a = self.artifact
+        if self.kind == 'linear':
+            return X @ a['coef'] + a['intercept']
+        if self.kind == 'forest':
+            return self._leaf_values(X).mean(axis=1)
+        if self.kind == 'boosting':
+            return a['baseline'] + a['learning_rate'] * self._leaf_values(X).sum(axis=1)
+        raise ValueError(f"Unknown artifact kind {self.kind}")
+
+
+def verify_export(model, X, artifact=None, atol=1e-6):
+    """Check that the exported artifact reproduces model.predict on X.
+
+    Returns the largest absolute difference; raises ValueError beyond atol.
+    """
+    artifact = export_model(model) if artifact is None else artifact
+    expected = np.asarray(model.predict(X), dtype=np.float64)
+    actual = NumpyPredictor(artifact).predict(X)
+    error = float(np.max(np.abs(expected - actual))) if len(expected) else 0.0
+    if error > atol:
+        raise ValueError(f"Exported {artifact['kind']} model differs from scikit-learn by {error:.3g}")
+    return error
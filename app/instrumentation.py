@@ -0,0 +1,196 @@
+"""
+Instrumentation Module - Per-stage timing and memory for the prediction pipeline
+
+Enable with F1QP_PROFILE=1 (add F1QP_PROFILE_MEMORY=1 to also track peak
+allocations with tracemalloc). While disabled, stage() returns a shared no-op
+context manager, so instrumented code pays a single flag check.
+"""
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+import pandas as pd
+
+logger = logging.getLogger("f1qp.perf")
+
+_enabled = os.environ.get("F1QP_PROFILE", "0") == "1"
+_track_memory = os.environ.get("F1QP_PROFILE_MEMORY", "0") == "1"
+
+_NOOP = contextlib.nullcontext()
+
+_lock = threading.Lock()
+_stats = {}
+_recent = deque(maxlen=200)
+_listeners = []
+
+# Stages currently measuring memory. tracemalloc has one process-wide peak, so
+# before a stage resets it, the peak so far is folded into every open stage.
+_memory_stages = []
+
+
+def enabled():
+    """Whether instrumentation is currently recording"""
+    return _enabled
+
+
+def enable(track_memory=False):
+    """Start recording stage timings, optionally with peak memory"""
+    global _enabled, _track_memory
+    _enabled = True
+    _track_memory = track_memory
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def tracking_memory():
+    """Whether peak memory is recorded along with the timings"""
+    return _track_memory
+
+
+def disable():
+    """Stop recording"""
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    """Forget all recorded timings"""
+    with _lock:
+        _stats.clear()
+        _recent.clear()
+
+
+class _StageTimer:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.measure_memory = False
+
+    def __enter__(self):
+        if _track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            with _lock:
+                current, peak = tracemalloc.get_traced_memory()
+                for timer in _memory_stages:
+                    timer.peak = max(timer.peak, peak)
+                tracemalloc.reset_peak()
+                self.start_memory = self.peak = current
+                _memory_stages.append(self)
+            self.measure_memory = True
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        peak = None
+        if self.measure_memory:
+            with _lock:
+                _memory_stages.remove(self)
+                if tracemalloc.is_tracing():
+                    peak = max(self.peak, tracemalloc.get_traced_memory()[1]) - self.start_memory
+        _record(self.name, elapsed, peak, self.labels, exc_type is None)
+        return False
+
+
+def stage(name, **labels):
+    """Context manager timing one pipeline stage"""
+    if not _enabled:
+        return _NOOP
+    return _StageTimer(name, labels)
+
+
+def add_listener(listener):
+    """Call listener(record) for every stage recorded in this process"""
+    _listeners.append(listener)
+
+
+def add_record(record):
+    """Merge a stage record, e.g. one recorded by a worker process, into the statistics"""
+    name, seconds, peak_bytes = record['stage'], record['seconds'], record['peak_bytes']
+    with _lock:
+        stats = _stats.setdefault(name, {'count': 0, 'errors': 0, 'total': 0.0, 'max': 0.0, 'last': 0.0, 'peak_bytes': 0})
+        stats['count'] += 1
+        stats['errors'] += 0 if record['ok'] else 1
+        stats['total'] += seconds
+        stats['max'] = max(stats['max'], seconds)
+        stats['last'] = seconds
+        if peak_bytes is not None:
+            stats['peak_bytes'] = max(stats['peak_bytes'], peak_bytes)
+        _recent.append(record)
+
+
+def _record(name, seconds, peak_bytes, labels, ok):
+    record = {
+        'stage': name,
+        'seconds': round(seconds, 6),
+        'peak_bytes': peak_bytes,
+        'ok': ok,
+        'timestamp': time.time(),
+        **labels
+    }
+    add_record(record)
+    logger.info(json.dumps(record))
+    for listener in _listeners:
+        listener(record)
+
+
+def summary():
+    """Per-stage timing table"""
+    with _lock:
+        rows = [{'Stage': name, **stats} for name, stats in _stats.items()]
+    if not rows:
+        return pd.DataFrame(columns=['Stage', 'count', 'errors', 'total', 'mean', 'max', 'last', 'peak_bytes'])
+    table = pd.DataFrame(rows)
+    table['mean'] = table['total'] / table['count']
+    return table[['Stage', 'count', 'errors', 'total', 'mean', 'max', 'last', 'peak_bytes']]
+
+
+def recent_records():
+    """The most recent stage records, oldest first"""
+    with _lock:
+        return list(_recent)
+
+
+def prometheus_text():
+    """Export stage statistics in the Prometheus text exposition format"""
+    with _lock:
+        stats = {name: dict(values) for name, values in _stats.items()}
+
+    lines = [
+        "# HELP f1qp_stage_seconds Time spent in each pipeline stage.",
+        "# TYPE f1qp_stage_seconds summary"
+    ]
+    for name, values in sorted(stats.items()):
+        lines.append(f'f1qp_stage_seconds_count{{stage="{name}"}} {values["count"]}')
+        lines.append(f'f1qp_stage_seconds_sum{{stage="{name}"}} {values["total"]:.6f}')
+
+    lines += [
+        "# HELP f1qp_stage_max_seconds Slowest observed call of each pipeline stage.",
+        "# TYPE f1qp_stage_max_seconds gauge"
+    ]
+    lines += [f'f1qp_stage_max_seconds{{stage="{name}"}} {values["max"]:.6f}' for name, values in sorted(stats.items())]
+
+    lines += [
+        "# HELP f1qp_stage_errors_total Failed calls of each pipeline stage.",
+        "# TYPE f1qp_stage_errors_total counter"
+    ]
+    lines += [f'f1qp_stage_errors_total{{stage="{name}"}} {values["errors"]}' for name, values in sorted(stats.items())]
+
+    if _track_memory:
+        lines += [
+            "# HELP f1qp_stage_peak_bytes Largest peak allocation observed in each pipeline stage.",
+            "# TYPE f1qp_stage_peak_bytes gauge"
+        ]
+        lines += [f'f1qp_stage_peak_bytes{{stage="{name}"}} {values["peak_bytes"]}' for name, values in sorted(stats.items())]
+
+    return "\n".join(lines) + "\n"
+
+
+if _enabled and _track_memory:
+    tracemalloc.start()
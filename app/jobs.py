@@ -0,0 +1,409 @@
+"""
+Jobs Module - Run fetch, training and prediction work in a bounded process pool
+
+Streamlit button handlers submit a job, get a job id back and poll its
+progress, instead of training inside the script thread. Identical jobs that
+are still queued or running are coalesced into one, and results of finished
+jobs are kept so that repeating a request returns immediately.
+"""
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app import instrumentation
+from app.lru_cache import LRUCache
+
+# Worker processes executing jobs, overridable via environment
+JOB_WORKERS = int(os.environ.get("F1QP_JOB_WORKERS", "2"))
+
+# Completed job results kept in memory
+JOB_RESULT_CACHE_SIZE = int(os.environ.get("F1QP_JOB_RESULT_CACHE_SIZE", "32"))
+
+# Jobs remembered for polling; the oldest finished jobs are forgotten first
+JOB_HISTORY_SIZE = int(os.environ.get("F1QP_JOB_HISTORY_SIZE", "1000"))
+
+# "spawn" keeps workers independent of the threads of the Streamlit server
+JOB_START_METHOD = os.environ.get("F1QP_JOB_START_METHOD", "spawn")
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+# Set in each worker process by _init_worker
+_progress_queue = None
+_current_job = None
+
+
+def _init_worker(queue):
+    global _progress_queue
+    _progress_queue = queue
+    # Stage timings recorded in the worker are merged into the parent's statistics
+    instrumentation.add_listener(_report_stage)
+
+
+def _report_stage(record):
+    _progress_queue.put(('stage', record))
+
+
+def report_progress(fraction, message=None, partial=None):
+    """Report progress of the running job (0.0 - 1.0); a no-op outside jobs.
+
+    partial is an optional early result shown before the job finishes.
+    """
+    if _progress_queue is not None and _current_job is not None:
+        _progress_queue.put(('progress', _current_job, fraction, message, partial))
+
+
+def describe_event(event):
+    """One-line description of a pipeline progress event"""
+    kind, completed, total = event['event'], event['completed'], event['total']
+    if kind == 'session':
+        return f"Loaded {completed}/{total} sessions ({event['year']} R{event['round']} {event['status']})"
+    if kind == 'estimators':
+        return f"Built {completed}/{total} estimators ({event['model_type']})"
+    if kind == 'fold':
+        return f"Cross-validated {completed}/{total} folds ({event['model_type']})"
+    if kind == 'model':
+        return f"Finished {event['model_type']} ({completed}/{total} models)"
+    if kind == 'retrain':
+        return f"Updated {event['report']}"
+    return f"{kind} {completed}/{total}"
+
+
+def _event_reporter(start, end):
+    """Progress callback mapping pipeline events onto [start, end] of the job"""
+    def report(event):
+        fraction = start + (end - start) * event['completed'] / max(event['total'], 1)
+        report_progress(fraction, describe_event(event), event.get('summary'))
+    return report
+
+
+def _collect_retrain_reports(reports, report):
+    """Progress callback that also keeps the summaries of 'retrain' events"""
+    def collect(event):
+        if event['event'] == 'retrain':
+            reports.append(event['report'])
+        report(event)
+    return collect
+
+
+def _run_job(job_id, func, args, kwargs, profile):
+    """Execute one job in a worker process.
+
+    profile is (enabled, track_memory) of the submitting process's instrumentation.
+    """
+    global _current_job
+    from app import shared_pipeline
+
+    enabled, track_memory = profile
+    if enabled:
+        instrumentation.enable(track_memory)
+    else:
+        instrumentation.disable()
+
+    # Pick up sessions ingested by other processes since this worker loaded its history
+    shared_pipeline.reload_if_changed()
+
+    _current_job = job_id
+    try:
+        report_progress(0.0, "Started")
+        return func(*args, **kwargs)
+    finally:
+        _current_job = None
+
+
+def _data_version():
+    from app.shared_pipeline import session_cache
+    return session_cache().version()
+
+
+class Job:
+    """State of a submitted job, updated by the manager"""
+
+    def __init__(self, job_id, key, name):
+        self.id = job_id
+        self.key = key
+        self.name = name
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        self.result = None
+        self.partial = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.done_event = threading.Event()
+
+    @property
+    def done(self):
+        """True once the job finished or failed"""
+        return self.status in (DONE, FAILED)
+
+    def snapshot(self):
+        """JSON-serializable view of the job without its result"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message,
+            'error': self.error,
+            'submitted': self.submitted,
+            'started': self.started,
+            'finished': self.finished
+        }
+
+
+class JobManager:
+    """Submit module-level functions as jobs to a bounded process pool.
+
+    Jobs are identified by (function, arguments, data version). While a
+    job with the same identity is queued or running, submit returns its id;
+    once it has finished, its result is served from the result cache until
+    any process stores new sessions in the session cache, which changes the
+    data version (see SessionCache.version).
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, max_results=JOB_RESULT_CACHE_SIZE,
+                 start_method=JOB_START_METHOD):
+        self.max_workers = max_workers
+        self.start_method = start_method
+        self._jobs = {}
+        self._active = {}
+        self._results = LRUCache(max_entries=max_results)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._queue = None
+
+    def _pool(self):
+        if self._executor is None:
+            context = multiprocessing.get_context(self.start_method)
+            self._queue = context.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=context,
+                initializer=_init_worker, initargs=(self._queue,)
+            )
+            threading.Thread(target=self._drain_progress, name="job-progress", daemon=True).start()
+        return self._executor
+
+    def _drain_progress(self):
+        while True:
+            kind, *payload = self._queue.get()
+            if kind == 'stage':
+                instrumentation.add_record(*payload)
+                continue
+            job_id, fraction, message, partial = payload
+            job = self._jobs.get(job_id)
+            if job is None or job.done:
+                continue
+            if job.status == QUEUED:
+                job.status, job.started = RUNNING, time.time()
+            job.progress = max(job.progress, min(float(fraction), 1.0))
+            if message:
+                job.message = message
+            if partial is not None:
+                job.partial = partial
+
+    def submit(self, func, *args, **kwargs):
+        """Queue func(*args, **kwargs) and return the id of the job computing it"""
+        name = f"{func.__module__}.{func.__qualname__}"
+        key = (name, args, tuple(sorted(kwargs.items())), _data_version())
+
+        with self._lock:
+            active = self._active.get(key)
+            if active is not None:
+                return active.id
+
+            job = Job(f"job-{next(self._ids)}", key, name)
+            self._jobs[job.id] = job
+            self._forget_old_jobs()
+
+            cached = self._results.get(key)
+            if cached is not None:
+                self._finish(job, result=cached)
+                return job.id
+
+            self._active[key] = job
+            profile = (instrumentation.enabled(), instrumentation.tracking_memory())
+            try:
+                future = self._pool().submit(_run_job, job.id, func, args, kwargs, profile)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); start a fresh pool
+                self._executor = None
+                future = self._pool().submit(_run_job, job.id, func, args, kwargs, profile)
+        future.add_done_callback(lambda f: self._complete(job, f))
+        return job.id
+
+    def _forget_old_jobs(self):
+        excess = len(self._jobs) - JOB_HISTORY_SIZE
+        if excess > 0:
+            for job_id in [job.id for job in self._jobs.values() if job.done][:excess]:
+                del self._jobs[job_id]
+
+    def _finish(self, job, result=None, error=None):
+        job.result = result
+        job.error = error
+        job.status = FAILED if error is not None else DONE
+        job.progress = 1.0 if error is None else job.progress
+        job.message = "Failed" if error is not None else "Done"
+        job.started = job.started or time.time()
+        job.finished = time.time()
+        job.done_event.set()
+
+    def _complete(self, job, future):
+        with self._lock:
+            self._active.pop(job.key, None)
+            error = future.exception()
+            if error is None:
+                result = future.result()
+                self._results.put(job.key, result)
+                self._finish(job, result=result)
+            else:
+                self._finish(job, error="".join(traceback.format_exception_only(type(error), error)).strip())
+
+    def get(self, job_id):
+        """Job for an id, or None if unknown"""
+        return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout=None):
+        """Block until the job is done and return it"""
+        job = self._jobs[job_id]
+        job.done_event.wait(timeout)
+        return job
+
+    def stream(self, job_id, interval=0.2):
+        """Yield the job after each progress change until it is done"""
+        job = self._jobs[job_id]
+        last = None
+        while True:
+            state = (job.status, job.progress, job.message)
+            if state != last:
+                last = state
+                yield job
+            if job.done:
+                return
+            job.done_event.wait(interval)
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_default_manager = None
+
+
+def default_manager():
+    """Process-wide job manager shared by all Streamlit sessions"""
+    global _default_manager
+    if _default_manager is None:
+        _default_manager = JobManager()
+    return _default_manager
+
+
+def train_and_evaluate_job(model_type, test_size=0.2, random_state=42):
+    """Train one model type on a split of the history and evaluate it.
+
+    Returns the test and cross-validation metrics, the predicted-vs-actual
+    figure and the feature importances (None for models without them).
+    """
+    from sklearn.model_selection import train_test_split
+    from app import shared_pipeline
+
+    report_progress(0.05, "Loading historical data")
+    X, y, metadata = shared_pipeline.training_features(progress=_event_reporter(0.05, 0.25))
+    if X is None:
+        return None
+
+    X_train, X_test, y_train, y_test, meta_train, meta_test = train_test_split(
+        X, y, metadata, test_size=test_size, random_state=random_state
+    )
+    report_progress(0.3, f"Training {model_type} model")
+    model = shared_pipeline.evaluation_model(model_type, X_train, y_train, progress=_event_reporter(0.3, 0.6))
+
+    report_progress(0.6, "Evaluating")
+    metrics = model.evaluate(X_test, y_test)
+
+    report_progress(0.7, "Cross-validating")
+    cv_metrics = model.cross_validate(X, y)
+
+    # Only what the model performance tab renders, not the model or the data, is kept as the result
+    report_progress(0.95, "Plotting predictions")
+    importances = getattr(model.model, 'feature_importances_', None)
+    return {
+        'metrics': metrics,
+        'cv_metrics': cv_metrics,
+        'figure': model.plot_predictions(X_test, y_test, meta_test),
+        'feature_importance': None if importances is None else dict(zip(map(str, X.columns), importances.tolist()))
+    }
+
+
+def predict_job(model_type, circuit, weather, ml_weight=None):
+    """Predict one scenario with the hybrid predictor, with prediction intervals.
+
+    If loading the model updated it incrementally, the update summaries are
+    in the attrs['retrain_reports'] of the returned predictions.
+    """
+    from src.predictors import HybridPredictor
+    from app import shared_pipeline
+    from app.batch_predictions import predict_scenario
+
+    report_progress(0.05, "Loading historical data")
+    X, y, _ = shared_pipeline.training_features(progress=_event_reporter(0.05, 0.4))
+    if X is None:
+        return None
+
+    report_progress(0.4, f"Loading {model_type} model")
+    retrain_reports = []
+    model = shared_pipeline.trained_model(
+        model_type, X, y, progress=_collect_retrain_reports(retrain_reports, _event_reporter(0.4, 0.8))
+    )
+    predictor = HybridPredictor(ml_model=model)
+
+    report_progress(0.8, f"Predicting {circuit}")
+    predictions = predict_scenario(predictor, circuit, weather, ml_weight)
+
+    report_progress(0.85, "Calibrating prediction intervals")
+    calibration = shared_pipeline.prediction_calibration(model_type)
+    predictions = shared_pipeline.with_intervals(predictions, model_type, ml_weight, calibration)
+    if predictions is not None and retrain_reports:
+        predictions.attrs['retrain_reports'] = retrain_reports
+    return predictions
+
+
+def compare_models_job(model_types=None, n_splits=5):
+    """Cross-validate every model type, publishing each finished model as a partial table"""
+    from app import shared_pipeline
+    from app.model_comparison import compare_models
+
+    report_progress(0.05, "Loading historical data")
+    X, y, _ = shared_pipeline.training_features(progress=_event_reporter(0.05, 0.25))
+    if X is None:
+        return None
+
+    report_progress(0.3, "Cross-validating models")
+    # Folds run in the comparison's own process pool, not in this job worker
+    return compare_models(X, y, model_types=model_types, n_splits=n_splits,
+                          progress=_event_reporter(0.3, 1.0))
+
+
+def precompute_job(version):
+    """Rebuild the prediction store; version is the data version it is meant for.
+
+    The worker reloads the history from the session cache before the job
+    runs, and the version in the arguments keeps jobs for different data
+    from being coalesced or served from the result cache. Returns the stored
+    row count and the summaries of incremental model updates.
+    """
+    from app import shared_pipeline
+
+    report_progress(0.05, "Precomputing predictions")
+    retrain_reports = []
+    rows = shared_pipeline.precompute(progress=_collect_retrain_reports(retrain_reports, _event_reporter(0.05, 0.95)))
+    return {'rows': rows, 'retrain_reports': retrain_reports}
@@ -0,0 +1,153 @@
+"""
+Model Comparison Module - Cross-validate every model type in a process pool
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import KFold
+
+from src.model import QualifyingModel
+from app.constants import ML_MODEL_MAP
+from app.feature_store import DEFAULT_FEATURE_DIR, load_features, save_features
+
+MODEL_TYPES = list(ML_MODEL_MAP.values())
+
+# "spawn" is safe when the caller has threads, e.g. a job worker's progress queue feeder
+COMPARE_START_METHOD = os.environ.get("F1QP_COMPARE_START_METHOD", "spawn")
+
+# Training data of a worker process, set once by _init_worker
+_worker_data = {}
+
+
+def _init_worker(X, y):
+    """Receive X/y once per worker instead of once per fold"""
+    _worker_data['X'] = X
+    _worker_data['y'] = y
+
+
+def _init_worker_from_store(path):
+    """Open the memory-mapped feature matrix shared by all workers"""
+    X, y, _ = load_features(path)
+    _init_worker(X, y)
+
+
+def _run_fold(model_type, train_idx, test_idx):
+    """Train and evaluate one model type on one fold"""
+    X, y = _worker_data['X'], _worker_data['y']
+    X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
+    y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
+
+    model = QualifyingModel(model_type=model_type)
+    start = time.perf_counter()
+    model.train(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    metrics = model.evaluate(X_test, y_test)
+    predict_time = time.perf_counter() - start
+
+    return {
+        'model_type': model_type,
+        'mae': metrics['mae'],
+        'rmse': metrics['rmse'],
+        'r2': metrics['r2'],
+        'fit_time': fit_time,
+        'predict_time': predict_time
+    }
+
+
+def summarize_folds(fold_results):
+    """Aggregate per-fold results into one row per model type"""
+    folds = pd.DataFrame(fold_results)
+    summary = folds.groupby('model_type', sort=False).agg(
+        MAE_mean=('mae', 'mean'), MAE_std=('mae', 'std'),
+        RMSE_mean=('rmse', 'mean'), RMSE_std=('rmse', 'std'),
+        R2_mean=('r2', 'mean'), R2_std=('r2', 'std'),
+        Fit_time_s=('fit_time', 'mean'), Predict_time_s=('predict_time', 'mean'),
+        Folds=('mae', 'size')
+    )
+    summary = summary.rename_axis('Model').reset_index()
+    return summary.sort_values('MAE_mean').reset_index(drop=True)
+
+
+def fold_tasks(X, model_types, n_splits=5, random_state=42):
+    """List (model_type, train_idx, test_idx) for every model and fold"""
+    splits = list(KFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(np.arange(len(X))))
+    return [
+        (model_type, train_idx, test_idx)
+        for model_type in model_types
+        for train_idx, test_idx in splits
+    ]
+
+
+def iter_compare_models(X, y, model_types=None, n_splits=5, max_workers=None, random_state=42,
+                        feature_dir=DEFAULT_FEATURE_DIR):
+    """Cross-validate several model types, yielding progress events as folds finish.
+
+    Yields a 'fold' event for every completed fold and a 'model' event,
+    carrying the comparison table of all models finished so far, whenever
+    the last fold of a model type completes. Folds are submitted in
+    model_types order, so fast models such as linear report first. The final
+    event is 'done' with the full table.
+
+    Every model type sees the same folds. Folds run in a process pool whose
+    workers open X/y from a memory-mapped feature store, so the matrix is
+    written once and shared through the page cache instead of pickled to
+    each process. Pass feature_dir=None to send X/y to each worker instead.
+    """
+    model_types = MODEL_TYPES if model_types is None else list(model_types)
+    y = pd.Series(np.asarray(y), index=X.index)
+    tasks = fold_tasks(X, model_types, n_splits, random_state)
+
+    if max_workers is None:
+        max_workers = min(len(tasks), os.cpu_count() or 1)
+
+    results = []
+    remaining = {model_type: n_splits for model_type in model_types}
+    finished = []
+
+    def events(result):
+        results.append(result)
+        model_type = result['model_type']
+        remaining[model_type] -= 1
+        yield {'event': 'fold', 'completed': len(results), 'total': len(tasks),
+               'model_type': model_type, 'result': result}
+        if remaining[model_type] == 0:
+            finished.append(model_type)
+            yield {'event': 'model', 'completed': len(finished), 'total': len(model_types),
+                   'model_type': model_type,
+                   'summary': summarize_folds([r for r in results if r['model_type'] in finished])}
+
+    if max_workers <= 1:
+        _init_worker(X, y)
+        for task in tasks:
+            yield from events(_run_fold(*task))
+    else:
+        if feature_dir is not None:
+            initializer, initargs = _init_worker_from_store, (save_features(X, y, feature_dir=feature_dir),)
+        else:
+            initializer, initargs = _init_worker, (X, y)
+        context = multiprocessing.get_context(COMPARE_START_METHOD)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                                 initializer=initializer, initargs=initargs) as executor:
+            futures = [executor.submit(_run_fold, *task) for task in tasks]
+            for future in as_completed(futures):
+                yield from events(future.result())
+
+    yield {'event': 'done', 'completed': len(tasks), 'total': len(tasks), 'summary': summarize_folds(results)}
+
+
+def compare_models(X, y, model_types=None, n_splits=5, max_workers=None, random_state=42,
+                   feature_dir=DEFAULT_FEATURE_DIR, progress=None):
+    """Cross-validate several model types and return one comparison table.
+
+    progress, if given, receives every event of iter_compare_models.
+    """
+    for event in iter_compare_models(X, y, model_types, n_splits, max_workers, random_state, feature_dir):
+        if progress is not None:
+            progress(event)
+    return event['summary']
@@ -0,0 +1,293 @@
+"""
+Model Registry Module - Persist trained models keyed by type, hyperparameters and training data
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import joblib
+import pandas as pd
+
+from app import instrumentation
+from app.file_lock import file_lock
+from app.incremental import WARM_START_MODEL_TYPES, final_estimator, train_with_progress, warm_start_update
+from app.inference_export import NumpyPredictor, export_model, save_artifact, verify_export
+from app.uncertainty import calibrate
+
+logger = logging.getLogger("f1qp.registry")
+
+# Default location of the registry, overridable via environment
+DEFAULT_REGISTRY_DIR = os.environ.get("F1QP_MODEL_DIR", os.path.join("cache", "models"))
+
+# Models trained on evaluation splits are kept apart, so they never replace the
+# full-history model of the same slot
+EVALUATION_REGISTRY_DIR = os.path.join(DEFAULT_REGISTRY_DIR, "evaluation")
+
+# Training rows used to check an inference artifact against scikit-learn
+EXPORT_VERIFY_ROWS = 500
+
+
+def dataset_fingerprint(X, y):
+    """Content hash of a training set, stable across processes"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(c) for c in X.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    digest.update(pd.util.hash_pandas_object(pd.Series(y), index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """On-disk registry of trained QualifyingModel instances.
+
+    Models are stored under a key derived from (model_type, hyperparameters,
+    dataset fingerprint) and loaded lazily on first use. Only the newest model
+    per (model_type, hyperparameters) is kept on disk.
+    """
+
+    def __init__(self, registry_dir=DEFAULT_REGISTRY_DIR):
+        self.registry_dir = registry_dir
+        self.index_path = os.path.join(registry_dir, "index.json")
+        self._loaded = {}
+        self._lock = threading.Lock()
+        self.last_report = None
+
+    @staticmethod
+    def slot(model_type, params=None):
+        """Identify a (model_type, hyperparameters) combination"""
+        return f"{model_type}|{json.dumps(params or {}, sort_keys=True)}"
+
+    @staticmethod
+    def key(model_type, params, fingerprint):
+        """Registry key of a trained model"""
+        raw = f"{ModelRegistry.slot(model_type, params)}|{fingerprint}"
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    def path(self, key):
+        """File path of a serialized model"""
+        return os.path.join(self.registry_dir, f"{key}.joblib")
+
+    def artifact_path(self, key):
+        """File path of the NumPy inference artifact of a model"""
+        return os.path.join(self.registry_dir, f"{key}.npz")
+
+    def _read_index(self):
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                return json.load(f)
+        return {}
+
+    def _write_index(self, index):
+        os.makedirs(self.registry_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _update_index(self, change):
+        """Apply change to the latest index on disk and write it back.
+
+        CLI workers and job processes share the registry, so the index is
+        re-read and rewritten under a cross-process file lock.
+        """
+        with file_lock(self.index_path):
+            index = self._read_index()
+            change(index)
+            self._write_index(index)
+
+    def get(self, model_type, fingerprint, params=None):
+        """Return a trained model, or None if none matches the fingerprint"""
+        key = self.key(model_type, params, fingerprint)
+        if key in self._loaded:
+            return self._loaded[key]
+
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+
+        model = joblib.load(path)
+        self._loaded[key] = model
+        return model
+
+    def put(self, model_type, fingerprint, model, params=None, info=None):
+        """Store a trained model and drop the previous one for the same slot.
+
+        info holds extra index fields, e.g. the training row count used to
+        recognise appended data for incremental updates.
+        """
+        key = self.key(model_type, params, fingerprint)
+        os.makedirs(self.registry_dir, exist_ok=True)
+        tmp_path = self.path(key) + ".tmp"
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, self.path(key))
+
+        slot = self.slot(model_type, params)
+
+        def change(index):
+            previous = index.get(slot, {}).get('key')
+            if previous and previous != key:
+                self._loaded.pop(previous, None)
+                for path in (self.path(previous), self.artifact_path(previous)):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+            index[slot] = {'key': key, 'model_type': model_type, 'params': params or {}, 'fingerprint': fingerprint,
+                           **(info or {})}
+
+        self._update_index(change)
+        self._loaded[key] = model
+
+    def get_or_train(self, model_type, X, y, params=None, progress=None):
+        """Return a model trained on (X, y), training it only if the data changed.
+
+        progress receives 'estimators' events while an rf/gbm model is built.
+        """
+        fingerprint = dataset_fingerprint(X, y)
+        with self._lock:
+            model = self.get(model_type, fingerprint, params)
+            if model is not None:
+                return model
+
+            return self._train(model_type, X, y, fingerprint, params, progress)
+
+    def _train(self, model_type, X, y, fingerprint, params, progress=None):
+        from src.model import QualifyingModel
+
+        model = QualifyingModel(model_type=model_type, **(params or {}))
+        with instrumentation.stage('train', model_type=model_type, rows=len(X)):
+            train_with_progress(model, X, y, progress)
+        info = {'rows': len(X), 'base_estimators': getattr(final_estimator(model), 'n_estimators', None)}
+        self.put(model_type, fingerprint, model, params, info)
+        self.export(model_type, fingerprint, model, X, params)
+        return model
+
+    def export(self, model_type, fingerprint, model, X, params=None):
+        """Write a NumPy inference artifact next to a stored model.
+
+        The artifact is only kept if it reproduces model.predict on the first
+        EXPORT_VERIFY_ROWS rows of X. Returns its path, or None for models
+        that cannot be exported.
+        """
+        try:
+            artifact = export_model(model)
+            verify_export(model, X.iloc[:EXPORT_VERIFY_ROWS], artifact)
+        except (ValueError, AttributeError):
+            return None
+
+        path = self.artifact_path(self.key(model_type, params, fingerprint))
+        save_artifact(artifact, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        return path
+
+    def load_inference(self, model_type, fingerprint, params=None):
+        """NumpyPredictor for a stored model, or None if it has no artifact"""
+        path = self.artifact_path(self.key(model_type, params, fingerprint))
+        if not os.path.exists(path):
+            return None
+        return NumpyPredictor.load(path)
+
+    def inference(self, model_type, X, y, params=None):
+        """NumpyPredictor for the stored model trained on (X, y), or None without an artifact"""
+        return self.load_inference(model_type, dataset_fingerprint(X, y), params)
+
+    def calibration(self, model_type, X, y, events, params=None):
+        """Prediction interval calibration (see app.uncertainty) for the model trained on (X, y).
+
+        It is computed on first use and stored in the index entry of the
+        model, so it is dropped together with the model when the slot is
+        retrained. events holds the Year, Round, Circuit and Driver of the
+        rows of X (e.g. the engineered history).
+        """
+        fingerprint = dataset_fingerprint(X, y)
+        slot = self.slot(model_type, params)
+        with self._lock:
+            entry = self._read_index().get(slot, {})
+            if entry.get('fingerprint') == fingerprint and 'calibration' in entry:
+                return entry['calibration']
+
+            with instrumentation.stage('calibrate', model_type=model_type, rows=len(X)):
+                calibration = calibrate(model_type, X, y, events, params)
+
+            def change(index):
+                if index.get(slot, {}).get('fingerprint') == fingerprint:
+                    index[slot]['calibration'] = calibration
+
+            self._update_index(change)
+            return calibration
+
+    def get_or_update(self, model_type, X, y, params=None, progress=None, **options):
+        """Like get_or_train, but grow the stored rf/gbm model when rows were appended.
+
+        If the stored model of this slot was trained on a prefix of (X, y),
+        only the new rows are fitted with warm_start (see app.incremental);
+        options are passed on to warm_start_update. A full rebuild happens
+        when the update reports drift or too much ensemble growth. The outcome
+        of an update is logged, kept in last_report (None when this call did
+        not update) and sent to progress as a 'retrain' event.
+        """
+        fingerprint = dataset_fingerprint(X, y)
+        with self._lock:
+            self.last_report = None
+            model = self.get(model_type, fingerprint, params)
+            if model is not None:
+                return model
+
+            entry = self._read_index().get(self.slot(model_type, params), {})
+            previous = self._appended_base(model_type, X, y, params, entry)
+            if previous is not None:
+                with instrumentation.stage('train_incremental', model_type=model_type, rows=len(X) - entry['rows']):
+                    updated, report = warm_start_update(
+                        previous, X, y, len(X) - entry['rows'],
+                        base_estimators=entry.get('base_estimators'),
+                        baseline_mae=entry.get('baseline_mae'),
+                        **options
+                    )
+                if report.needs_rebuild:
+                    report.mode = 'rebuild'
+                self._report(report, progress)
+                if not report.needs_rebuild:
+                    info = {'rows': len(X), 'base_estimators': entry.get('base_estimators'),
+                            'baseline_mae': report.baseline_mae}
+                    self.put(model_type, fingerprint, updated, params, info)
+                    self.export(model_type, fingerprint, updated, X, params)
+                    return updated
+
+            return self._train(model_type, X, y, fingerprint, params, progress)
+
+    def _report(self, report, progress=None):
+        self.last_report = report
+        logger.info(report.summary())
+        if progress is not None:
+            progress({'event': 'retrain', 'completed': 0 if report.needs_rebuild else 1, 'total': 1,
+                      'model_type': report.model_type, 'report': report.summary()})
+
+    def _appended_base(self, model_type, X, y, params, entry):
+        """Stored model of the slot if (X, y) extends its training data, else None"""
+        rows = entry.get('rows')
+        if model_type not in WARM_START_MODEL_TYPES or not rows or rows >= len(X):
+            return None
+        y_prefix = y.iloc[:rows] if hasattr(y, 'iloc') else y[:rows]
+        if dataset_fingerprint(X.iloc[:rows], y_prefix) != entry['fingerprint']:
+            return None
+        return self.get(model_type, entry['fingerprint'], params)
+
+
+_default_registry = None
+_evaluation_registry = None
+
+
+def default_registry():
+    """Process-wide registry of the models used for predictions"""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ModelRegistry(DEFAULT_REGISTRY_DIR)
+    return _default_registry
+
+
+def evaluation_registry():
+    """Process-wide registry of models trained on train/test splits for evaluation"""
+    global _evaluation_registry
+    if _evaluation_registry is None:
+        _evaluation_registry = ModelRegistry(EVALUATION_REGISTRY_DIR)
+    return _evaluation_registry
@@ -0,0 +1,185 @@
+"""
+Precompute Module - Materialize predictions for the whole sidebar control grid
+
+Usage: python -m app.precompute [--offline]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+
+import pandas as pd
+
+from src.predictors import HybridPredictor
+from app.batch_predictions import accepts_ml_weight, predict_future_races, scenario_grid
+from app.constants import CIRCUITS, ML_MODEL_MAP, ML_WEIGHTS, WEATHER_CONDITIONS
+from app.data_cache import DEFAULT_CACHE_DIR, SessionCache
+from app.model_registry import default_registry
+
+# Default location of the prediction store, overridable via environment
+DEFAULT_STORE_DIR = os.environ.get("F1QP_PREDICTION_DIR", os.path.join("cache", "predictions"))
+
+KEY_COLUMNS = ['Model', 'Circuit', 'Weather', 'ML_Weight']
+
+
+def _weight_key(ml_weight):
+    return None if ml_weight is None or pd.isnull(ml_weight) else round(float(ml_weight), 1)
+
+
+class PredictionStore:
+    """Predictions for every control combination, indexed for O(1) lookup.
+
+    The table is stored as one Parquet file with a JSON sidecar holding the
+    data version (see SessionCache.version) it was computed from and the
+    interval calibration of each model type. Lookups against a different
+    version miss, so stale predictions are never served.
+    """
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR):
+        self.store_dir = store_dir
+        self.table_path = os.path.join(store_dir, "predictions.parquet")
+        self.meta_path = os.path.join(store_dir, "predictions.json")
+        self.version = None
+        self.weighted = False
+        self.calibrations = {}
+        self._loaded_mtime = None
+        self._index = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load the stored table and build the lookup index"""
+        if not (os.path.exists(self.table_path) and os.path.exists(self.meta_path)):
+            return False
+        mtime = os.path.getmtime(self.meta_path)
+        with open(self.meta_path) as f:
+            meta = json.load(f)
+        self._set(pd.read_parquet(self.table_path), meta.get('version'), meta['weighted'],
+                  meta.get('calibrations', {}))
+        self._loaded_mtime = mtime
+        return True
+
+    def reload_if_changed(self):
+        """Reload the table if another process rewrote it since it was loaded"""
+        if os.path.exists(self.meta_path) and os.path.getmtime(self.meta_path) != self._loaded_mtime:
+            return self.load()
+        return False
+
+    def _set(self, table, version, weighted, calibrations):
+        index = {}
+        for (model, circuit, weather, ml_weight), group in table.groupby(KEY_COLUMNS, dropna=False, sort=False):
+            index[(model, circuit, weather, _weight_key(ml_weight))] = (
+                group.drop(columns=KEY_COLUMNS).reset_index(drop=True)
+            )
+        with self._lock:
+            self._index = index
+            self.version = version
+            self.weighted = weighted
+            self.calibrations = calibrations
+
+    def save(self, table, version, weighted, calibrations=None):
+        """Persist a freshly computed table and swap it in"""
+        calibrations = calibrations or {}
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = self.table_path + ".tmp"
+        table.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.table_path)
+
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({'version': version, 'weighted': weighted, 'rows': int(len(table)),
+                       'calibrations': calibrations}, f, indent=2)
+        os.replace(tmp_path, self.meta_path)
+
+        self._set(table, version, weighted, calibrations)
+        self._loaded_mtime = os.path.getmtime(self.meta_path)
+
+    def lookup(self, model_type, circuit, weather, ml_weight, version):
+        """Return the stored predictions for one combination, or None on a miss"""
+        with self._lock:
+            if version is None or version != self.version:
+                return None
+            key = (model_type, circuit, weather, _weight_key(ml_weight) if self.weighted else None)
+            predictions = self._index.get(key)
+        return predictions.copy() if predictions is not None else None
+
+    def calibration(self, model_type, version):
+        """Stored interval calibration of a model type, or None"""
+        with self._lock:
+            if version is None or version != self.version:
+                return None
+            return self.calibrations.get(model_type)
+
+
+def precompute_predictions(X, y, store, version, events=None, model_types=None, circuits=None, weathers=None,
+                           ml_weights=ML_WEIGHTS, model_loader=None, calibration_loader=None):
+    """Predict every control combination and save it to the store under a data version.
+
+    With events (the Year, Round, Circuit and Driver of the rows of X), the
+    interval calibration of every model type is stored with the predictions.
+    """
+    model_types = list(ML_MODEL_MAP.values()) if model_types is None else model_types
+    model_loader = default_registry().get_or_train if model_loader is None else model_loader
+    calibration_loader = default_registry().calibration if calibration_loader is None else calibration_loader
+    scenarios = scenario_grid(
+        CIRCUITS if circuits is None else circuits,
+        WEATHER_CONDITIONS if weathers is None else weathers,
+        ml_weights
+    )
+
+    frames = []
+    weighted = False
+    calibrations = {}
+    for model_type in model_types:
+        predictor = HybridPredictor(ml_model=model_loader(model_type, X, y))
+        weighted = accepts_ml_weight(predictor)
+        predictions = predict_future_races(predictor, scenarios if weighted else scenarios.assign(ML_Weight=None))
+        predictions.insert(0, 'Model', model_type)
+        frames.append(predictions)
+        if events is not None:
+            calibrations[model_type] = calibration_loader(model_type, X, y, events)
+
+    table = pd.concat(frames, ignore_index=True)
+    store.save(table, version, weighted, calibrations)
+    return table
+
+
+_default_store = None
+
+
+def default_store():
+    """Process-wide prediction store, loaded from disk on first use"""
+    global _default_store
+    if _default_store is None:
+        _default_store = PredictionStore()
+        _default_store.load()
+    return _default_store
+
+
+def main(argv=None):
+    from app.cli import load_history
+    from app.staged_processor import MemoizedDataProcessor
+
+    parser = argparse.ArgumentParser(description="Precompute predictions for the sidebar control grid")
+    parser.add_argument("--offline", action="store_true", help="Only use the local session cache")
+    parser.add_argument("--store-dir", default=DEFAULT_STORE_DIR)
+    args = parser.parse_args(argv)
+
+    # Loaded like the app's history (the cached sessions of the season window), so the
+    # stored version labels the same training data
+    history = load_history(offline=args.offline, incremental=False)
+    if history is None:
+        print("Failed to fetch historical data.")
+        return 1
+
+    processor = MemoizedDataProcessor()
+    data = processor.engineer_features(processor.clean_data(history))
+    X, y, _ = processor.prepare_features(data)
+    version = SessionCache(DEFAULT_CACHE_DIR).version()
+    table = precompute_predictions(X, y, PredictionStore(args.store_dir), version, events=data)
+    print(f"Stored {len(table)} predictions in {args.store_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Shared Pipeline Module - Process-wide cache of pipeline results shared by all sessions
+
+Streamlit runs every session and rerun in the same process, so the cleaned
+data, engineered features and trained models are computed once here and
+reused by every button handler. Returned objects are shared between sessions
+and must be treated as read-only.
+"""
+import os
+
+from app import instrumentation
+from app.aggregates import HistoricalAggregates
+from app.data_cache import DEFAULT_CACHE_DIR, CachedDataFetcher, SessionCache
+from app.feature_store import DEFAULT_FEATURE_DIR
+from app.lru_cache import LRUCache
+from app.model_registry import dataset_fingerprint, default_registry, evaluation_registry
+from app.precompute import default_store, precompute_predictions
+from app.staged_processor import MemoizedDataProcessor
+from app.uncertainty import DEFAULT_COVERAGE, add_intervals, weight_calibration
+
+# Maximum number of pipeline results kept in memory
+PIPELINE_CACHE_SIZE = int(os.environ.get("F1QP_PIPELINE_CACHE_SIZE", "16"))
+
+_cache = LRUCache(max_entries=PIPELINE_CACHE_SIZE)
+# Training features are memory-mapped from the feature store, so job workers and
+# the comparison pool they start share one copy of X/y through the page cache
+_processor = MemoizedDataProcessor(cache=_cache, feature_dir=DEFAULT_FEATURE_DIR)
+
+
+def pipeline_cache():
+    """Return the process-wide pipeline cache"""
+    return _cache
+
+
+_last_fetch_report = None
+
+
+def last_fetch_report():
+    """FetchReport of the most recent fetch, or None before the first one"""
+    return _last_fetch_report
+
+
+_session_cache = None
+
+
+def session_cache():
+    """SessionCache used to check whether other processes ingested sessions"""
+    global _session_cache
+    if _session_cache is None:
+        _session_cache = SessionCache(DEFAULT_CACHE_DIR)
+    return _session_cache
+
+
+def _fetch(incremental, progress=None, offline=None):
+    """Return (history, version of the session cache it was read from).
+
+    The history is always the cached sessions of the season window, read the
+    same way by every process, so equal versions mean equal training data.
+    An incremental fetch only ingests the new sessions into the cache first;
+    its merged history file can hold sessions outside the window.
+    """
+    global _last_fetch_report
+    fetcher = CachedDataFetcher(offline=offline)
+    with instrumentation.stage('fetch', incremental=incremental):
+        if incremental:
+            fetcher.fetch_incremental(verbose=False, progress=progress)
+            data = CachedDataFetcher(cache_dir=fetcher.cache.cache_dir, seasons=fetcher.seasons,
+                                     offline=True).fetch_recent_seasons(verbose=False)
+        else:
+            data = fetcher.fetch_recent_seasons(verbose=False, progress=progress)
+    _last_fetch_report = fetcher.last_report
+    return data, fetcher.cache.version()
+
+
+def _history_entry(progress=None):
+    return _cache.get_or_compute(('history',), lambda: _fetch(incremental=False, progress=progress))
+
+
+def historical_data(progress=None):
+    """Historical qualifying data, fetched once per process.
+
+    progress receives 'session' events if this call performs the fetch.
+    """
+    return _history_entry(progress)[0]
+
+
+def data_version():
+    """Version of the session cache the current history was loaded from, or None without data.
+
+    It is derived from the on-disk session cache, so processes that loaded
+    the same sessions (the app, the API, job workers, the CLI) agree on it.
+    """
+    data, version = _history_entry()
+    return version if data is not None else None
+
+
+def reload_if_changed():
+    """Reload the history from the session cache if another process ingested sessions.
+
+    Only the local cache is read; nothing is downloaded. Before the first
+    load there is nothing to replace, so the history is left to be fetched
+    by the first caller that reports progress. Returns True if the history
+    was replaced.
+    """
+    if ('history',) not in _cache:
+        return False
+    data, version = _history_entry()
+    if data is None or session_cache().version() in (None, version):
+        return False
+    data, version = _fetch(incremental=False, offline=True)
+    if data is None:
+        return False
+    _cache.put(('history',), (data, version))
+    return True
+
+
+def cleaned_data(progress=None):
+    """Cleaned historical data, or None if no data could be fetched"""
+    data = historical_data(progress)
+    return _processor.clean_data(data) if data is not None else None
+
+
+def engineered_data(progress=None):
+    """Historical data with engineered features"""
+    data = cleaned_data(progress)
+    return _processor.engineer_features(data) if data is not None else None
+
+
+def historical_aggregates():
+    """Rollups of the cleaned history, updated incrementally from the stored copy"""
+    version = data_version()
+    if version is None:
+        return None
+
+    def compute():
+        data = cleaned_data()
+        previous = HistoricalAggregates.load()
+        if previous is None:
+            aggregates = HistoricalAggregates.build(data)
+        else:
+            aggregates = previous.update(data)
+        if aggregates is not previous:
+            aggregates.save()
+        return aggregates
+
+    return _cache.get_or_compute(('aggregates', version), compute)
+
+
+def training_features(progress=None):
+    """Return (X, y, metadata) for model training, or (None, None, None)"""
+    data = engineered_data(progress)
+    if data is None:
+        return None, None, None
+    return _processor.prepare_features(data)
+
+
+def trained_model(model_type, X, y, params=None, progress=None):
+    """Trained model for (X, y), shared across sessions and backed by the model registry.
+
+    After a refresh appends sessions, rf/gbm models are grown incrementally
+    from the stored model instead of being retrained from scratch.
+    """
+    key = ('model', model_type, default_registry().slot(model_type, params), dataset_fingerprint(X, y))
+    return _cache.get_or_compute(
+        key,
+        lambda: default_registry().get_or_update(model_type, X, y, params, progress=progress)
+    )
+
+
+def evaluation_model(model_type, X_train, y_train, params=None, progress=None):
+    """Model trained on an evaluation split, stored apart from the prediction models.
+
+    Keeping it in its own registry means evaluating a model never evicts the
+    full-history model that predictions, incremental updates and interval
+    calibrations are built on.
+    """
+    key = ('evaluation_model', model_type, evaluation_registry().slot(model_type, params),
+           dataset_fingerprint(X_train, y_train))
+    return _cache.get_or_compute(
+        key,
+        lambda: evaluation_registry().get_or_train(model_type, X_train, y_train, params, progress=progress)
+    )
+
+
+def evaluation_predictor(model_type, X_train, y_train, params=None):
+    """NumPy inference artifact of evaluation_model, or None if it could not be exported.
+
+    The artifact was verified against the scikit-learn model when it was
+    stored, so it can stand in for model.predict.
+    """
+    key = ('evaluation_predictor', model_type, evaluation_registry().slot(model_type, params),
+           dataset_fingerprint(X_train, y_train))
+    return _cache.get_or_compute(key, lambda: evaluation_registry().inference(model_type, X_train, y_train, params))
+
+
+def prediction_calibration(model_type, params=None):
+    """Interval calibration of the model trained on the current history, or None.
+
+    Computing it trains a model on the earlier events and predicts the later
+    ones, so it is called from jobs and the precompute, not on requests.
+    """
+    X, y, _ = training_features()
+    if X is None:
+        return None
+    key = ('calibration', model_type, default_registry().slot(model_type, params), dataset_fingerprint(X, y))
+    return _cache.get_or_compute(
+        key,
+        lambda: default_registry().calibration(model_type, X, y, engineered_data(), params)
+    )
+
+
+def stored_calibration(model_type):
+    """Interval calibration stored with the precomputed predictions, or None"""
+    store = default_store()
+    if store.version != data_version():
+        store.reload_if_changed()
+    return store.calibration(model_type, data_version())
+
+
+def with_intervals(predictions, model_type, ml_weight=None, calibration=None, coverage=DEFAULT_COVERAGE):
+    """Predictions with Uncertainty/Lower/Upper columns added from the model's calibration.
+
+    Without a calibration passed in, only the stored one is used; predictions
+    are returned unchanged when none is stored for the current data.
+    """
+    if predictions is None or predictions.empty or 'Uncertainty' in predictions:
+        return predictions
+    if calibration is None:
+        calibration = stored_calibration(model_type)
+    if weight_calibration(calibration, ml_weight) is None:
+        return predictions
+    return add_intervals(predictions, calibration, ml_weight, coverage)
+
+
+def precomputed_predictions(model_type, circuit, weather, ml_weight):
+    """Stored predictions for a control combination, or None on a cache miss.
+
+    The store is keyed by the memoized data version, so a lookup does not
+    touch the history or the features.
+    """
+    version = data_version()
+    if version is None:
+        return None
+
+    store = default_store()
+    if store.version != version:
+        # The table may have been rebuilt by the precompute job in another process
+        store.reload_if_changed()
+    return store.lookup(model_type, circuit, weather, ml_weight, version)
+
+
+def precompute(progress=None):
+    """Rebuild the aggregates and the prediction store for the current history.
+
+    Trains every model type, so it is run as a job (app.jobs.precompute_job)
+    rather than in the Streamlit server process. progress receives the
+    events of loading each model. Returns the stored row count.
+    """
+    historical_aggregates()
+    X, y, _ = training_features()
+    if X is None:
+        return None
+
+    def load_model(model_type, X, y):
+        return trained_model(model_type, X, y, progress=progress)
+
+    # Interval calibrations are stored with the predictions, so serving them needs no fit
+    table = precompute_predictions(X, y, default_store(), data_version(), events=engineered_data(),
+                                   model_loader=load_model)
+    return len(table)
+
+
+def refresh_data(precompute=True):
+    """Ingest new sessions and replace the shared history.
+
+    Stage results are keyed by the content of their input, so results derived
+    from the old history simply age out of the LRU. The aggregates and the
+    prediction store are rebuilt for the new data by a background job.
+    """
+    data, version = _fetch(incremental=True)
+    if data is not None:
+        _cache.put(('history',), (data, version))
+        if precompute:
+            from app.jobs import default_manager, precompute_job
+            default_manager().submit(precompute_job, version)
+    return data
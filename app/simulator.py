@@ -0,0 +1,210 @@
+"""
+Simulator Module - Monte Carlo qualifying sessions with Q1/Q2/Q3 knockouts
+
+Each simulation draws a weekend form offset per driver and an independent
+lap time in every session they take part in, around their predicted Q3 time.
+The slowest drivers drop out after Q1 and Q2 as in the real format
+(20 -> 15 -> 10, 22 -> 16 -> 10), and the remaining ten are ordered by
+their Q3 lap. All
+simulations of a chunk are processed at once as (simulations x drivers)
+NumPy arrays.
+"""
+import os
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from app.uncertainty import DEFAULT_COVERAGE
+
+# Drivers reaching Q3 in a full field; the rest are knocked out in equal parts after Q1 and Q2
+Q3_SIZE = 10
+
+# Smallest field that runs the full format
+FULL_FIELD = 20
+
+# Spread (seconds) of a driver's pace over the weekend and of a single lap
+DEFAULT_FORM_SIGMA = 0.20
+DEFAULT_LAP_SIGMA = 0.12
+
+# Bounds of a driver's spread relative to the field's typical spread
+MIN_SPREAD_RATIO = 0.5
+MAX_SPREAD_RATIO = 2.0
+
+# Q3 times a driver needs in the history for a driver-specific spread
+MIN_DRIVER_SESSIONS = 5
+
+# Simulations processed per vectorized chunk, bounding peak memory
+CHUNK_SIZE = 50_000
+
+# Simulations run for the dashboard, overridable via environment
+SIMULATIONS = int(os.environ.get("F1QP_SIMULATIONS", "20000"))
+
+
+class SimulationResult:
+    """Position distribution and derived probabilities of a simulated session"""
+
+    def __init__(self, drivers, teams, expected_times, counts, n_simulations, q1_out, q2_out, q3_size=Q3_SIZE):
+        self.drivers = drivers
+        self.teams = teams
+        self.expected_times = expected_times
+        self.counts = counts
+        self.n_simulations = n_simulations
+        self.q1_out = q1_out
+        self.q2_out = q2_out
+        self.q3_size = q3_size
+
+    @property
+    def position_distribution(self):
+        """Probability of each driver (rows) finishing in each position (columns)"""
+        probabilities = self.counts / self.n_simulations
+        columns = [f"P{position}" for position in range(1, self.counts.shape[1] + 1)]
+        return pd.DataFrame(probabilities, index=pd.Index(self.drivers, name='Driver'), columns=columns)
+
+    @property
+    def summary(self):
+        """Per-driver pole, podium, top-10, Q3 and knockout probabilities, best first"""
+        probabilities = self.counts / self.n_simulations
+        positions = np.arange(1, self.counts.shape[1] + 1)
+        summary = pd.DataFrame({
+            'Driver': self.drivers,
+            'Team': self.teams,
+            'Predicted_Q3': self.expected_times,
+            'Pole_Prob': probabilities[:, 0],
+            'Top3_Prob': probabilities[:, :3].sum(axis=1),
+            'Top10_Prob': probabilities[:, :10].sum(axis=1),
+            'Q3_Prob': probabilities[:, :self.q3_size].sum(axis=1),
+            'Q1_Out_Prob': self.q1_out / self.n_simulations,
+            'Q2_Out_Prob': self.q2_out / self.n_simulations,
+            'Expected_Position': probabilities @ positions,
+            'Most_Likely_Position': probabilities.argmax(axis=1) + 1
+        })
+        return summary.sort_values(['Expected_Position', 'Predicted_Q3']).reset_index(drop=True)
+
+
+def driver_sigmas(predictions, driver_table=None, coverage=DEFAULT_COVERAGE):
+    """Per-driver (form_sigma, lap_sigma) arrays for simulate_qualifying.
+
+    With an Uncertainty column (the half-width of the coverage interval
+    around Predicted_Q3), a driver's total spread is that half-width over
+    the normal quantile of the coverage, split between form and lap in the
+    proportion of the defaults. Otherwise driver_table (the 'driver' rollup
+    of the historical aggregates) scales the defaults by each driver's Q3
+    std relative to the field's median std. Drivers without either keep
+    the defaults.
+    """
+    n_drivers = len(predictions)
+    ratio = np.ones(n_drivers)
+
+    if 'Uncertainty' in predictions:
+        z = NormalDist().inv_cdf((1 + coverage) / 2)
+        total = predictions['Uncertainty'].to_numpy(dtype=np.float64) / z
+        ratio = total / np.hypot(DEFAULT_FORM_SIGMA, DEFAULT_LAP_SIGMA)
+    elif driver_table is not None:
+        table = driver_table[driver_table['count'] >= MIN_DRIVER_SESSIONS].dropna(subset=['std'])
+        if not table.empty:
+            spread = table.set_index('Driver')['std'] / table['std'].median()
+            ratio = predictions['Driver'].map(spread).to_numpy(dtype=np.float64)
+            ratio = np.clip(ratio, MIN_SPREAD_RATIO, MAX_SPREAD_RATIO)
+
+    ratio = np.where(np.isfinite(ratio) & (ratio > 0), ratio, 1.0)
+    return DEFAULT_FORM_SIGMA * ratio, DEFAULT_LAP_SIGMA * ratio
+
+
+def session_sizes(n_drivers):
+    """(drivers reaching Q2, drivers reaching Q3) for a field of n_drivers.
+
+    Full fields send Q3_SIZE drivers to Q3 and knock out the others in equal
+    parts after Q1 and Q2 (20 -> 15 -> 10, 22 -> 16 -> 10). Smaller fields
+    keep the proportions of a 20-car field.
+    """
+    if n_drivers >= FULL_FIELD:
+        cut = (n_drivers - Q3_SIZE) // 2
+        return n_drivers - cut, Q3_SIZE
+    full_q2_size, _ = session_sizes(FULL_FIELD)
+    q2_size = max(1, round(n_drivers * full_q2_size / FULL_FIELD))
+    q3_size = max(1, round(n_drivers * Q3_SIZE / FULL_FIELD))
+    return q2_size, q3_size
+
+
+def _sigma(value, n_drivers):
+    sigma = np.asarray(value, dtype=np.float32)
+    return np.broadcast_to(sigma, (n_drivers,))
+
+
+def _simulate_chunk(rng, pace, form_sigma, lap_sigma, n_simulations, q2_size, q3_size):
+    """Return (positions, q1_out, q2_out) for one chunk; positions are 0-based"""
+    n_drivers = len(pace)
+    rows = np.arange(n_simulations)[:, None]
+
+    # Weekend pace of every driver in every simulation
+    base = pace + rng.standard_normal((n_simulations, n_drivers), dtype=np.float32) * form_sigma
+
+    # Q1: the whole field
+    q1 = base + rng.standard_normal((n_simulations, n_drivers), dtype=np.float32) * lap_sigma
+    order1 = np.argsort(q1, axis=1)
+    advanced2 = order1[:, :q2_size]
+
+    # Q2: the fastest q2_size drivers of Q1
+    q2 = base[rows, advanced2] + rng.standard_normal((n_simulations, q2_size), dtype=np.float32) * lap_sigma[advanced2]
+    order2 = advanced2[rows, np.argsort(q2, axis=1)]
+    advanced3 = order2[:, :q3_size]
+
+    # Q3: the top q3_size shoot out for pole
+    q3 = base[rows, advanced3] + rng.standard_normal((n_simulations, q3_size), dtype=np.float32) * lap_sigma[advanced3]
+    order3 = advanced3[rows, np.argsort(q3, axis=1)]
+
+    # Grid order: Q3 result, then Q2 eliminations, then Q1 eliminations
+    grid = np.concatenate([order3, order2[:, q3_size:], order1[:, q2_size:]], axis=1)
+    positions = np.empty_like(grid)
+    positions[rows, grid] = np.arange(n_drivers)
+
+    q1_out = np.bincount(order1[:, q2_size:].ravel(), minlength=n_drivers)
+    q2_out = np.bincount(order2[:, q3_size:].ravel(), minlength=n_drivers)
+    return positions, q1_out, q2_out
+
+
+def simulate_qualifying(predictions, n_simulations=100_000, form_sigma=DEFAULT_FORM_SIGMA,
+                        lap_sigma=DEFAULT_LAP_SIGMA, seed=None, time_column='Predicted_Q3'):
+    """Simulate n_simulations qualifying sessions around predicted Q3 times.
+
+    predictions is a HybridPredictor result with Driver, Team and
+    Predicted_Q3 columns. form_sigma and lap_sigma are scalars or per-driver
+    arrays in seconds. Knockout sizes follow the field (see session_sizes). Returns a SimulationResult.
+    """
+    predictions = predictions.reset_index(drop=True)
+    pace = predictions[time_column].to_numpy(dtype=np.float32)
+    n_drivers = len(pace)
+    q2_size, q3_size = session_sizes(n_drivers)
+
+    form_sigma = _sigma(form_sigma, n_drivers)
+    lap_sigma = _sigma(lap_sigma, n_drivers)
+    rng = np.random.default_rng(seed)
+
+    counts = np.zeros((n_drivers, n_drivers), dtype=np.int64)
+    q1_out = np.zeros(n_drivers, dtype=np.int64)
+    q2_out = np.zeros(n_drivers, dtype=np.int64)
+    drivers_index = np.arange(n_drivers) * n_drivers
+
+    for start in range(0, n_simulations, CHUNK_SIZE):
+        size = min(CHUNK_SIZE, n_simulations - start)
+        positions, chunk_q1_out, chunk_q2_out = _simulate_chunk(
+            rng, pace, form_sigma, lap_sigma, size, q2_size, q3_size
+        )
+        # Flatten (driver, position) pairs into one bincount
+        counts += np.bincount((positions + drivers_index).ravel(), minlength=n_drivers * n_drivers).reshape(
+            n_drivers, n_drivers
+        )
+        q1_out += chunk_q1_out
+        q2_out += chunk_q2_out
+
+    return SimulationResult(
+        drivers=predictions['Driver'].astype(str).tolist(),
+        teams=predictions['Team'].astype(str).tolist() if 'Team' in predictions else [None] * n_drivers,
+        expected_times=pace.astype(np.float64),
+        counts=counts,
+        n_simulations=n_simulations,
+        q1_out=q1_out,
+        q2_out=q2_out,
+        q3_size=q3_size
+    )
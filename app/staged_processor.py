@@ -0,0 +1,86 @@
+"""
+Staged Processor Module - DataProcessor stages memoized by the content of their input
+"""
+import hashlib
+import os
+
+import pandas as pd
+
+from app import instrumentation
+from app.compact import compact_frame
+from app.feature_store import load_features, save_features
+from app.lru_cache import LRUCache
+
+# Compact stage outputs (opt-in): src then receives categorical identifiers,
+# float32 times and narrow session keys instead of the dtypes it was written for
+COMPACT_STAGES = os.environ.get("F1QP_COMPACT_STAGES", "0") == "1"
+
+
+def frame_fingerprint(frame):
+    """Content hash of a DataFrame, independent of object identity"""
+    digest = hashlib.sha256()
+    digest.update(repr(list(frame.columns)).encode())
+    digest.update(repr([str(t) for t in frame.dtypes]).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+class MemoizedDataProcessor:
+    """Wrap DataProcessor so each stage runs once per distinct input frame.
+
+    Results are keyed by (stage, content hash of the input), so the same
+    history cleaned from the predictions tab, the historical subtab and the
+    model performance subtab is processed only once. Cached frames are shared
+    and must not be mutated by callers.
+
+    With compact=True the frame-producing stages return the compact layout
+    from app.compact, so only the compact copy is kept in the cache. The
+    next stage then runs on the compact frame, so this is opt-in
+    (F1QP_COMPACT_STAGES=1); tests/test_staged_processor.py checks that X
+    and y match the uncompacted path for the installed src. With a
+    feature_dir, prepare_features persists its output there and returns
+    memory-mapped X/y that worker processes can reopen without pickling.
+    """
+
+    def __init__(self, processor=None, cache=None, max_entries=12, compact=COMPACT_STAGES, feature_dir=None):
+        if processor is None:
+            from src.preprocess import DataProcessor
+            processor = DataProcessor()
+        self.processor = processor
+        self.cache = cache if cache is not None else LRUCache(max_entries=max_entries)
+        self.compact = compact
+        self.feature_dir = feature_dir
+
+    def _run(self, stage, data, compact=False):
+        key = (stage, self.compact and compact, frame_fingerprint(data))
+
+        def compute():
+            with instrumentation.stage(stage, rows=len(data)):
+                result = getattr(self.processor, stage)(data)
+            return compact_frame(result) if self.compact and compact else result
+
+        return self.cache.get_or_compute(key, compute)
+
+    def clean_data(self, data):
+        """Memoized DataProcessor.clean_data"""
+        return self._run('clean_data', data, compact=True)
+
+    def engineer_features(self, data):
+        """Memoized DataProcessor.engineer_features"""
+        return self._run('engineer_features', data, compact=True)
+
+    def prepare_features(self, data):
+        """Memoized DataProcessor.prepare_features"""
+        if self.feature_dir is None:
+            return self._run('prepare_features', data)
+
+        def compute():
+            with instrumentation.stage('prepare_features', rows=len(data)):
+                X, y, metadata = self.processor.prepare_features(data)
+            return load_features(save_features(X, y, metadata, self.feature_dir))
+
+        return self.cache.get_or_compute(('prepare_features', 'mmap', frame_fingerprint(data)), compute)
+
+    def run(self, data):
+        """Run all stages and return (X, y, metadata)"""
+        return self.prepare_features(self.engineer_features(self.clean_data(data)))
@@ -1,24 +1,20 @@
 """
 Streamlit UI Module - Enhanced F1-themed interface
 """
+import time
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime
-import os
-import time
-import base64
-from PIL import Image
-import io
 
-from src.data_fetching import DataFetcher
-from src.preprocess import DataProcessor
-from src.model import QualifyingModel
-from src.predictors import HybridPredictor
+# Plotting libraries, scikit-learn and the pipeline modules are imported
+# inside the functions that need them, so a new replica can serve its first
+# page before they are loaded
+from app import instrumentation
+from app.constants import CIRCUITS, ML_MODEL_MAP
+
+# Seconds between reruns of the script while a job is running
+JOB_POLL_INTERVAL = 0.5
 
 # Define F1 team colors for consistent visualization
 TEAM_COLORS = {
@@ -228,6 +224,10 @@ def run_app():
     
     with tab3:
         show_about_tab()
+    
+    # Stage timings, only when profiling is enabled (F1QP_PROFILE=1)
+    if instrumentation.enabled():
+        show_performance_panel()
 
 def setup_sidebar():
     """Set up the sidebar with controls"""
@@ -247,13 +247,7 @@ def setup_sidebar():
     )
     
     # Circuit selection
-    circuits = [
-        "Bahrain", "Saudi Arabia", "Australia", "Japan", "China", 
-        "Miami", "Emilia Romagna", "Monaco", "Canada", "Spain", 
-        "Austria", "Great Britain", "Hungary", "Belgium", "Netherlands", 
-        "Italy", "Azerbaijan", "Singapore", "United States", "Mexico", 
-        "Brazil", "Las Vegas", "Qatar", "Abu Dhabi"
-    ]
+    circuits = CIRCUITS
     
     st.sidebar.markdown(
         f"""
@@ -371,8 +365,15 @@ def setup_sidebar():
     # Data refresh button
     st.sidebar.markdown("<br>", unsafe_allow_html=True)
     if st.sidebar.button("Refresh Data", use_container_width=True, key="refresh_button"):
-        st.session_state['data_refreshed'] = True
-        st.sidebar.success("Data refreshed!")
+        from app import shared_pipeline
+        with st.sidebar:
+            with st.spinner("Fetching new sessions..."):
+                historical_data = shared_pipeline.refresh_data()
+        if historical_data is not None:
+            st.session_state['data_refreshed'] = True
+            st.sidebar.success(f"Data refreshed! {len(historical_data)} driver results available.")
+        else:
+            st.sidebar.error("Failed to refresh data. Please try again.")
     
     # Save settings to session state
     st.session_state['selected_circuit'] = selected_circuit
@@ -383,6 +384,46 @@ def setup_sidebar():
     st.session_state['weather'] = weather.lower()
     st.session_state['generate_predictions'] = generate_button
 
+def _job_state_key(label):
+    return f"job:{label}"
+
+def job_pending(label):
+    """Whether a job started by run_job under this label is still being polled"""
+    return _job_state_key(label) in st.session_state
+
+def run_job(label, func, *args, on_partial=None):
+    """Run func in the job pool, showing its progress; returns the result or None.
+    
+    The job id is kept in st.session_state, so the job survives reruns. While
+    it is running, this shows its progress and schedules a rerun of the script
+    instead of waiting for it; callers keep calling run_job while
+    job_pending(label) is true. on_partial is called with the latest early
+    result the job published.
+    """
+    from app.jobs import FAILED, default_manager
+    
+    manager = default_manager()
+    state_key = _job_state_key(label)
+    request = (func.__module__, func.__qualname__, args)
+    job_id, submitted = st.session_state.get(state_key, (None, None))
+    if job_id is None or submitted != request or manager.get(job_id) is None:
+        job_id = manager.submit(func, *args)
+        st.session_state[state_key] = (job_id, request)
+    
+    job = manager.get(job_id)
+    if on_partial is not None and job.partial is not None:
+        on_partial(job.partial)
+    if not job.done:
+        st.progress(job.progress, text=f"{label}: {job.message}")
+        time.sleep(JOB_POLL_INTERVAL)
+        st.rerun()
+    
+    del st.session_state[state_key]
+    if job.status == FAILED:
+        st.error(f"{label} failed: {job.error}")
+        return None
+    return job.result
+
 def show_predictions_tab():
     """Show the predictions tab content"""
     st.markdown(
@@ -404,64 +445,34 @@ def show_predictions_tab():
     )
     
     # Check if generate button was clicked
-    if st.session_state.get('generate_predictions', False):
+    if st.session_state.get('generate_predictions', False) or job_pending("Generating predictions"):
         with st.spinner("🏎️ Generating predictions..."):
-            # Add a small delay for visual effect
-            time.sleep(1)
-            
-            # Initialize components
-            data_fetcher = DataFetcher()
-            data_processor = DataProcessor()
+            from app import shared_pipeline
             
             # Map ML model type to internal name
-            ml_model_map = {
-                "Linear Regression": "linear",
-                "Ridge Regression": "ridge",
-                "Random Forest": "rf",
-                "Gradient Boosting": "gbm"
-            }
+            ml_model_name = ML_MODEL_MAP.get(st.session_state['ml_model_type'], "linear")
             
-            ml_model_name = ml_model_map.get(st.session_state['ml_model_type'], "linear")
-            model = QualifyingModel(model_type=ml_model_name)
+            circuit = st.session_state['selected_circuit']
+            weather = st.session_state['weather']
+            ml_weight = st.session_state['ml_weight']
             
-            # Fetch historical data
-            historical_data = data_fetcher.fetch_recent_seasons(verbose=False)
+            # Serve precomputed predictions when the store has this combination
+            predictions = shared_pipeline.precomputed_predictions(ml_model_name, circuit, weather, ml_weight)
             
-            if historical_data is not None:
-                # Clean and process data
-                cleaned_data = data_processor.clean_data(historical_data)
-                engineered_data = data_processor.engineer_features(cleaned_data)
-                
-                # Prepare features for training
-                X, y, metadata = data_processor.prepare_features(engineered_data)
-                
-                # Train the model
-                model.train(X, y)
-                
-                # Initialize predictor
-                predictor = HybridPredictor(ml_model=model)
-                
-                # Make predictions based on selected model type
-                if st.session_state['model_type'] == "ML Only":
-                    # For ML-only, we need Q1 and Q2 times which we don't have for future races
-                    # So we'll use performance factors but with 100% ML weight
-                    predictions = predictor.predict_future_race(
-                        st.session_state['selected_circuit'], 
-                        weather=st.session_state['weather']
-                    )
-                elif st.session_state['model_type'] == "Performance Factors Only":
-                    predictions = predictor.predict_future_race(
-                        st.session_state['selected_circuit'], 
-                        weather=st.session_state['weather']
-                    )
-                else:  # Hybrid
-                    predictions = predictor.predict_future_race(
-                        st.session_state['selected_circuit'], 
-                        weather=st.session_state['weather']
-                    )
+            if predictions is not None:
+                predictions = shared_pipeline.with_intervals(predictions, ml_model_name, ml_weight)
+            else:
+                # Hybrid, ML Only and Performance Factors Only currently share one
+                # prediction path; ML-only has no Q1/Q2 times for future races
+                from app.jobs import predict_job
+                predictions = run_job("Generating predictions", predict_job, ml_model_name, circuit, weather, ml_weight)
+            
+            if predictions is not None:
+                for summary in predictions.attrs.get('retrain_reports', []):
+                    st.caption(f"Model updated: {summary}")
                 
                 # Display predictions
-                display_predictions(predictions, st.session_state['selected_circuit'])
+                display_predictions(predictions, circuit)
             else:
                 st.error("Failed to fetch historical data. Please try again.")
     else:
@@ -534,22 +545,7 @@ def display_predictions(predictions, circuit):
         return
     
     # Format the predictions for display
-    display_df = predictions[['Position', 'Driver', 'Team', 'Predicted_Q3']].copy()
-    
-    # Format the predicted time
-    display_df['Predicted Time'] = display_df['Predicted_Q3'].apply(
-        lambda x: f"{int(x // 60):01d}:{x % 60:06.3f}" if pd.notnull(x) else "N/A"
-    )
-    
-    # Calculate gaps
-    pole_time = display_df['Predicted_Q3'].min()
-    display_df['Gap to Pole'] = display_df['Predicted_Q3'] - pole_time
-    display_df['Gap to Pole'] = display_df['Gap to Pole'].apply(
-        lambda x: f"+{x:.3f}s" if x > 0 else "POLE"
-    )
-    
-    # Drop the raw predicted time
-    display_df = display_df.drop('Predicted_Q3', axis=1)
+    display_df = format_predictions(predictions)
     
     # Create a header for the results
     st.markdown(
@@ -710,7 +706,12 @@ def display_predictions(predictions, circuit):
                 unsafe_allow_html=True
             )
     
-    # Display the rest of the grid
+    # Display the full grid as a styled table in a single component
+    from app.figure_cache import cached_html
+    grid_html = cached_html(
+        'grid_table', predictions, circuit,
+        lambda data, _: build_grid_table_html(format_predictions(data))
+    )
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown(
         f"""
@@ -721,15 +722,80 @@ def display_predictions(predictions, circuit):
             margin-bottom: 20px;
         ">
             <h3 style="margin: 0 0 15px 0; color: white !important;">Full Grid</h3>
+            {grid_html}
+        </div>
         """,
         unsafe_allow_html=True
     )
     
-    # Display the full grid as a styled table
-    rest_of_grid = display_df.copy()
+    # Create visualizations
+    create_prediction_visualizations(predictions, circuit)
+
+def format_lap_times(seconds):
+    """Format a Series of lap times in seconds as M:SS.mmm"""
+    minutes = (seconds // 60).astype('Int64').astype(str)
+    formatted = minutes + ':' + (seconds % 60).map('{:06.3f}'.format)
+    return formatted.where(seconds.notnull(), "N/A")
+
+def format_predictions(predictions):
+    """Build the display table with formatted times and gaps to pole"""
+    display_df = predictions[['Position', 'Driver', 'Team']].copy()
+    display_df['Predicted Time'] = format_lap_times(predictions['Predicted_Q3'])
+    
+    # Calculate gaps
+    gaps = predictions['Predicted_Q3'] - predictions['Predicted_Q3'].min()
+    display_df['Gap to Pole'] = np.where(gaps > 0, '+' + gaps.map('{:.3f}'.format) + 's', "POLE")
+    
+    # Half-width of the prediction interval, when the predictions carry one
+    if 'Uncertainty' in predictions:
+        display_df['Uncertainty'] = '± ' + predictions['Uncertainty'].map('{:.3f}'.format) + 's'
+    
+    return display_df
+
+def build_grid_table_html(display_df):
+    """Build the full grid table HTML in one vectorized pass"""
+    positions = display_df['Position'].astype(int)
+    team_colors = display_df['Team'].map(TEAM_COLORS).fillna('#FFFFFF')
+    
+    # Highlight top 3 and alternate row colors
+    bg_colors = np.select(
+        [positions == 1, positions == 2, positions == 3, positions % 2 == 0],
+        [
+            "rgba(255, 215, 0, 0.2)",  # Gold tint
+            "rgba(192, 192, 192, 0.2)",  # Silver tint
+            "rgba(205, 127, 50, 0.2)",  # Bronze tint
+            "rgba(56, 56, 63, 0.7)"  # Darker gray
+        ],
+        default="rgba(56, 56, 63, 0.5)"  # Lighter gray
+    )
+    gap_styles = np.where(positions == 1, "color: gold; font-weight: bold;", "color: white; font-weight: normal;")
     
-    # Create a custom styled table
-    table_html = f"""
+    # Show the interval half-width next to the time, when available
+    if 'Uncertainty' in display_df:
+        uncertainty = (
+            ' <span style="font-weight: normal; font-size: 0.8em; color: ' + F1_COLORS['light_gray'] + ';">'
+            + display_df['Uncertainty'] + '</span>'
+        )
+    else:
+        uncertainty = ''
+    
+    rows = (
+        '<tr style="background-color: ' + pd.Series(bg_colors, index=display_df.index) + ';">'
+        '<td style="padding: 10px; text-align: center; font-weight: bold; color: white;">' + positions.astype(str) + '</td>'
+        '<td style="padding: 10px; text-align: left; color: white;">'
+        '<div style="display: flex; align-items: center;">'
+        '<div style="width: 5px; height: 20px; background-color: ' + team_colors + '; margin-right: 10px;"></div>'
+        + display_df['Driver'].astype(str) +
+        '</div></td>'
+        '<td style="padding: 10px; text-align: left; color: white;">' + display_df['Team'].astype(str) + '</td>'
+        '<td style="padding: 10px; text-align: center; font-weight: bold; color: white;">' + display_df['Predicted Time']
+        + uncertainty + '</td>'
+        '<td style="padding: 10px; text-align: center; ' + pd.Series(gap_styles, index=display_df.index) + '">'
+        + display_df['Gap to Pole'] +
+        '</td></tr>'
+    )
+    
+    return f"""
     <table style="width: 100%; border-collapse: collapse; margin-top: 10px;">
         <thead>
             <tr style="background-color: {F1_COLORS['red']}; color: white;">
@@ -741,82 +807,28 @@ def display_predictions(predictions, circuit):
             </tr>
         </thead>
         <tbody>
-    """
-    
-    for idx, row in rest_of_grid.iterrows():
-        team_color = TEAM_COLORS.get(row['Team'], '#FFFFFF')
-        position = int(row['Position'])
-        
-        # Alternate row colors and highlight top 3
-        if position == 1:
-            bg_color = "rgba(255, 215, 0, 0.2)"  # Gold tint
-        elif position == 2:
-            bg_color = "rgba(192, 192, 192, 0.2)"  # Silver tint
-        elif position == 3:
-            bg_color = "rgba(205, 127, 50, 0.2)"  # Bronze tint
-        elif position % 2 == 0:
-            bg_color = "rgba(56, 56, 63, 0.7)"  # Darker gray
-        else:
-            bg_color = "rgba(56, 56, 63, 0.5)"  # Lighter gray
-        
-        table_html += f"""
-        <tr style="background-color: {bg_color};">
-            <td style="padding: 10px; text-align: center; font-weight: bold; color: white;">{position}</td>
-            <td style="padding: 10px; text-align: left; color: white;">
-                <div style="display: flex; align-items: center;">
-                    <div style="width: 5px; height: 20px; background-color: {team_color}; margin-right: 10px;"></div>
-                    {row['Driver']}
-                </div>
-            </td>
-            <td style="padding: 10px; text-align: left; color: white;">{row['Team']}</td>
-            <td style="padding: 10px; text-align: center; font-weight: bold; color: white;">{row['Predicted Time']}</td>
-            <td style="padding: 10px; text-align: center; color: {'gold' if position == 1 else 'white'}; font-weight: {'bold' if position == 1 else 'normal'};">
-                {row['Gap to Pole']}
-            </td>
-        </tr>
-        """
-    
-    table_html += """
+            {''.join(rows)}
         </tbody>
     </table>
     """
-    
-    st.markdown(table_html, unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)
-    
-    # Create visualizations
-    create_prediction_visualizations(predictions, circuit)
 
-def create_prediction_visualizations(predictions, circuit):
-    """Create visualizations for the predictions with F1 styling"""
-    if predictions is None or predictions.empty:
-        return
+def build_gap_to_pole_figure(predictions, circuit):
+    """Build the gap-to-pole bar chart with top-3 annotations"""
+    import plotly.express as px
     
-    st.markdown(
-        f"""
-        <div style="
-            background-color: {F1_COLORS['gray']}; 
-            padding: 15px; 
-            border-radius: 10px; 
-            margin-bottom: 20px;
-        ">
-            <h3 style="margin: 0 0 15px 0; color: white !important;">Visualization</h3>
-        """,
-        unsafe_allow_html=True
-    )
-    
-    # Calculate pole time and gaps
+    # Calculate pole time and gaps without modifying the input
     pole_time = predictions['Predicted_Q3'].min()
-    predictions['Gap_to_Pole'] = predictions['Predicted_Q3'] - pole_time
+    predictions = predictions.assign(Gap_to_Pole=predictions['Predicted_Q3'] - pole_time)
     
-    # Create a bar chart of gaps to pole
+    # Create a bar chart of gaps to pole, with prediction intervals as error bars when available
     fig = px.bar(
         predictions,
         x='Driver',
         y='Gap_to_Pole',
         color='Team',
+        error_y='Uncertainty' if 'Uncertainty' in predictions else None,
         title=f'Predicted Gap to Pole - {circuit} GP',
-        labels={'Gap_to_Pole': 'Gap to Pole (seconds)', 'Driver': 'Driver'},
+        labels={'Gap_to_Pole': 'Gap to Pole (seconds)', 'Driver': 'Driver', 'Uncertainty': '± (seconds)'},
         color_discrete_map=TEAM_COLORS
     )
     
@@ -866,22 +878,119 @@ def create_prediction_visualizations(predictions, circuit):
             opacity=0.8
         )
     
+    return fig
+
+def create_prediction_visualizations(predictions, circuit):
+    """Create visualizations for the predictions with F1 styling"""
+    if predictions is None or predictions.empty:
+        return
+    
+    st.markdown(
+        f"""
+        <div style="
+            background-color: {F1_COLORS['gray']}; 
+            padding: 15px; 
+            border-radius: 10px; 
+            margin-bottom: 20px;
+        ">
+            <h3 style="margin: 0 0 15px 0; color: white !important;">Visualization</h3>
+        """,
+        unsafe_allow_html=True
+    )
+    
+    # Build the gap-to-pole chart, reusing it while the predictions are unchanged
+    from app.figure_cache import cached_figure
+    fig = cached_figure('gap_to_pole', predictions, circuit, build_gap_to_pole_figure)
+    
     st.plotly_chart(fig, use_container_width=True)
     
     # Create a track position visualization
     create_track_visualization(predictions, circuit)
     
     st.markdown("</div>", unsafe_allow_html=True)
+    
+    show_session_simulation(predictions, circuit)
+
+def show_session_simulation(predictions, circuit):
+    """Show pole, top-10 and knockout probabilities from simulated Q1/Q2/Q3 sessions"""
+    with st.expander("🎲 Simulated Qualifying Session"):
+        from app import shared_pipeline
+        from app.figure_cache import figure_cache, view_key
+        from app.simulator import SIMULATIONS, driver_sigmas, simulate_qualifying
+        
+        def simulate():
+            # Without prediction intervals, each driver's spread follows their historical consistency
+            driver_table = None
+            if 'Uncertainty' not in predictions:
+                aggregates = shared_pipeline.historical_aggregates()
+                driver_table = aggregates.table('driver') if aggregates is not None else None
+            form_sigma, lap_sigma = driver_sigmas(predictions, driver_table)
+            return simulate_qualifying(predictions, n_simulations=SIMULATIONS, form_sigma=form_sigma,
+                                       lap_sigma=lap_sigma, seed=0).summary
+        
+        # A fixed seed keeps the table stable across reruns of the same predictions and data
+        summary = figure_cache().get_or_compute(
+            view_key('session_simulation', predictions, circuit) + (shared_pipeline.data_version(),),
+            simulate
+        )
+        
+        st.caption(f"{SIMULATIONS:,} simulated sessions with Q1 and Q2 knockouts around the predicted times, "
+                   "with each driver's spread taken from their prediction interval or past consistency.")
+        display_df = pd.DataFrame({
+            'Driver': summary['Driver'],
+            'Team': summary['Team'],
+            'Pole': (summary['Pole_Prob'] * 100).map('{:.1f}%'.format),
+            'Top 3': (summary['Top3_Prob'] * 100).map('{:.1f}%'.format),
+            'Top 10': (summary['Top10_Prob'] * 100).map('{:.1f}%'.format),
+            'Out in Q1': (summary['Q1_Out_Prob'] * 100).map('{:.1f}%'.format),
+            'Expected Position': summary['Expected_Position'].round(1)
+        })
+        st.dataframe(display_df, use_container_width=True, hide_index=True)
+
+def build_track_cars_html(grid_data):
+    """Build the car markers on the circular track layout in one vectorized pass"""
+    n_cars = len(grid_data)
+    radius = 100
+    center_x = 50  # % from left
+    center_y = 50  # % from top
+    
+    # Calculate positions on the track (circular path) for all cars at once
+    angles = np.radians(np.arange(n_cars) / n_cars * 360)
+    x = pd.Series(center_x + radius * np.cos(angles), index=grid_data.index).astype(str)
+    y = pd.Series(center_y + radius * np.sin(angles), index=grid_data.index)
+    label_y = (y + 5).astype(str)
+    y = y.astype(str)
+    
+    team_colors = grid_data['Team'].map(TEAM_COLORS).fillna('#FFFFFF')
+    text_colors = pd.Series(np.where(team_colors == '#FFFFFF', 'black', 'white'), index=grid_data.index)
+    positions = grid_data['Position'].astype(int).astype(str)
+    surnames = grid_data['Driver'].astype(str).str.split(' ').str[-1]
+    
+    cars = (
+        '<div style="position: absolute; top: ' + y + '%; left: ' + x + '%; '
+        'transform: translate(-50%, -50%); width: 30px; height: 15px; '
+        'background-color: ' + team_colors + '; border-radius: 5px; display: flex; '
+        'align-items: center; justify-content: center; color: ' + text_colors + '; '
+        'font-weight: bold; font-size: 10px; box-shadow: 0 0 10px rgba(0,0,0,0.5);">' + positions + '</div>'
+        '<div style="position: absolute; top: ' + label_y + '%; left: ' + x + '%; '
+        'transform: translate(-50%, -50%); color: white; font-size: 10px; '
+        'text-shadow: 1px 1px 2px black; white-space: nowrap;">' + surnames + '</div>'
+    )
+    return ''.join(cars)
 
 def create_track_visualization(predictions, circuit):
     """Create a track position visualization"""
     if predictions is None or predictions.empty:
         return
     
-    # Sort by position
-    grid_data = predictions.sort_values('Predicted_Q3').copy()
+    # Place the cars in grid order, reusing the markup while the predictions are unchanged
+    from app.figure_cache import cached_html
+    cars_html = cached_html(
+        'track_cars', predictions, circuit,
+        lambda data, _: build_track_cars_html(data.sort_values('Predicted_Q3'))
+    )
     
-    # Create a track-like visualization
+    # Create a track-like visualization with all cars in a single component
     st.markdown(
         f"""
         <h4 style="margin: 20px 0 10px 0; color: white !important;">Track Position Visualization</h4>
@@ -933,62 +1042,13 @@ def create_track_visualization(predictions, circuit):
                 );
                 transform: translateX(-50%);
             "></div>
+            
+            <!-- Cars -->
+            {cars_html}
+        </div>
         """,
         unsafe_allow_html=True
     )
-    
-    # Place cars on the track
-    for i, (_, row) in enumerate(grid_data.iterrows()):
-        position = int(row['Position'])
-        team_color = TEAM_COLORS.get(row['Team'], '#FFFFFF')
-        
-        # Calculate position on the track (circular path)
-        angle = (i / len(grid_data)) * 360
-        radius = 100
-        center_x = 50  # % from left
-        center_y = 50  # % from top
-        
-        # Convert to cartesian coordinates
-        x = center_x + radius * np.cos(np.radians(angle))
-        y = center_y + radius * np.sin(np.radians(angle))
-        
-        # Add car representation
-        st.markdown(
-            f"""
-            <div style="
-                position: absolute;
-                top: {y}%;
-                left: {x}%;
-                transform: translate(-50%, -50%);
-                width: 30px;
-                height: 15px;
-                background-color: {team_color};
-                border-radius: 5px;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                color: {'black' if team_color == '#FFFFFF' else 'white'};
-                font-weight: bold;
-                font-size: 10px;
-                box-shadow: 0 0 10px rgba(0,0,0,0.5);
-            ">{position}</div>
-            
-            <!-- Driver label -->
-            <div style="
-                position: absolute;
-                top: {y + 5}%;
-                left: {x}%;
-                transform: translate(-50%, -50%);
-                color: white;
-                font-size: 10px;
-                text-shadow: 1px 1px 2px black;
-                white-space: nowrap;
-            ">{row['Driver'].split(' ')[-1]}</div>
-            """,
-            unsafe_allow_html=True
-        )
-    
-    st.markdown("</div>", unsafe_allow_html=True)
 
 def show_data_analysis_tab():
     """Show the data analysis tab content"""
@@ -1038,11 +1098,8 @@ def show_historical_data_subtab():
     # Fetch data button
     if st.button("Fetch Historical Data", key="fetch_historical"):
         with st.spinner("🏎️ Fetching data from FastF1 API..."):
-            # Add a small delay for visual effect
-            time.sleep(1)
-            
-            data_fetcher = DataFetcher()
-            historical_data = data_fetcher.fetch_recent_seasons()
+            from app import shared_pipeline
+            historical_data = shared_pipeline.historical_data()
             
             if historical_data is not None:
                 # Store in session state
@@ -1051,12 +1108,16 @@ def show_historical_data_subtab():
                 # Display data summary
                 st.success(f"Successfully fetched data for {len(historical_data)} qualifying sessions.")
                 
-                # Process and display the data
-                data_processor = DataProcessor()
-                cleaned_data = data_processor.clean_data(historical_data)
+                # Report sessions that could not be fetched
+                report = shared_pipeline.last_fetch_report()
+                if report is not None and not report.ok:
+                    st.warning(f"Some sessions could not be fetched: {report.summary()}")
+                
+                # Read the precomputed rollups of the cleaned data
+                aggregates = shared_pipeline.historical_aggregates()
                 
                 # Display summary statistics
-                display_historical_data_summary(cleaned_data)
+                display_historical_data_summary(aggregates)
             else:
                 st.error("Failed to fetch historical data. Please try again.")
     else:
@@ -1083,12 +1144,16 @@ def show_historical_data_subtab():
             unsafe_allow_html=True
         )
 
-def display_historical_data_summary(data):
+def display_historical_data_summary(aggregates):
     """Display summary of historical data with F1 styling"""
-    if data is None or data.empty:
+    if aggregates is None or not aggregates.summary.get('circuit'):
         st.warning("No historical data available.")
         return
     
+    import plotly.express as px
+    
+    summary = aggregates.summary
+    
     # Display basic info
     col1, col2, col3 = st.columns(3)
     
@@ -1102,7 +1167,7 @@ def display_historical_data_summary(data):
                 text-align: center;
             ">
                 <h1 style="color: {F1_COLORS['red']} !important; font-size: 36px; margin: 0;">
-                    {data['Circuit'].nunique()}
+                    {summary['circuit']}
                 </h1>
                 <p style="color: white; margin: 0;">Qualifying Sessions</p>
             </div>
@@ -1120,7 +1185,7 @@ def display_historical_data_summary(data):
                 text-align: center;
             ">
                 <h1 style="color: {F1_COLORS['red']} !important; font-size: 36px; margin: 0;">
-                    {data['Driver'].nunique()}
+                    {summary['driver']}
                 </h1>
                 <p style="color: white; margin: 0;">Drivers</p>
             </div>
@@ -1138,7 +1203,7 @@ def display_historical_data_summary(data):
                 text-align: center;
             ">
                 <h1 style="color: {F1_COLORS['red']} !important; font-size: 36px; margin: 0;">
-                    {data['Team'].nunique()}
+                    {summary['team']}
                 </h1>
                 <p style="color: white; margin: 0;">Teams</p>
             </div>
@@ -1166,8 +1231,8 @@ def display_historical_data_summary(data):
             unsafe_allow_html=True
         )
         
-        # Group by circuit
-        circuit_data = data.groupby('Circuit')['Q3_sec'].mean().reset_index()
+        # Average Q3 time by circuit
+        circuit_data = aggregates.table('circuit').rename(columns={'mean': 'Q3_sec'})
         circuit_data = circuit_data.sort_values('Q3_sec')
         
         # Create bar chart
@@ -1210,11 +1275,7 @@ def display_historical_data_summary(data):
         )
         
         # Filter for drivers with at least 3 Q3 appearances
-        driver_counts = data.groupby('Driver')['Q3_sec'].count()
-        valid_drivers = driver_counts[driver_counts >= 3].index
-        
-        driver_data = data[data['Driver'].isin(valid_drivers)]
-        driver_avg = driver_data.groupby('Driver')['Q3_sec'].mean().reset_index()
+        driver_avg = aggregates.table('driver', min_count=3).rename(columns={'mean': 'Q3_sec'})
         driver_avg = driver_avg.sort_values('Q3_sec')
         
         # Create bar chart
@@ -1256,7 +1317,7 @@ def display_historical_data_summary(data):
             unsafe_allow_html=True
         )
         
-        team_data = data.groupby('Team')['Q3_sec'].mean().reset_index()
+        team_data = aggregates.table('team').rename(columns={'mean': 'Q3_sec'})
         team_data = team_data.sort_values('Q3_sec')
         
         # Create bar chart with team colors
@@ -1300,52 +1361,20 @@ def show_model_performance_subtab():
     )
     
     # Train and evaluate button
-    if st.button("Train and Evaluate Model", key="train_model"):
+    if st.button("Train and Evaluate Model", key="train_model") or job_pending("Training and evaluating model"):
         with st.spinner("🏎️ Training and evaluating model..."):
-            # Add a small delay for visual effect
-            time.sleep(1)
-            
-            # Initialize components
-            data_fetcher = DataFetcher()
-            data_processor = DataProcessor()
-            
             # Map ML model type to internal name
-            ml_model_map = {
-                "Linear Regression": "linear",
-                "Ridge Regression": "ridge",
-                "Random Forest": "rf",
-                "Gradient Boosting": "gbm"
-            }
-            
-            ml_model_name = ml_model_map.get(
+            ml_model_name = ML_MODEL_MAP.get(
                 st.session_state.get('ml_model_type', "Linear Regression"), 
                 "linear"
             )
             
-            model = QualifyingModel(model_type=ml_model_name)
-            
-            # Fetch historical data
-            historical_data = data_fetcher.fetch_recent_seasons(verbose=False)
+            # Train, evaluate and cross-validate in the job pool
+            from app.jobs import train_and_evaluate_job
+            result = run_job("Training and evaluating model", train_and_evaluate_job, ml_model_name)
             
-            if historical_data is not None:
-                # Clean and process data
-                cleaned_data = data_processor.clean_data(historical_data)
-                engineered_data = data_processor.engineer_features(cleaned_data)
-                
-                # Prepare features for training
-                X, y, metadata = data_processor.prepare_features(engineered_data)
-                
-                # Split data for training and testing
-                from sklearn.model_selection import train_test_split
-                X_train, X_test, y_train, y_test, meta_train, meta_test = train_test_split(
-                    X, y, metadata, test_size=0.2, random_state=42
-                )
-                
-                # Train the model
-                model.train(X_train, y_train)
-                
-                # Evaluate the model
-                metrics = model.evaluate(X_test, y_test)
+            if result is not None:
+                metrics = result['metrics']
                 
                 # Display metrics
                 st.markdown(
@@ -1423,7 +1452,7 @@ def show_model_performance_subtab():
                 st.markdown("</div>", unsafe_allow_html=True)
                 
                 # Cross-validation
-                cv_metrics = model.cross_validate(X, y)
+                cv_metrics = result['cv_metrics']
                 
                 st.markdown(
                     f"""
@@ -1494,7 +1523,7 @@ def show_model_performance_subtab():
                     unsafe_allow_html=True
                 )
                 
-                fig = model.plot_predictions(X_test, y_test, meta_test)
+                fig = result['figure']
                 
                 # Update figure styling
                 fig.set_facecolor('#121212')
@@ -1512,7 +1541,7 @@ def show_model_performance_subtab():
                 st.markdown("</div>", unsafe_allow_html=True)
                 
                 # Feature importance (if applicable)
-                if ml_model_name in ['rf', 'gbm']:
+                if result['feature_importance'] is not None:
                     st.markdown(
                         f"""
                         <div style="
@@ -1526,17 +1555,13 @@ def show_model_performance_subtab():
                         unsafe_allow_html=True
                     )
                     
-                    # Get feature importance
-                    importance = model.model.feature_importances_
-                    feature_names = X.columns
-                    
-                    # Create DataFrame
                     importance_df = pd.DataFrame({
-                        'Feature': feature_names,
-                        'Importance': importance
+                        'Feature': list(result['feature_importance']),
+                        'Importance': list(result['feature_importance'].values())
                     }).sort_values('Importance', ascending=False)
                     
                     # Create bar chart
+                    import plotly.express as px
                     fig = px.bar(
                         importance_df,
                         x='Feature',
@@ -1585,6 +1610,76 @@ def show_model_performance_subtab():
             """,
             unsafe_allow_html=True
         )
+    
+    # Compare all algorithms side by side
+    st.markdown("<br>", unsafe_allow_html=True)
+    if st.button("Compare All Models", key="compare_models") or job_pending("Cross-validating all models"):
+        from app.jobs import compare_models_job
+        
+        # Show each model as soon as its folds finish, fastest models first
+        table = st.empty()
+        
+        def show_partial(comparison):
+            with table.container():
+                display_model_comparison(comparison)
+        
+        comparison = run_job("Cross-validating all models", compare_models_job, on_partial=show_partial)
+        
+        if comparison is not None:
+            show_partial(comparison)
+        else:
+            st.error("Failed to fetch historical data. Please try again.")
+
+def display_model_comparison(comparison):
+    """Display the cross-validation comparison table with F1 styling"""
+    st.markdown(
+        f"""
+        <div style="
+            background-color: {F1_COLORS['gray']}; 
+            padding: 15px; 
+            border-radius: 10px; 
+            margin-bottom: 20px;
+        ">
+            <h4 style="margin: 0 0 15px 0; color: white !important;">Model Comparison</h4>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+    
+    # Map internal model names back to their labels
+    model_labels = {name: label for label, name in ML_MODEL_MAP.items()}
+    
+    display_df = pd.DataFrame({
+        'Model': comparison['Model'].map(model_labels).fillna(comparison['Model']),
+        'MAE (s)': comparison['MAE_mean'].map('{:.3f}'.format) + ' ± ' + comparison['MAE_std'].map('{:.3f}'.format),
+        'RMSE (s)': comparison['RMSE_mean'].map('{:.3f}'.format) + ' ± ' + comparison['RMSE_std'].map('{:.3f}'.format),
+        'R²': comparison['R2_mean'].map('{:.3f}'.format) + ' ± ' + comparison['R2_std'].map('{:.3f}'.format),
+        'Fit Time (s)': comparison['Fit_time_s'].round(3),
+        'Predict Time (s)': comparison['Predict_time_s'].round(3)
+    })
+    
+    st.dataframe(display_df, use_container_width=True, hide_index=True)
+
+def show_performance_panel():
+    """Show per-stage timings recorded by app.instrumentation"""
+    with st.expander("⏱️ Performance"):
+        summary = instrumentation.summary()
+        if summary.empty:
+            st.info("No pipeline stages have run yet in this process.")
+            return
+        
+        display_df = pd.DataFrame({
+            'Stage': summary['Stage'],
+            'Calls': summary['count'],
+            'Errors': summary['errors'],
+            'Mean (ms)': (summary['mean'] * 1000).round(1),
+            'Max (ms)': (summary['max'] * 1000).round(1),
+            'Last (ms)': (summary['last'] * 1000).round(1),
+            'Total (s)': summary['total'].round(3),
+            'Peak Memory (MB)': (summary['peak_bytes'] / 1e6).round(2)
+        })
+        st.dataframe(display_df, use_container_width=True, hide_index=True)
+        st.code(instrumentation.prometheus_text(), language="text")
 
 def show_about_tab():
     """Show the about tab content with F1 styling"""
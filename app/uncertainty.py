@@ -0,0 +1,162 @@
+"""
+Uncertainty Module - Conformal prediction intervals for predicted qualifying times
+
+A model of the same type is fitted on the earlier events of the history and
+wrapped in HybridPredictor, and the absolute errors of its predictions for
+the most recent events give the interval half-widths for each coverage level
+and ML weight. Drivers with enough held-out laps get their own half-width,
+and the rest fall back to the pooled one. The calibration is computed once
+per trained model, by the precompute job, the prediction job or the CLI, and
+stored with the model in the registry and with the precomputed predictions.
+Adding intervals to a predictions frame is then only a lookup by driver.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from app.constants import ML_WEIGHTS
+
+# Coverage levels for which half-widths are calibrated
+COVERAGE_LEVELS = (0.5, 0.8, 0.9, 0.95)
+
+# Coverage of the intervals shown in the dashboard and the API
+DEFAULT_COVERAGE = 0.9
+
+# Fraction of the events (the most recent ones) held out to measure errors
+CALIBRATION_FRACTION = 0.2
+
+# Weather the held-out events are predicted for; the features carry no session weather
+CALIBRATION_WEATHER = "dry"
+
+# Held-out rows a driver needs for a driver-specific half-width
+MIN_DRIVER_RESIDUALS = 20
+
+
+def _level_key(coverage):
+    return f"{coverage:.2f}"
+
+
+def conformal_quantile(abs_residuals, coverage):
+    """Split-conformal half-width for coverage, or None if there are too few residuals.
+
+    Uses the ceil((n + 1) * coverage) smallest absolute residual, which covers
+    a new exchangeable error with probability of at least coverage.
+    """
+    n = len(abs_residuals)
+    rank = math.ceil((n + 1) * coverage)
+    if n == 0 or rank > n:
+        return None
+    return float(np.partition(abs_residuals, rank - 1)[rank - 1])
+
+
+def _half_widths(abs_residuals, levels):
+    widths = {_level_key(level): conformal_quantile(abs_residuals, level) for level in levels}
+    return {level: width for level, width in widths.items() if width is not None}
+
+
+def _weight_key(ml_weight):
+    return "none" if ml_weight is None or pd.isnull(ml_weight) else f"{float(ml_weight):.1f}"
+
+
+def _calibration(abs_residuals, drivers, levels):
+    widths = {}
+    for driver, residuals in pd.Series(abs_residuals).groupby(drivers):
+        if driver and len(residuals) >= MIN_DRIVER_RESIDUALS:
+            widths[str(driver)] = _half_widths(residuals.to_numpy(), levels)
+    return {
+        'residuals': len(abs_residuals),
+        'pooled': _half_widths(abs_residuals, levels),
+        'drivers': widths
+    }
+
+
+def calibrate(model_type, X, y, events, params=None, ml_weights=ML_WEIGHTS, weather=CALIBRATION_WEATHER,
+              fraction=CALIBRATION_FRACTION, levels=COVERAGE_LEVELS):
+    """Calibrate interval half-widths of HybridPredictor predictions for a model type.
+
+    events is a DataFrame aligned with X with the Year, Round, Circuit and
+    Driver of each row. The last fraction of the events (by Year and Round)
+    is held out. A model trained on the earlier events predicts each held-out
+    circuit through HybridPredictor.predict_future_race, and its Predicted_Q3
+    is compared with the actual times of every driver in that event.
+
+    Returns a JSON-serializable dict with the pooled and per-driver
+    half-widths for each ML weight (one entry when the predictor takes no
+    ml_weight), or None if the history holds fewer than two events.
+    """
+    from src.model import QualifyingModel
+    from src.predictors import HybridPredictor
+    from app.batch_predictions import accepts_ml_weight, predict_future_races, scenario_grid
+
+    y = pd.Series(np.asarray(y), index=X.index)
+    events = events.loc[X.index]
+    sessions = pd.MultiIndex.from_frame(events[['Year', 'Round']].astype(int))
+    order = sessions.unique().sort_values()
+    if len(order) < 2:
+        return None
+    held_out_events = order[-max(1, math.ceil(len(order) * fraction)):]
+    held_out = sessions.isin(held_out_events)
+
+    model = QualifyingModel(model_type=model_type, **(params or {}))
+    model.train(X[~held_out], y[~held_out])
+    predictor = HybridPredictor(ml_model=model)
+    weights = list(ml_weights) if accepts_ml_weight(predictor) else [None]
+
+    actual = pd.DataFrame({
+        'Circuit': events.loc[held_out, 'Circuit'].astype(str).to_numpy(),
+        'Driver': events.loc[held_out, 'Driver'].astype(str).to_numpy(),
+        'Actual': y[held_out].to_numpy()
+    })
+    # Each held-out circuit is predicted once per weight, in one batch
+    predictions = predict_future_races(predictor, scenario_grid(actual['Circuit'].unique(), [weather], weights))
+    if predictions.empty:
+        return None
+    predictions = predictions[['Circuit', 'ML_Weight', 'Driver', 'Predicted_Q3']].astype(
+        {'Circuit': str, 'Driver': str}
+    )
+    matched = actual.merge(predictions, on=['Circuit', 'Driver'])
+    matched['Abs_Error'] = (matched['Actual'] - matched['Predicted_Q3']).abs()
+
+    return {
+        'events': len(held_out_events),
+        'weather': weather,
+        'weights': {
+            _weight_key(ml_weight): _calibration(group['Abs_Error'].to_numpy(), group['Driver'].to_numpy(), levels)
+            for ml_weight, group in matched.groupby('ML_Weight', dropna=False)
+        }
+    }
+
+
+def weight_calibration(calibration, ml_weight=None):
+    """Calibration entry for an ML weight, or None if it was not calibrated"""
+    if calibration is None:
+        return None
+    weights = calibration['weights']
+    return weights.get(_weight_key(ml_weight), weights.get(_weight_key(None)))
+
+
+def add_intervals(predictions, calibration, ml_weight=None, coverage=DEFAULT_COVERAGE):
+    """Return predictions with Uncertainty, Lower and Upper columns (seconds).
+
+    Uncertainty is the half-width of the interval around Predicted_Q3 that
+    covers the actual time with probability coverage.
+    """
+    entry = weight_calibration(calibration, ml_weight)
+    if entry is None:
+        raise ValueError(f"No calibration for ML weight {ml_weight}")
+    level = _level_key(coverage)
+    pooled = entry['pooled'].get(level)
+    if pooled is None:
+        raise ValueError(f"No calibrated half-width for coverage {coverage}")
+
+    driver_widths = pd.Series({
+        driver: widths[level] for driver, widths in entry['drivers'].items() if level in widths
+    }, dtype=float)
+    half_width = predictions['Driver'].astype(str).map(driver_widths).fillna(pooled)
+
+    return predictions.assign(
+        Uncertainty=half_width,
+        Lower=predictions['Predicted_Q3'] - half_width,
+        Upper=predictions['Predicted_Q3'] + half_width
+    )
@@ -0,0 +1,51 @@
+"""
+Benchmark memory per qualifying session, before and after compaction
+
+Usage: python -m benchmarks.bench_memory --seasons 5 --events 24
+"""
+import argparse
+
+import numpy as np
+
+from src.preprocess import DataProcessor
+from app.compact import bytes_per_session, compact_frame
+from app.staged_processor import MemoizedDataProcessor
+from benchmarks.synthetic import generate_history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seasons", type=int, default=5)
+    parser.add_argument("--events", type=int, default=24)
+    parser.add_argument("--drivers", type=int, default=20)
+    args = parser.parse_args()
+
+    history = generate_history(seasons=args.seasons, events=args.events, drivers=args.drivers)
+    # Identifiers arrive as Python strings from FastF1
+    history = history.astype({'Driver': object, 'Team': object, 'Circuit': object})
+
+    processor = DataProcessor()
+    cleaned = processor.clean_data(history)
+    engineered = processor.engineer_features(cleaned)
+
+    frames = {
+        'history': (history, compact_frame(history)),
+        'cleaned': (cleaned, compact_frame(cleaned)),
+        'engineered': (engineered, compact_frame(engineered))
+    }
+
+    print(f"{'Frame':<14}{'Before (B/session)':>20}{'After (B/session)':>20}{'Saved':>10}")
+    for name, (before, after) in frames.items():
+        before_bytes = bytes_per_session(before)
+        after_bytes = bytes_per_session(after)
+        print(f"{name:<14}{before_bytes:>20,.0f}{after_bytes:>20,.0f}{1 - after_bytes / before_bytes:>10.0%}")
+
+    # The chained path feeds each compacted stage output into the next stage
+    X, y, _ = MemoizedDataProcessor(compact=False).run(history)
+    X_compact, y_compact, _ = MemoizedDataProcessor(compact=True).run(history)
+    print(f"Chained compact path: max |dX| {np.abs(X_compact.to_numpy(float) - X.to_numpy(float)).max():.2e}, "
+          f"max |dy| {np.abs(np.asarray(y_compact, float) - np.asarray(y, float)).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark per-stage DataProcessor timings, cold and memoized
+
+Usage: python -m benchmarks.bench_pipeline_stages --seasons 5 --events 24
+"""
+import argparse
+import time
+
+from app.staged_processor import MemoizedDataProcessor, frame_fingerprint
+from benchmarks.synthetic import generate_history
+
+STAGES = ['clean_data', 'engineer_features', 'prepare_features']
+
+
+def time_stages(processor, data):
+    """Run the three stages in order and return {stage: seconds}"""
+    timings = {}
+    for stage in STAGES:
+        start = time.perf_counter()
+        data = getattr(processor, stage)(data)
+        timings[stage] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seasons", type=int, default=5)
+    parser.add_argument("--events", type=int, default=24)
+    parser.add_argument("--drivers", type=int, default=20)
+    args = parser.parse_args()
+
+    history = generate_history(seasons=args.seasons, events=args.events, drivers=args.drivers)
+    print(f"Synthetic history: {len(history)} rows "
+          f"({args.seasons} seasons x {args.events} events x {args.drivers} drivers)")
+
+    start = time.perf_counter()
+    frame_fingerprint(history)
+    print(f"Fingerprint of raw history: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    processor = MemoizedDataProcessor()
+    cold = time_stages(processor, history)
+    warm = time_stages(processor, history)
+
+    print(f"\n{'Stage':<20}{'Cold (ms)':>12}{'Memoized (ms)':>16}")
+    for stage in STAGES:
+        print(f"{stage:<20}{cold[stage] * 1000:>12.2f}{warm[stage] * 1000:>16.2f}")
+    print(f"{'total':<20}{sum(cold.values()) * 1000:>12.2f}{sum(warm.values()) * 1000:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
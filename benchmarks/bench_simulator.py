@@ -0,0 +1,51 @@
+"""
+Benchmark the Monte Carlo qualifying simulator
+
+Usage: python -m benchmarks.bench_simulator --simulations 100000 --repeats 5
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.simulator import simulate_qualifying
+
+
+def synthetic_predictions(drivers=20, base_time=90.0, spread=1.5, seed=0):
+    """Predicted Q3 times for a field spread over spread seconds"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Driver': [f"Driver {i + 1}" for i in range(drivers)],
+        'Team': [f"Team {i // 2 + 1}" for i in range(drivers)],
+        'Predicted_Q3': np.sort(base_time + rng.uniform(0, spread, drivers))
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--simulations", type=int, default=100_000)
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    predictions = synthetic_predictions(drivers=args.drivers)
+    simulate_qualifying(predictions, n_simulations=1000, seed=0)
+
+    timings = []
+    for repeat in range(args.repeats):
+        start = time.perf_counter()
+        result = simulate_qualifying(predictions, n_simulations=args.simulations, seed=repeat)
+        timings.append(time.perf_counter() - start)
+
+    median = statistics.median(timings)
+    print(f"{args.simulations:,} sessions x {args.drivers} drivers: "
+          f"median {median * 1000:.1f} ms, min {min(timings) * 1000:.1f} ms "
+          f"({args.simulations / median:,.0f} sessions/s)")
+    print()
+    print(result.summary.head(5).to_string(index=False, float_format="{:.3f}".format))
+
+
+if __name__ == "__main__":
+    main()
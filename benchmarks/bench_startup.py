@@ -0,0 +1,87 @@
+"""
+Benchmark cold-start latency of the Streamlit app
+
+Usage: python -m benchmarks.bench_startup --repeats 5 --output startup.json
+
+Every sample runs in a fresh interpreter, as on a new replica:
+- import: time to import app.ui, and which heavy libraries it pulled in
+- first render: time for Streamlit's AppTest to run the script once
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Libraries that should only load when the feature using them renders
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'plotly', 'sklearn', 'PIL', 'joblib', 'fastf1', 'src']
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.ui
+seconds = time.perf_counter() - start
+print(json.dumps({'seconds': seconds, 'loaded': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+RENDER_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+app = AppTest.from_file(%r, default_timeout=120)
+app.run()
+seconds = time.perf_counter() - start
+errors = [str(error.value) for error in app.exception]
+print(json.dumps({'seconds': seconds, 'loaded': [m for m in %r if m in sys.modules], 'errors': errors}))
+""" % (os.path.join(REPO_ROOT, "app", "ui.py"), HEAVY_MODULES)
+
+
+def run_probe(code):
+    """Run a probe in a fresh interpreter and return its JSON result"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])),
+               F1QP_OFFLINE="1")
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(code, repeats):
+    """Median of repeats probe runs, with the modules loaded by the last one"""
+    samples = [run_probe(code) for _ in range(repeats)]
+    return {
+        'median': statistics.median(sample['seconds'] for sample in samples),
+        'min': min(sample['seconds'] for sample in samples),
+        'repeats': repeats,
+        'loaded': samples[-1]['loaded'],
+        'errors': samples[-1].get('errors', [])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--skip-render", action="store_true", help="Only measure the import of app.ui")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = {'import': measure(IMPORT_PROBE, args.repeats)}
+    if not args.skip_render:
+        results['first_render'] = measure(RENDER_PROBE, args.repeats)
+
+    print(f"{'Phase':<16}{'Median (ms)':>14}{'Min (ms)':>12}  Heavy modules loaded")
+    for phase, timing in results.items():
+        loaded = ", ".join(timing['loaded']) or "none"
+        print(f"{phase:<16}{timing['median'] * 1000:>14.1f}{timing['min'] * 1000:>12.1f}  {loaded}")
+        for error in timing['errors']:
+            print(f"  error during {phase}: {error}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
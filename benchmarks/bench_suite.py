@@ -0,0 +1,180 @@
+"""
+Benchmark the full prediction pipeline on a synthetic history and flag regressions
+
+Usage:
+    python -m benchmarks.bench_suite --seasons 5 --output bench-results.json
+    python -m benchmarks.bench_suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_suite --baseline benchmarks/baseline.json --tolerance 0.25
+
+Times the DataProcessor stages, QualifyingModel.train/evaluate/cross_validate
+for every model type and HybridPredictor.predict_future_race. Each timing is
+the median of --repeats runs. Exits with status 1 when a benchmark is slower
+than the baseline by more than the tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+# Never reach the FastF1 API from a benchmark
+os.environ.setdefault("F1QP_OFFLINE", "1")
+
+from sklearn.model_selection import train_test_split
+
+from src.model import QualifyingModel
+from src.predictors import HybridPredictor
+from src.preprocess import DataProcessor
+from app.constants import CIRCUITS, ML_MODEL_MAP, WEATHER_CONDITIONS
+from benchmarks.synthetic import generate_history
+
+STAGES = ['clean_data', 'engineer_features', 'prepare_features']
+
+MODEL_TYPES = list(ML_MODEL_MAP.values())
+
+# Timings below this are dominated by noise and never flagged
+MIN_FLAGGED_SECONDS = 0.005
+
+
+def measure(func, repeats):
+    """Call func repeats times; return (timing summary, last result)"""
+    samples = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return {'median': statistics.median(samples), 'min': min(samples), 'repeats': repeats}, result
+
+
+def run_suite(seasons=3, events=24, drivers=20, repeats=3, seed=0, model_types=None):
+    """Run every benchmark and return a JSON-serializable results dict"""
+    model_types = MODEL_TYPES if model_types is None else list(model_types)
+    history = generate_history(seasons=seasons, events=events, drivers=drivers, seed=seed)
+    timings = {}
+
+    processor = DataProcessor()
+    data = history
+    for stage in STAGES:
+        timings[f"processor.{stage}"], data = measure(
+            lambda stage=stage, data=data: getattr(processor, stage)(data.copy()), repeats
+        )
+    X, y, _ = data
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    circuit, weather = CIRCUITS[0], WEATHER_CONDITIONS[0]
+
+    for model_type in model_types:
+        def fit():
+            model = QualifyingModel(model_type=model_type)
+            model.train(X_train, y_train)
+            return model
+
+        timings[f"model.{model_type}.train"], model = measure(fit, repeats)
+        timings[f"model.{model_type}.evaluate"], _ = measure(lambda: model.evaluate(X_test, y_test), repeats)
+        timings[f"model.{model_type}.cross_validate"], _ = measure(
+            lambda: QualifyingModel(model_type=model_type).cross_validate(X, y), repeats
+        )
+
+        predictor = HybridPredictor(ml_model=model)
+        timings[f"predictor.{model_type}.predict_future_race"], _ = measure(
+            lambda: predictor.predict_future_race(circuit, weather=weather), repeats
+        )
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'config': {'seasons': seasons, 'events': events, 'drivers': drivers,
+                   'rows': len(history), 'repeats': repeats, 'seed': seed},
+        'environment': {'python': platform.python_version(), 'machine': platform.machine(),
+                        'processor': platform.processor() or platform.machine()},
+        'timings': timings
+    }
+
+
+def find_regressions(results, baseline, tolerance=0.25):
+    """Benchmarks whose median is more than tolerance slower than the baseline"""
+    regressions = []
+    for name, timing in results['timings'].items():
+        reference = baseline['timings'].get(name)
+        if reference is None or timing['median'] < MIN_FLAGGED_SECONDS:
+            continue
+        ratio = timing['median'] / max(reference['median'], 1e-9)
+        if ratio > 1 + tolerance:
+            regressions.append({'name': name, 'baseline': reference['median'],
+                                'current': timing['median'], 'ratio': ratio})
+    return regressions
+
+
+def print_results(results, baseline=None):
+    """Print one line per benchmark, with the change against the baseline if given"""
+    config = results['config']
+    print(f"Synthetic history: {config['rows']} rows "
+          f"({config['seasons']} seasons x {config['events']} events x {config['drivers']} drivers), "
+          f"median of {config['repeats']}")
+    print(f"\n{'Benchmark':<44}{'Median (ms)':>14}{'Baseline (ms)':>16}{'Change':>10}")
+    for name, timing in results['timings'].items():
+        line = f"{name:<44}{timing['median'] * 1000:>14.2f}"
+        reference = (baseline or {}).get('timings', {}).get(name)
+        if reference is not None:
+            change = timing['median'] / max(reference['median'], 1e-9) - 1
+            line += f"{reference['median'] * 1000:>16.2f}{change:>+10.0%}"
+        print(line)
+
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json(results, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--events", type=int, default=24)
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--models", nargs="+", choices=MODEL_TYPES, default=MODEL_TYPES)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --save-baseline")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Save these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline before flagging (default: 0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = run_suite(seasons=args.seasons, events=args.events, drivers=args.drivers,
+                        repeats=args.repeats, seed=args.seed, model_types=args.models)
+    baseline = _read_json(args.baseline) if args.baseline else None
+    print_results(results, baseline)
+
+    if args.output:
+        _write_json(results, args.output)
+    if args.save_baseline:
+        _write_json(results, args.save_baseline)
+        print(f"\nSaved baseline to {args.save_baseline}")
+
+    if baseline is not None:
+        if baseline.get('config') != results['config']:
+            print("\nWarning: baseline was recorded with a different configuration")
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  {regression['name']}: {regression['baseline'] * 1000:.2f} ms -> "
+                      f"{regression['current'] * 1000:.2f} ms ({regression['ratio']:.2f}x)")
+            sys.exit(1)
+        print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ import { useState } from "react"
 import { Card } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs"
-import { fetchHistoricalData, fetchModelPerformance } from "@/lib/mock-data"
+import { getHistoricalData, getModelPerformance } from "@/lib/api"
 import dynamic from "next/dynamic"
 
 // Dynamically import chart components to avoid SSR issues
@@ -17,26 +17,24 @@ const DataAnalysisTab = () => {
   const [isLoadingHistorical, setIsLoadingHistorical] = useState(false)
   const [isLoadingModel, setIsLoadingModel] = useState(false)
 
-  const handleFetchHistoricalData = () => {
+  const handleFetchHistoricalData = async () => {
     setIsLoadingHistorical(true)
 
-    // Simulate API call delay
-    setTimeout(() => {
-      const data = fetchHistoricalData()
-      setHistoricalData(data)
+    try {
+      setHistoricalData(await getHistoricalData())
+    } finally {
       setIsLoadingHistorical(false)
-    }, 1500)
+    }
   }
 
-  const handleTrainModel = () => {
+  const handleTrainModel = async () => {
     setIsLoadingModel(true)
 
-    // Simulate API call delay
-    setTimeout(() => {
-      const data = fetchModelPerformance()
-      setModelPerformance(data)
+    try {
+      setModelPerformance(await getModelPerformance())
+    } finally {
       setIsLoadingModel(false)
-    }, 2000)
+    }
   }
 
   return (
@@ -85,7 +85,12 @@ const PredictionResults: React.FC<PredictionResultsProps> = ({ predictions, circ
                       </div>
                     </td>
                     <td className="p-2 text-left">{driver.team}</td>
-                    <td className="p-2 text-center font-bold">{driver.time}</td>
+                    <td className="p-2 text-center font-bold">
+                      {driver.time}
+                      {driver.uncertainty !== undefined && (
+                        <span className="ml-1 text-xs font-normal text-gray-400">±{driver.uncertainty.toFixed(3)}</span>
+                      )}
+                    </td>
                     <td className={`p-2 text-center ${position === 1 ? "text-yellow-400 font-bold" : ""}`}>
                       {driver.gap}
                     </td>
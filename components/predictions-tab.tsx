@@ -7,7 +7,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@
 import { Slider } from "@/components/ui/slider"
 import { Switch } from "@/components/ui/switch"
 import { Label } from "@/components/ui/label"
-import { generatePredictions } from "@/lib/mock-data"
+import { getPredictions } from "@/lib/api"
 import PredictionResults from "./prediction-results"
 import { CircuitSelector } from "./circuit-selector"
 
@@ -21,12 +21,11 @@ const PredictionsTab = () => {
   const [predictions, setPredictions] = useState(null)
   const [isLoading, setIsLoading] = useState(false)
 
-  const handleGeneratePredictions = () => {
+  const handleGeneratePredictions = async () => {
     setIsLoading(true)
 
-    // Simulate API call delay
-    setTimeout(() => {
-      const results = generatePredictions(selectedCircuit, {
+    try {
+      const results = await getPredictions(selectedCircuit, {
         modelType,
         mlModel,
         usePerformance,
@@ -34,8 +33,9 @@ const PredictionsTab = () => {
         weather,
       })
       setPredictions(results)
+    } finally {
       setIsLoading(false)
-    }, 1500)
+    }
   }
 
   return (
@@ -0,0 +1,52 @@
+import type { PredictionData, PredictionOptions, HistoricalData, ModelPerformanceData } from "./types"
+import { generatePredictions, fetchHistoricalData, fetchModelPerformance } from "./mock-data"
+
+// Base URL of the Python API (python -m app.api); mock data is used when unset
+const API_URL = process.env.NEXT_PUBLIC_F1QP_API_URL
+
+async function getJson<T>(path: string, params: Record<string, string> = {}): Promise<T> {
+  const query = new URLSearchParams(params).toString()
+  // "no-cache" revalidates with If-None-Match, so unchanged results come back as 304
+  const response = await fetch(`${API_URL}${path}${query ? `?${query}` : ""}`, { cache: "no-cache" })
+  if (!response.ok) {
+    throw new Error(`${path} failed with status ${response.status}`)
+  }
+  return response.json()
+}
+
+async function withFallback<T>(request: () => Promise<T>, fallback: () => T): Promise<T> {
+  if (!API_URL) {
+    return fallback()
+  }
+  try {
+    return await request()
+  } catch (error) {
+    console.warn("Prediction API unavailable, using mock data", error)
+    return fallback()
+  }
+}
+
+export function getPredictions(circuit: string, options: PredictionOptions): Promise<PredictionData[]> {
+  return withFallback(
+    () =>
+      getJson<PredictionData[]>("/api/predictions", {
+        circuit,
+        modelType: options.modelType,
+        mlModel: options.mlModel,
+        mlWeight: options.mlWeight.toFixed(1),
+        weather: options.weather,
+      }),
+    () => generatePredictions(circuit, options),
+  )
+}
+
+export function getHistoricalData(): Promise<HistoricalData> {
+  return withFallback(() => getJson<HistoricalData>("/api/historical"), fetchHistoricalData)
+}
+
+export function getModelPerformance(mlModel = "linear"): Promise<ModelPerformanceData> {
+  return withFallback(
+    () => getJson<ModelPerformanceData>("/api/model-performance", { mlModel }),
+    fetchModelPerformance,
+  )
+}
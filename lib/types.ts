@@ -5,6 +5,8 @@ export interface PredictionData {
   time: string
   gap: string
   rawTime?: number
+  // Half-width in seconds of the 90% prediction interval around rawTime
+  uncertainty?: number
 }
 
 export interface PredictionOptions {
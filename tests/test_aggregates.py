@@ -0,0 +1,67 @@
+"""
+Tests for the incrementally updated historical rollups
+"""
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from app.aggregates import AGGREGATE_LEVELS, HistoricalAggregates
+
+ROUNDS = range(1, 6)
+
+
+def history(rounds=ROUNDS, partial=None):
+    """Cleaned history with 10 drivers per round; round `partial` keeps only 4"""
+    rng = np.random.default_rng(0)
+    frames = []
+    for round_number in rounds:
+        drivers = 4 if round_number == partial else 10
+        frames.append(pd.DataFrame({
+            'Year': 2024,
+            'Round': round_number,
+            'Circuit': f"Circuit {round_number % 3}",
+            'Driver': [f"Driver {i}" for i in range(drivers)],
+            'Team': [f"Team {i // 2}" for i in range(drivers)],
+            'Q3_sec': 80 + rng.normal(size=drivers)
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def assert_same_tables(updated, built):
+    for level, key in AGGREGATE_LEVELS.items():
+        expected = built.table(level).sort_values(key).reset_index(drop=True)
+        actual = updated.table(level).sort_values(key).reset_index(drop=True)
+        pdt.assert_frame_equal(actual[expected.columns], expected, check_dtype=False)
+
+
+def test_update_with_new_sessions_matches_build():
+    full = history()
+    aggregates = HistoricalAggregates.build(history(rounds=range(1, 4)))
+
+    assert_same_tables(aggregates.update(full), HistoricalAggregates.build(full))
+
+
+def test_unchanged_history_keeps_rollups():
+    aggregates = HistoricalAggregates.build(history())
+    assert aggregates.update(history()) is aggregates
+
+
+def test_refetched_session_replaces_partial_rollups():
+    full = history()
+    aggregates = HistoricalAggregates.build(history(partial=4))
+
+    updated = aggregates.update(full)
+
+    assert updated is not aggregates
+    assert int(updated.table('season')['count'].iloc[0]) == len(full)
+    assert_same_tables(updated, HistoricalAggregates.build(full))
+
+
+def test_saved_rollups_round_trip(tmp_path):
+    aggregates = HistoricalAggregates.build(history())
+    aggregates.save(str(tmp_path))
+
+    loaded = HistoricalAggregates.load(str(tmp_path))
+
+    assert loaded.sessions == aggregates.sessions
+    assert loaded.update(history()) is loaded
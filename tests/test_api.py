@@ -0,0 +1,84 @@
+"""
+Tests for the API's response cache and conditional GETs
+"""
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from app.lru_cache import LRUCache
+
+# app.api loads the pipeline, which needs the src package
+pytest.importorskip("src.predictors")
+api = pytest.importorskip("app.api")
+
+
+class Data:
+    """Stand-in for the session cache: a version and the calls per version"""
+
+    def __init__(self):
+        self.version = 'v1'
+        self.computed = []
+
+
+@pytest.fixture
+def server(monkeypatch):
+    data = Data()
+
+    def endpoint(query):
+        def compute():
+            data.computed.append(data.version)
+            return {'version': data.version, 'circuit': query.get('circuit', ['Japan'])[0]}
+        return query.get('circuit', ['Japan'])[0], compute
+
+    monkeypatch.setitem(api.ENDPOINTS, '/api/test', endpoint)
+    monkeypatch.setattr(api, '_responses', LRUCache())
+    monkeypatch.setattr(api.shared_pipeline, 'reload_if_changed', lambda: False)
+    monkeypatch.setattr(api.shared_pipeline, 'data_version', lambda: data.version)
+
+    httpd = api.make_server(port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", data
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url, etag=None):
+    """(status, ETag, body) of a GET, with If-None-Match when etag is given"""
+    request = urllib.request.Request(url, headers={'If-None-Match': etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.headers['ETag'], response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers['ETag'], e.read()
+
+
+def test_revalidation_with_matching_etag_is_not_modified(server):
+    base, data = server
+    status, etag, body = get(base + "/api/test")
+    assert status == 200 and etag and body
+
+    assert get(base + "/api/test", etag) == (304, etag, b"")
+    assert get(base + "/api/test", f'"other", W/{etag}')[0] == 304
+    assert get(base + "/api/test", '"other"')[0] == 200
+    assert data.computed == ['v1']
+
+
+def test_parameters_and_data_version_change_the_etag(server):
+    base, data = server
+    _, etag, _ = get(base + "/api/test")
+
+    _, other_circuit, _ = get(base + "/api/test?circuit=Monaco")
+    assert other_circuit != etag
+
+    data.version = 'v2'
+    status, new_etag, _ = get(base + "/api/test", etag)
+    assert status == 200 and new_etag != etag
+    assert data.computed == ['v1', 'v1', 'v2']
+
+
+def test_unknown_endpoint_is_not_found(server):
+    base, _ = server
+    assert get(base + "/api/unknown")[0] == 404
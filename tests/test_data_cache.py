@@ -0,0 +1,171 @@
+"""
+Tests for CachedDataFetcher against local stand-ins for the FastF1 backend
+"""
+import pandas as pd
+import pytest
+
+from app.data_cache import CachedDataFetcher, FetchReport
+
+YEAR = 2024
+ROUNDS = range(1, 7)
+
+
+def schedule(year):
+    """Six qualifying sessions that all took place"""
+    return [
+        {'year': year, 'round': round_number, 'circuit': f"Circuit {round_number}",
+         'date': pd.Timestamp("2024-03-01") + pd.Timedelta(weeks=round_number)}
+        for round_number in ROUNDS
+    ]
+
+
+def session(year, round_number):
+    return pd.DataFrame({
+        'Year': year,
+        'Round': round_number,
+        'Circuit': f"Circuit {round_number}",
+        'Driver': [f"Driver {i}" for i in range(20)],
+        'Team': [f"Team {i // 2}" for i in range(20)],
+        'Position': range(1, 21),
+        'Q1': pd.to_timedelta(90.0, unit='s'),
+        'Q2': pd.to_timedelta(89.5, unit='s'),
+        'Q3': pd.to_timedelta(89.0, unit='s')
+    })
+
+
+class FlakyLoader:
+    """Session loader failing a given number of times per session (-1: always)"""
+
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.calls = {}
+
+    def __call__(self, year, round_number):
+        pair = (year, round_number)
+        self.calls[pair] = self.calls.get(pair, 0) + 1
+        remaining = self.failures.get(pair, 0)
+        if remaining:
+            if remaining > 0:
+                self.failures[pair] = remaining - 1
+            raise ConnectionError(f"{year} R{round_number} unavailable")
+        return session(year, round_number)
+
+
+def make_fetcher(cache_dir, loader, **options):
+    options = {'seasons': [YEAR], 'offline': False, 'retries': 2, 'backoff': 0.0, 'max_workers': 3, **options}
+    return CachedDataFetcher(cache_dir=str(cache_dir), loader=loader, schedule_loader=schedule, **options)
+
+
+def test_transient_failures_are_retried(tmp_path):
+    loader = FlakyLoader({(YEAR, 2): 2})
+    fetcher = make_fetcher(tmp_path, loader)
+
+    history = fetcher.fetch_recent_seasons(verbose=False)
+
+    assert loader.calls[(YEAR, 2)] == 3
+    assert fetcher.last_report.ok
+    assert sorted(history['Round'].unique()) == list(ROUNDS)
+
+
+def test_permanent_failure_keeps_other_sessions(tmp_path):
+    loader = FlakyLoader({(YEAR, 3): -1})
+    fetcher = make_fetcher(tmp_path, loader)
+
+    history = fetcher.fetch_recent_seasons(verbose=False)
+
+    report = fetcher.last_report
+    assert loader.calls[(YEAR, 3)] == fetcher.retries + 1
+    assert list(report.failed) == [(YEAR, 3)]
+    assert "unavailable" in report.failed[(YEAR, 3)]
+    assert sorted(report.fetched) == [(YEAR, r) for r in ROUNDS if r != 3]
+    assert 3 not in set(history['Round'])
+    assert len(history) == 5 * 20
+
+
+def test_cached_sessions_are_not_fetched_again(tmp_path):
+    make_fetcher(tmp_path, FlakyLoader()).fetch_recent_seasons(verbose=False)
+
+    loader = FlakyLoader()
+    fetcher = make_fetcher(tmp_path, loader)
+    fetcher.fetch_recent_seasons(verbose=False)
+
+    assert loader.calls == {}
+    assert sorted(fetcher.last_report.cached) == [(YEAR, r) for r in ROUNDS]
+
+
+def test_failed_session_falls_back_to_stale_copy(tmp_path):
+    fetcher = make_fetcher(tmp_path, FlakyLoader())
+    fetcher.fetch_recent_seasons(verbose=False)
+    fetcher.cache.write(YEAR, 4, session(YEAR, 4).head(5))  # partial copy, refetched next time
+
+    fetcher = make_fetcher(tmp_path, FlakyLoader({(YEAR, 4): -1}))
+    history = fetcher.fetch_recent_seasons(verbose=False)
+
+    assert (YEAR, 4) in fetcher.last_report.failed
+    assert (history['Round'] == 4).sum() == 5
+
+
+def test_progress_reports_every_session(tmp_path):
+    events = []
+    fetcher = make_fetcher(tmp_path, FlakyLoader({(YEAR, 5): -1}))
+
+    fetcher.fetch_recent_seasons(verbose=False, progress=events.append)
+
+    assert [event['completed'] for event in events] == list(range(1, len(ROUNDS) + 1))
+    assert {event['total'] for event in events} == {len(ROUNDS)}
+    assert [event['status'] for event in events if event['round'] == 5] == ['failed']
+
+
+def test_fetch_report_summary():
+    report = FetchReport()
+    report.cached.append((YEAR, 1))
+    report.fetched.append((YEAR, 2))
+    assert report.ok
+    assert report.summary() == "1 cached, 1 fetched, 0 failed"
+
+    report.failed[(YEAR, 4)] = "timeout"
+    report.failed[(YEAR, 3)] = "timeout"
+    assert not report.ok
+    assert report.summary() == "1 cached, 1 fetched, 2 failed (2024 R3, 2024 R4)"
+
+
+def test_first_ingest_mark_stops_before_failed_session(tmp_path):
+    fetcher = make_fetcher(tmp_path, FlakyLoader({(YEAR, 3): -1}))
+    history = fetcher.fetch_incremental(verbose=False)
+
+    assert 3 not in set(history['Round'])
+    assert fetcher.cache.high_water_mark == (YEAR, 2)
+
+    # The next incremental run picks the failed session up again
+    loader = FlakyLoader()
+    fetcher = make_fetcher(tmp_path, loader)
+    history = fetcher.fetch_incremental(verbose=False)
+
+    assert loader.calls == {(YEAR, 3): 1}
+    assert sorted(history['Round'].unique()) == list(ROUNDS)
+    assert len(history) == len(ROUNDS) * 20
+    assert fetcher.cache.high_water_mark == (YEAR, 6)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_offline_uses_only_cached_sessions(tmp_path, workers):
+    make_fetcher(tmp_path, FlakyLoader({(YEAR, 6): -1})).fetch_recent_seasons(verbose=False)
+
+    loader = FlakyLoader()
+    fetcher = make_fetcher(tmp_path, loader, offline=True, max_workers=workers)
+    history = fetcher.fetch_recent_seasons(verbose=False)
+
+    assert loader.calls == {}
+    assert sorted(history['Round'].unique()) == [1, 2, 3, 4, 5]
+
+
+def test_version_follows_sessions_stored_by_other_instances(tmp_path):
+    fetcher = make_fetcher(tmp_path, FlakyLoader({(YEAR, 6): -1}))
+    fetcher.fetch_recent_seasons(verbose=False)
+    version = fetcher.cache.version()
+    assert version is not None
+    assert version == CachedDataFetcher(cache_dir=str(tmp_path)).cache.version()
+
+    make_fetcher(tmp_path, FlakyLoader()).fetch_incremental(verbose=False)
+
+    assert fetcher.cache.version() != version
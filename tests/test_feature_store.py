@@ -0,0 +1,59 @@
+"""
+Tests for the memory-mapped feature store
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from app.feature_store import load_features, save_features
+from app.model_registry import dataset_fingerprint
+
+
+def features(seed=0, rows=50):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        'Q1_sec': 80 + rng.normal(size=rows),
+        'Grid': rng.integers(1, 21, size=rows),
+        'Wet': rng.random(rows) > 0.8
+    }, index=np.arange(100, 100 + rows))
+    y = pd.Series(80 + rng.normal(size=rows), index=X.index, name='Q3_sec')
+    metadata = pd.DataFrame({'Driver': [f"Driver {i % 20}" for i in range(rows)]}, index=X.index)
+    return X, y, metadata
+
+
+def test_round_trip_keeps_dtypes_and_fingerprint(tmp_path):
+    X, y, metadata = features()
+    X_loaded, y_loaded, metadata_loaded = load_features(save_features(X, y, metadata, feature_dir=tmp_path))
+
+    pdt.assert_frame_equal(X_loaded, X)
+    pdt.assert_series_equal(y_loaded, y)
+    pdt.assert_frame_equal(metadata_loaded, metadata)
+    assert dataset_fingerprint(X_loaded, y_loaded) == dataset_fingerprint(X, y)
+
+
+def test_save_keeps_only_the_newest_matrices(tmp_path):
+    paths = []
+    start = time.time() - 60
+    for seed in range(4):
+        X, y, _ = features(seed)
+        paths.append(save_features(X, y, feature_dir=tmp_path, keep=2))
+        # Distinct modification times even on coarse filesystem clocks
+        os.utime(paths[-1], (start + seed, start + seed))
+
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in paths[-2:])
+
+
+def test_reused_matrix_counts_as_recent(tmp_path):
+    first = features(0)
+    first_path = save_features(*first[:2], feature_dir=tmp_path, keep=2)
+    os.utime(first_path, (0, 0))
+    save_features(*features(1)[:2], feature_dir=tmp_path, keep=2)
+
+    assert save_features(*first[:2], feature_dir=tmp_path, keep=2) == first_path
+    save_features(*features(2)[:2], feature_dir=tmp_path, keep=2)
+
+    assert os.path.exists(first_path)
+    assert len(os.listdir(tmp_path)) == 2
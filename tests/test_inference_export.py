@@ -0,0 +1,77 @@
+"""
+Tests for the NumPy inference artifacts of trained models
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.inference_export import NumpyPredictor, export_model, load_artifact, save_artifact, verify_export
+
+ESTIMATORS = {
+    'linear': lambda: LinearRegression(),
+    'ridge': lambda: Ridge(alpha=1.0),
+    'rf': lambda: RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0),
+    'gbm': lambda: GradientBoostingRegressor(n_estimators=30, max_depth=3, random_state=0)
+}
+
+
+class StandInModel:
+    """QualifyingModel stand-in: a scaled scikit-learn pipeline under .model"""
+
+    def __init__(self, model_type):
+        self.model_type = model_type
+        self.model = Pipeline([('scaler', StandardScaler()), ('model', ESTIMATORS[model_type]())])
+
+    def train(self, X, y):
+        self.model.fit(X, y)
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+
+def training_data(rows=300):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({
+        'Q1_sec': 80 + rng.normal(size=rows),
+        'Q2_sec': 79.5 + rng.normal(size=rows),
+        'Grid': rng.integers(1, 21, size=rows).astype(float)
+    })
+    y = 0.4 * X['Q1_sec'] + 0.6 * X['Q2_sec'] - 0.05 * X['Grid'] + rng.normal(scale=0.1, size=rows)
+    return X, y
+
+
+@pytest.mark.parametrize('model_type', list(ESTIMATORS))
+def test_export_reproduces_predictions(model_type, tmp_path):
+    X, y = training_data()
+    model = StandInModel(model_type)
+    model.train(X, y)
+
+    artifact = load_artifact(save_artifact(export_model(model), tmp_path / "model.npz"))
+
+    assert verify_export(model, X, artifact) <= 1e-6
+    np.testing.assert_allclose(NumpyPredictor(artifact).predict(X[::-1]), model.predict(X[::-1]), atol=1e-6)
+
+
+def test_predictor_reorders_columns_by_name():
+    X, y = training_data()
+    model = StandInModel('ridge')
+    model.train(X, y)
+
+    predictor = NumpyPredictor(export_model(model))
+
+    np.testing.assert_allclose(predictor.predict(X[['Grid', 'Q2_sec', 'Q1_sec']]), model.predict(X), atol=1e-9)
+
+
+def test_verify_export_rejects_a_diverging_artifact():
+    X, y = training_data()
+    model = StandInModel('linear')
+    model.train(X, y)
+    artifact = export_model(model)
+    artifact['intercept'] = artifact['intercept'] + 0.01
+
+    with pytest.raises(ValueError):
+        verify_export(model, X, artifact)
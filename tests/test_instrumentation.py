@@ -0,0 +1,52 @@
+"""
+Tests for the per-stage timing and memory records
+"""
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from app import instrumentation
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def records(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(instrumentation, '_enabled', True)
+    monkeypatch.setattr(instrumentation, '_track_memory', True)
+    monkeypatch.setattr(instrumentation, '_listeners', [recorded.append])
+    monkeypatch.setattr(instrumentation, '_stats', {})
+    was_tracing = tracemalloc.is_tracing()
+    yield recorded
+    if not was_tracing:
+        tracemalloc.stop()
+
+
+def peaks(records):
+    return {record['stage']: record['peak_bytes'] for record in records}
+
+
+def test_outer_stage_keeps_peak_reached_before_inner_stage(records):
+    with instrumentation.stage('outer'):
+        block = np.ones(8 * MB, dtype=np.uint8)
+        del block
+        with instrumentation.stage('inner'):
+            pass
+
+    assert peaks(records)['outer'] >= 8 * MB
+    assert peaks(records)['inner'] < MB
+
+
+def test_outer_stage_includes_peak_of_inner_stage(records):
+    with instrumentation.stage('outer'):
+        with instrumentation.stage('inner'):
+            block = np.ones(8 * MB, dtype=np.uint8)
+            del block
+        with instrumentation.stage('second'):
+            pass
+
+    assert peaks(records)['inner'] >= 8 * MB
+    assert peaks(records)['outer'] >= 8 * MB
+    assert peaks(records)['second'] < MB
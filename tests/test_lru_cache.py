@@ -0,0 +1,69 @@
+"""
+Tests for the thread-safe LRU cache shared by the pipeline
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.lru_cache import LRUCache
+
+THREADS = 8
+
+
+def test_concurrent_requests_compute_once():
+    cache = LRUCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        futures = [executor.submit(cache.get_or_compute, 'key', compute) for _ in range(THREADS)]
+        started.wait(5)
+        release.set()
+        results = [future.result(5) for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.misses == 1
+
+
+def test_failure_reaches_waiters_and_is_not_cached():
+    cache = LRUCache()
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("fetch failed")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        owner = executor.submit(cache.get_or_compute, 'key', failing)
+        started.wait(5)
+        waiter = executor.submit(cache.get_or_compute, 'key', lambda: 'unused')
+        # Let the waiter block on the computation in flight
+        time.sleep(0.2)
+        release.set()
+        for future in (owner, waiter):
+            with pytest.raises(RuntimeError):
+                future.result(5)
+
+    assert 'key' not in cache
+    assert cache.get_or_compute('key', lambda: 'retried') == 'retried'
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert 'a' in cache and 'c' in cache
+    assert 'b' not in cache
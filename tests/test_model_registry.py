@@ -0,0 +1,106 @@
+"""
+Tests for the on-disk model registry
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from app import model_registry
+from app.model_registry import ModelRegistry, dataset_fingerprint
+
+
+def dataset(rows=50, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(rows, 3)), columns=['a', 'b', 'c'])
+    return X, pd.Series(rng.normal(size=rows))
+
+
+def test_fingerprint_depends_on_content():
+    X, y = dataset()
+    assert dataset_fingerprint(X, y) == dataset_fingerprint(X.copy(), y.copy())
+    assert dataset_fingerprint(X, y) != dataset_fingerprint(X.iloc[:40], y.iloc[:40])
+
+
+def test_put_replaces_previous_model_of_slot(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.put('rf', 'old', {'trees': 1})
+    registry.put('rf', 'new', {'trees': 2})
+
+    reloaded = ModelRegistry(str(tmp_path))
+    assert reloaded.get('rf', 'old') is None
+    assert reloaded.get('rf', 'new') == {'trees': 2}
+    assert not os.path.exists(registry.path(registry.key('rf', None, 'old')))
+
+
+def test_slots_are_separate_per_params(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.put('rf', 'data', {'depth': None})
+    registry.put('rf', 'data', {'depth': 3}, params={'max_depth': 3})
+
+    reloaded = ModelRegistry(str(tmp_path))
+    assert reloaded.get('rf', 'data') == {'depth': None}
+    assert reloaded.get('rf', 'data', params={'max_depth': 3}) == {'depth': 3}
+
+
+def test_evaluation_models_do_not_evict_prediction_models(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, 'DEFAULT_REGISTRY_DIR', str(tmp_path))
+    monkeypatch.setattr(model_registry, 'EVALUATION_REGISTRY_DIR', str(tmp_path / "evaluation"))
+    monkeypatch.setattr(model_registry, '_default_registry', None)
+    monkeypatch.setattr(model_registry, '_evaluation_registry', None)
+
+    X, y = dataset()
+    full = dataset_fingerprint(X, y)
+    split = dataset_fingerprint(X.iloc[:40], y.iloc[:40])
+    model_registry.default_registry().put('rf', full, {'rows': 50})
+    model_registry.evaluation_registry().put('rf', split, {'rows': 40})
+
+    assert ModelRegistry(str(tmp_path)).get('rf', full) == {'rows': 50}
+    assert ModelRegistry(str(tmp_path / "evaluation")).get('rf', split) == {'rows': 40}
+
+
+def test_index_keeps_updates_from_other_registry_instances(tmp_path):
+    first = ModelRegistry(str(tmp_path))
+    second = ModelRegistry(str(tmp_path))
+    first.put('linear', 'data', {'coef': 1})
+    second.put('ridge', 'data', {'coef': 2})
+
+    index = ModelRegistry(str(tmp_path))._read_index()
+    assert sorted(entry['model_type'] for entry in index.values()) == ['linear', 'ridge']
+
+
+class ForestModel:
+    """QualifyingModel stand-in wrapping a small random forest"""
+
+    model_type = 'rf'
+
+    def __init__(self):
+        from sklearn.ensemble import RandomForestRegressor
+        self.model = RandomForestRegressor(n_estimators=10, random_state=0)
+
+    def train(self, X, y):
+        self.model.fit(X, y)
+        return self
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+
+def test_incremental_update_is_reported(tmp_path):
+    X, y = dataset(rows=200)
+    y = X['a'] + 0.01 * y
+    registry = ModelRegistry(str(tmp_path))
+    base = ForestModel().train(X.iloc[:180], y.iloc[:180])
+    registry.put('rf', dataset_fingerprint(X.iloc[:180], y.iloc[:180]), base,
+                 info={'rows': 180, 'base_estimators': 10})
+
+    events = []
+    registry.get_or_update('rf', X, y, progress=events.append)
+
+    report = registry.last_report
+    assert report.mode == 'warm_start'
+    assert report.new_rows == 20
+    assert [event['report'] for event in events if event['event'] == 'retrain'] == [report.summary()]
+
+    registry.get_or_update('rf', X, y)
+    assert registry.last_report is None
@@ -0,0 +1,52 @@
+"""
+Tests for the Monte Carlo qualifying simulator
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.simulator import driver_sigmas, session_sizes, simulate_qualifying
+
+SIMULATIONS = 2000
+
+
+def predictions(n_drivers):
+    return pd.DataFrame({
+        'Driver': [f"Driver {i}" for i in range(n_drivers)],
+        'Team': [f"Team {i // 2}" for i in range(n_drivers)],
+        'Predicted_Q3': 80.0 + 0.1 * np.arange(n_drivers)
+    })
+
+
+@pytest.mark.parametrize("n_drivers, sizes", [(20, (15, 10)), (22, (16, 10)), (24, (17, 10)), (10, (8, 5))])
+def test_session_sizes_follow_the_field(n_drivers, sizes):
+    assert session_sizes(n_drivers) == sizes
+
+
+@pytest.mark.parametrize("n_drivers", [10, 20, 22])
+def test_elimination_counts(n_drivers):
+    q2_size, q3_size = session_sizes(n_drivers)
+    result = simulate_qualifying(predictions(n_drivers), n_simulations=SIMULATIONS, seed=0)
+    summary = result.summary
+
+    assert result.q1_out.sum() == (n_drivers - q2_size) * SIMULATIONS
+    assert result.q2_out.sum() == (q2_size - q3_size) * SIMULATIONS
+    assert summary['Q3_Prob'].sum() == pytest.approx(q3_size)
+    assert summary['Pole_Prob'].sum() == pytest.approx(1.0)
+    np.testing.assert_allclose(result.position_distribution.sum(axis=1), 1.0)
+    np.testing.assert_allclose(summary['Q1_Out_Prob'] + summary['Q2_Out_Prob'] + summary['Q3_Prob'], 1.0)
+
+
+def test_fastest_driver_is_favourite():
+    summary = simulate_qualifying(predictions(20), n_simulations=SIMULATIONS, seed=0).summary
+    assert summary['Driver'].iloc[0] == "Driver 0"
+    assert summary['Pole_Prob'].iloc[0] == summary['Pole_Prob'].max()
+
+
+def test_driver_sigmas_follow_uncertainty():
+    frame = predictions(3).assign(Uncertainty=[0.1, 0.2, np.nan])
+    form_sigma, lap_sigma = driver_sigmas(frame)
+
+    assert form_sigma[1] == pytest.approx(2 * form_sigma[0])
+    assert lap_sigma[1] == pytest.approx(2 * lap_sigma[0])
+    assert form_sigma[2] == pytest.approx(0.20)
@@ -0,0 +1,66 @@
+"""
+Tests for the memoized DataProcessor stages
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.staged_processor import MemoizedDataProcessor
+from benchmarks.synthetic import generate_history
+
+
+class CountingProcessor:
+    """DataProcessor stand-in recording the dtypes each stage receives"""
+
+    def __init__(self):
+        self.calls = []
+
+    def clean_data(self, data):
+        self.calls.append(('clean_data', dict(data.dtypes)))
+        return data.assign(Q3_sec=data['Q3'].dt.total_seconds())
+
+    def engineer_features(self, data):
+        self.calls.append(('engineer_features', dict(data.dtypes)))
+        return data.assign(Gap=data['Q3_sec'] - data.groupby(['Year', 'Round'])['Q3_sec'].transform('min'))
+
+    def prepare_features(self, data):
+        self.calls.append(('prepare_features', dict(data.dtypes)))
+        return data[['Gap']], data['Q3_sec'], data[['Driver', 'Team', 'Circuit']]
+
+
+def history():
+    return generate_history(seasons=1, events=4).astype({'Driver': object, 'Team': object, 'Circuit': object})
+
+
+def test_stages_run_once_per_input():
+    processor = CountingProcessor()
+    staged = MemoizedDataProcessor(processor=processor, compact=False)
+
+    staged.run(history())
+    staged.run(history())
+
+    assert [stage for stage, _ in processor.calls] == ['clean_data', 'engineer_features', 'prepare_features']
+
+
+def test_stages_receive_original_dtypes_by_default():
+    processor = CountingProcessor()
+    data = history()
+
+    X, y, _ = MemoizedDataProcessor(processor=processor).run(data)
+
+    assert processor.calls[1][1]['Driver'] == object
+    assert processor.calls[2][1]['Q3_sec'] == np.float64
+    assert y.dtype == np.float64
+
+
+def test_compacted_chain_matches_uncompacted_path():
+    DataProcessor = pytest.importorskip("src.preprocess").DataProcessor
+    data = history()
+
+    X, y, _ = MemoizedDataProcessor(processor=DataProcessor(), compact=False).run(data)
+    X_compact, y_compact, _ = MemoizedDataProcessor(processor=DataProcessor(), compact=True).run(data)
+
+    assert list(X_compact.columns) == list(X.columns)
+    assert len(y_compact) == len(y)
+    np.testing.assert_allclose(X_compact.to_numpy(dtype=float), X.to_numpy(dtype=float), rtol=1e-5, atol=1e-4)
+    np.testing.assert_allclose(np.asarray(y_compact, dtype=float), np.asarray(y, dtype=float), rtol=1e-5, atol=1e-4)
@@ -0,0 +1,88 @@
+"""
+Tests for the HTML built by the Streamlit UI
+"""
+import re
+
+import pandas as pd
+import pytest
+
+ui = pytest.importorskip("app.ui")
+
+
+def display_frame():
+    teams = ['Ferrari', 'McLaren', 'Unknown Team', 'Mercedes', 'Williams']
+    return pd.DataFrame({
+        'Position': [1, 2, 3, 4, 5],
+        'Driver': ['Leclerc', 'Norris', 'Rookie', 'Russell', 'Albon'],
+        'Team': teams,
+        'Predicted Time': ['1:28.123', '1:28.245', '1:28.300', '1:28.412', '1:28.998'],
+        'Gap to Pole': ['POLE', '+0.122s', '+0.177s', '+0.289s', '+0.875s']
+    }, index=[10, 11, 12, 13, 14])
+
+
+def row_by_row_html(display_df):
+    """The grid table as it was built one row at a time before vectorizing"""
+    rows = []
+    for _, row in display_df.iterrows():
+        team_color = ui.TEAM_COLORS.get(row['Team'], '#FFFFFF')
+        position = int(row['Position'])
+        if position == 1:
+            bg_color = "rgba(255, 215, 0, 0.2)"
+        elif position == 2:
+            bg_color = "rgba(192, 192, 192, 0.2)"
+        elif position == 3:
+            bg_color = "rgba(205, 127, 50, 0.2)"
+        elif position % 2 == 0:
+            bg_color = "rgba(56, 56, 63, 0.7)"
+        else:
+            bg_color = "rgba(56, 56, 63, 0.5)"
+        rows.append(f"""
+        <tr style="background-color: {bg_color};">
+            <td style="padding: 10px; text-align: center; font-weight: bold; color: white;">{position}</td>
+            <td style="padding: 10px; text-align: left; color: white;">
+                <div style="display: flex; align-items: center;">
+                    <div style="width: 5px; height: 20px; background-color: {team_color}; margin-right: 10px;"></div>
+                    {row['Driver']}
+                </div>
+            </td>
+            <td style="padding: 10px; text-align: left; color: white;">{row['Team']}</td>
+            <td style="padding: 10px; text-align: center; font-weight: bold; color: white;">{row['Predicted Time']}</td>
+            <td style="padding: 10px; text-align: center; color: {'gold' if position == 1 else 'white'}; font-weight: {'bold' if position == 1 else 'normal'};">
+                {row['Gap to Pole']}
+            </td>
+        </tr>
+        """)
+    return f"""
+    <table style="width: 100%; border-collapse: collapse; margin-top: 10px;">
+        <thead>
+            <tr style="background-color: {ui.F1_COLORS['red']}; color: white;">
+                <th style="padding: 10px; text-align: center;">Position</th>
+                <th style="padding: 10px; text-align: left;">Driver</th>
+                <th style="padding: 10px; text-align: left;">Team</th>
+                <th style="padding: 10px; text-align: center;">Predicted Time</th>
+                <th style="padding: 10px; text-align: center;">Gap to Pole</th>
+            </tr>
+        </thead>
+        <tbody>
+            {''.join(rows)}
+        </tbody>
+    </table>
+    """
+
+
+def normalize(html):
+    """Drop the whitespace between tags, which the browser ignores"""
+    return re.sub(r">\s+", ">", re.sub(r"\s+<", "<", html.strip()))
+
+
+def test_grid_table_matches_row_by_row_html():
+    display_df = display_frame()
+    assert normalize(ui.build_grid_table_html(display_df)) == normalize(row_by_row_html(display_df))
+
+
+def test_grid_table_shows_uncertainty_next_to_time():
+    display_df = display_frame().assign(Uncertainty=['±0.20', '±0.25', '±0.30', '±0.22', '±0.40'])
+    html = ui.build_grid_table_html(display_df)
+
+    assert html.count('±') == len(display_df)
+    assert normalize(html).count('1:28.123<span') == 1
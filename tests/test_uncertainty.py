@@ -0,0 +1,73 @@
+"""
+Tests for the conformal prediction intervals
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.uncertainty import COVERAGE_LEVELS, MIN_DRIVER_RESIDUALS, _calibration, add_intervals, conformal_quantile
+
+
+def calibration(abs_residuals, drivers):
+    """Calibration for a single ML weight, as produced by calibrate"""
+    return {'weights': {'none': _calibration(abs_residuals, drivers, COVERAGE_LEVELS)}}
+
+
+def test_quantile_needs_enough_residuals():
+    assert conformal_quantile(np.array([]), 0.9) is None
+    assert conformal_quantile(np.arange(8.0), 0.9) is None
+    assert conformal_quantile(np.arange(9.0), 0.9) == 8.0
+
+
+@pytest.mark.parametrize('coverage', [0.5, 0.8, 0.9])
+def test_quantile_covers_new_errors(coverage):
+    rng = np.random.default_rng(0)
+    trials = 2000
+    residuals = np.abs(rng.normal(size=(trials, 50)))
+    fresh = np.abs(rng.normal(size=trials))
+
+    widths = np.array([conformal_quantile(r, coverage) for r in residuals])
+
+    # Split conformal coverage lies between coverage and coverage + 1 / (n + 1)
+    assert coverage - 0.03 <= np.mean(fresh <= widths) <= coverage + 1 / 51 + 0.03
+
+
+def test_intervals_use_driver_widths_and_fall_back_to_pooled():
+    rng = np.random.default_rng(1)
+    steady = np.abs(rng.normal(scale=0.1, size=MIN_DRIVER_RESIDUALS))
+    erratic = np.abs(rng.normal(scale=1.0, size=MIN_DRIVER_RESIDUALS))
+    rare = np.abs(rng.normal(scale=0.5, size=MIN_DRIVER_RESIDUALS - 1))
+    residuals = np.concatenate([steady, erratic, rare])
+    drivers = ['Steady'] * len(steady) + ['Erratic'] * len(erratic) + ['Rare'] * len(rare)
+    predictions = pd.DataFrame({'Driver': ['Steady', 'Erratic', 'Rare', 'New'], 'Predicted_Q3': 80.0})
+
+    result = add_intervals(predictions, calibration(residuals, drivers), coverage=0.9)
+
+    pooled = conformal_quantile(residuals, 0.9)
+    assert list(result['Uncertainty']) == [
+        conformal_quantile(steady, 0.9), conformal_quantile(erratic, 0.9), pooled, pooled
+    ]
+    np.testing.assert_allclose(result['Upper'] - result['Lower'], 2 * result['Uncertainty'])
+
+
+def test_intervals_cover_held_out_times():
+    rng = np.random.default_rng(2)
+    names = [f"Driver {i}" for i in range(5)]
+    scale = pd.Series(np.linspace(0.1, 0.5, len(names)), index=names)
+    drivers = np.repeat(names, 400)
+    errors = rng.normal(size=len(drivers)) * scale[drivers].to_numpy()
+
+    predictions = pd.DataFrame({'Driver': drivers, 'Predicted_Q3': 80.0})
+    result = add_intervals(predictions, calibration(np.abs(errors), drivers), coverage=0.8)
+    actual = 80.0 + rng.normal(size=len(drivers)) * scale[drivers].to_numpy()
+
+    covered = (result['Lower'] <= actual) & (actual <= result['Upper'])
+    assert covered.mean() == pytest.approx(0.8, abs=0.04)
+    # Per-driver widths keep coverage for the erratic drivers too
+    assert covered.groupby(drivers).mean().min() >= 0.7
+
+
+def test_missing_calibration_is_an_error():
+    predictions = pd.DataFrame({'Driver': ['Driver 1'], 'Predicted_Q3': [80.0]})
+    with pytest.raises(ValueError):
+        add_intervals(predictions, {'weights': {}})